@@ -0,0 +1,138 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+import queue
+import threading
+import time
+import logging
+from typing import Any, Callable, Dict, List, Union
+
+class CaptionBatcher:
+    def __init__(self, send_batch: Callable[[List[Any]], List[Union[str, BaseException]]], group_size: int = 4,
+                 max_wait_seconds: float = 0.05, max_concurrent_batches: int = 4):
+        """
+        CaptionBatcher 클래스 초기화
+        여러 스레드에서 동시에 들어온 캡션 요청을 최대 group_size개씩 묶어 한 번의 API 요청으로 보냅니다.
+        첫 요청이 들어온 뒤 max_wait_seconds 동안 같은 묶음에 들어갈 요청을 기다리며,
+        묶음이 다 차면 기다리지 않고 바로 보냅니다.
+
+        :param send_batch: 묶음 처리 함수 (요청 목록 -> 같은 순서의 캡션 목록, 일부 요청만 실패하면 그 자리에 예외 객체)
+        :param group_size: 한 번의 API 요청에 넣을 최대 이미지 수
+        :param max_wait_seconds: 묶음을 채우기 위해 기다리는 최대 시간(초)
+        :param max_concurrent_batches: 동시에 진행할 묶음 요청 수
+        """
+        self.send_batch = send_batch
+        self.group_size = group_size
+        self.max_wait_seconds = max_wait_seconds
+        self.logger = logging.getLogger(__name__)
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrent_batches, thread_name_prefix="caption-batch")
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._stats = {'submitted': 0, 'batches': 0, 'batched_images': 0}
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="caption-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, item: Any) -> Future:
+        """
+        캡션 요청을 묶음 대기열에 넣습니다.
+
+        :param item: send_batch에 전달할 요청 하나
+        :return: 캡션을 담을 Future
+        """
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("캡션 묶음 처리기가 종료되었습니다.")
+            self._stats['submitted'] += 1
+        self._queue.put((item, future))
+        return future
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        묶음 처리 통계를 반환합니다.
+
+        :return: 받은 요청 수, 보낸 묶음 수, 평균 묶음 크기
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats['average_batch_size'] = round(stats['batched_images'] / stats['batches'], 2) if stats['batches'] else 0.0
+        return stats
+
+    def shutdown(self) -> None:
+        """
+        묶음 처리 스레드를 종료하고 보내지 못한 요청은 실패로 처리합니다.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        while True:
+            try:
+                entry = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is not None:
+                entry[1].set_exception(RuntimeError("캡션 묶음 처리기가 종료되었습니다."))
+
+    def _run(self) -> None:
+        """
+        첫 요청을 받은 뒤 묶음이 차거나 대기 시간이 지날 때까지 요청을 모아 워커 풀에 넘깁니다.
+        """
+        while True:
+            entry = self._queue.get()
+            if entry is None:
+                return
+            group = [entry]
+            deadline = time.monotonic() + self.max_wait_seconds
+            while len(group) < self.group_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if entry is None:
+                    self._fail(group)
+                    return
+                group.append(entry)
+
+            with self._lock:
+                self._stats['batches'] += 1
+                self._stats['batched_images'] += len(group)
+            try:
+                self.executor.submit(self._send, group)
+            except RuntimeError as e:
+                self._fail(group, e)
+
+    def _send(self, group: List[Any]) -> None:
+        """
+        묶음 하나를 처리하고 각 요청의 Future에 캡션을 전달합니다.
+        send_batch가 예외를 발생시키면 묶음 전체를, 캡션 자리에 예외 객체를 돌려주면 그 요청만 실패로 처리합니다.
+
+        :param group: (요청, Future) 목록
+        """
+        try:
+            captions = self.send_batch([item for item, _ in group])
+        except Exception as e:
+            self._fail(group, e)
+            return
+        for (_, future), caption in zip(group, captions):
+            if isinstance(caption, BaseException):
+                future.set_exception(caption)
+            else:
+                future.set_result(caption)
+
+    def _fail(self, group: List[Any], exception: BaseException = None) -> None:
+        """
+        묶음의 모든 요청을 실패로 처리합니다.
+
+        :param group: (요청, Future) 목록
+        :param exception: 전달할 예외
+        """
+        exception = exception or RuntimeError("캡션 묶음 처리기가 종료되었습니다.")
+        for _, future in group:
+            if not future.done():
+                future.set_exception(exception)
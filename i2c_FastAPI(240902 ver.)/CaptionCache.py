@@ -0,0 +1,182 @@
+from collections import OrderedDict
+import hashlib
+import sqlite3
+import threading
+import time
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+class CaptionCache:
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 7 * 24 * 3600, db_path: Optional[str] = None):
+        """
+        CaptionCache 클래스 초기화
+        리사이즈된 JPEG 바이트, 프롬프트, 모델 이름의 해시를 키로 생성된 캡션을 캐시합니다.
+        프로세스 내 LRU 캐시와 여러 워커가 공유하는 SQLite 캐시를 두며, ttl_seconds가 지난 항목은 사용하지 않습니다.
+
+        :param max_entries: 메모리 LRU 캐시의 최대 항목 수
+        :param ttl_seconds: 캐시 항목의 유효 시간(초)
+        :param db_path: SQLite 캐시 파일 경로 (None이면 메모리 캐시만 사용)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self.logger = logging.getLogger(__name__)
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'persistent_hits': 0, 'misses': 0, 'expired': 0}
+
+        self._conn = None
+        if db_path:
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS captions (key TEXT PRIMARY KEY, caption TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            # 시작할 때 만료된 항목을 정리합니다.
+            self._conn.execute("DELETE FROM captions WHERE created_at < ?", (time.time() - ttl_seconds,))
+            self._conn.commit()
+            self._db_lock = threading.Lock()
+
+    @staticmethod
+    def make_key(image_data: str, prompt: str, model: str) -> str:
+        """
+        캡션 입력으로 캐시 키를 계산합니다.
+
+        :param image_data: API에 보내는 리사이즈된 JPEG(base64) 데이터 (또는 원본 해시와 인코딩 계획으로 만든 이미지 식별자)
+        :param prompt: 캡션 프롬프트
+        :param model: 모델 이름
+        :return: SHA-256 해시 문자열
+        """
+        digest = hashlib.sha256()
+        for part in (model, prompt, image_data):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\x00')
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        캐시에서 캡션을 찾습니다. 만료된 항목은 제거하고 없는 것으로 처리합니다.
+
+        :param key: 캐시 키
+        :return: 캡션, 없거나 만료되었으면 None
+        """
+        now = time.time()
+        memory_expired = False
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                caption, created_at = entry
+                if now - created_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+                    return caption
+                # 다른 워커가 SQLite 항목을 갱신했을 수 있으므로 SQLite 캐시를 다시 확인합니다.
+                del self._entries[key]
+                memory_expired = True
+
+        entry = self._load_persistent(key)
+        if entry is not None and entry[1] + self.ttl_seconds < now:
+            self._delete_persistent(key)
+            entry, memory_expired = None, True
+        if entry is not None:
+            caption, created_at = entry
+            with self._lock:
+                self._stats['persistent_hits'] += 1
+                self._remember(key, caption, created_at)
+            return caption
+
+        with self._lock:
+            self._stats['misses'] += 1
+            self._stats['expired'] += memory_expired
+        return None
+
+    def set(self, key: str, caption: str) -> None:
+        """
+        캡션을 캐시에 저장합니다.
+
+        :param key: 캐시 키
+        :param caption: 생성된 캡션
+        """
+        created_at = time.time()
+        with self._lock:
+            self._remember(key, caption, created_at)
+        self._save_persistent(key, caption, created_at)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        캐시 적중률을 반환합니다.
+
+        :return: 캐시 통계
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            entries = len(self._entries)
+        hits = stats['hits'] + stats['persistent_hits']
+        total = hits + stats['misses']
+        return {
+            'entries': entries,
+            'hits': stats['hits'],
+            'persistent_hits': stats['persistent_hits'],
+            'misses': stats['misses'],
+            'expired': stats['expired'],
+            'hit_rate': round(hits / total, 4) if total else 0.0
+        }
+
+    def _remember(self, key: str, caption: str, created_at: float) -> None:
+        """
+        메모리 LRU 캐시에 항목을 넣습니다. 호출하는 쪽에서 잠금을 잡고 있어야 합니다.
+
+        :param key: 캐시 키
+        :param caption: 캡션
+        :param created_at: 생성 시각
+        """
+        self._entries[key] = (caption, created_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _load_persistent(self, key: str) -> Optional[Tuple[str, float]]:
+        """
+        SQLite 캐시에서 캡션을 불러옵니다.
+
+        :param key: 캐시 키
+        :return: (캡션, 생성 시각), 없으면 None
+        """
+        if self._conn is None:
+            return None
+        with self._db_lock:
+            row = self._conn.execute("SELECT caption, created_at FROM captions WHERE key = ?", (key,)).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def _save_persistent(self, key: str, caption: str, created_at: float) -> None:
+        """
+        SQLite 캐시에 캡션을 저장합니다.
+
+        :param key: 캐시 키
+        :param caption: 캡션
+        :param created_at: 생성 시각
+        """
+        if self._conn is None:
+            return
+        try:
+            with self._db_lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO captions (key, caption, created_at) VALUES (?, ?, ?)",
+                    (key, caption, created_at)
+                )
+        except sqlite3.Error as e:
+            self.logger.warning(f"캡션 캐시를 저장하지 못했습니다: {e}")
+
+    def _delete_persistent(self, key: str) -> None:
+        """
+        SQLite 캐시에서 만료된 항목을 삭제합니다.
+
+        :param key: 캐시 키
+        """
+        if self._conn is None:
+            return
+        try:
+            with self._db_lock, self._conn:
+                self._conn.execute("DELETE FROM captions WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            self.logger.warning(f"만료된 캡션 캐시를 삭제하지 못했습니다: {e}")
@@ -0,0 +1,204 @@
+from collections import OrderedDict
+import asyncio
+import hashlib
+import json
+import time
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+class ContentCache:
+    def __init__(self, max_entries: int = 500, ttl_seconds: float = 600.0):
+        """
+        ContentCache 클래스 초기화
+        글 생성 요청의 지문(fingerprint)을 키로 완성된 결과를 캐시하고, 같은 키로 동시에 들어온 요청은
+        진행 중인 생성 하나의 결과를 함께 받도록 합니다 (singleflight).
+        만료되지 않도록 저장한 항목(예: temperature 0 결과)은 LRU로 밀려날 때까지 유지됩니다.
+        진행 중인 생성은 asyncio Future로 공유하므로 이벤트 루프에서만 사용해야 합니다.
+
+        :param max_entries: 메모리 LRU 캐시의 최대 항목 수
+        :param ttl_seconds: 만료되는 항목의 유효 시간(초)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.logger = logging.getLogger(__name__)
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], Optional[float]]]" = OrderedDict()
+        self._inflight: Dict[str, "asyncio.Future[Dict[str, Any]]"] = {}
+        self._stats = {'hits': 0, 'coalesced': 0, 'misses': 0, 'expired': 0}
+
+    @staticmethod
+    def make_key(fields: Dict[str, Any], idempotency_key: Optional[str] = None) -> str:
+        """
+        요청 필드로 캐시 키를 계산합니다. 필드는 키 순서와 관계없이 같은 JSON으로 직렬화합니다.
+        멱등성 키가 있으면 키에 함께 넣으므로, 같은 멱등성 키라도 요청 내용이 다르면 다른 항목이 됩니다.
+
+        :param fields: 결과에 영향을 주는 요청 필드
+        :param idempotency_key: 클라이언트가 보낸 멱등성 키 (없으면 None)
+        :return: SHA-256 해시 문자열 (멱등성 키가 있으면 'idempotency:' 접두어)
+        """
+        digest = hashlib.sha256(json.dumps(fields, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8'))
+        if idempotency_key:
+            digest.update(b'\x00' + idempotency_key.encode('utf-8'))
+            return f"idempotency:{digest.hexdigest()}"
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        완성된 결과를 찾습니다. 만료된 항목은 제거하고 없는 것으로 처리합니다.
+
+        :param key: 캐시 키
+        :return: 결과, 없거나 만료되었으면 None
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        result, expires_at = entry
+        if expires_at is not None and expires_at < time.time():
+            del self._entries[key]
+            self._stats['expired'] += 1
+            return None
+        self._entries.move_to_end(key)
+        self._stats['hits'] += 1
+        return result
+
+    def set(self, key: str, result: Dict[str, Any], expires: bool = True) -> None:
+        """
+        완성된 결과를 저장합니다.
+
+        :param key: 캐시 키
+        :param result: 생성 결과
+        :param expires: False이면 만료되지 않음 (True이면 ttl_seconds 뒤 만료)
+        """
+        self._entries[key] = (result, time.time() + self.ttl_seconds if expires else None)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def inflight(self, key: str) -> Optional["asyncio.Future[Dict[str, Any]]"]:
+        """
+        같은 키로 진행 중인 생성을 찾습니다.
+
+        :param key: 캐시 키
+        :return: 생성 결과를 담을 Future, 진행 중인 생성이 없으면 None
+        """
+        future = self._inflight.get(key)
+        if future is not None:
+            self._stats['coalesced'] += 1
+        return future
+
+    def register(self, key: str, future: "asyncio.Future[Dict[str, Any]]", expires: bool = True,
+                 cacheable: Optional[Callable[[Dict[str, Any]], bool]] = None) -> None:
+        """
+        진행 중인 생성을 등록합니다. 같은 키의 요청은 이 Future의 결과를 함께 받으며,
+        Future가 결과로 끝나면 결과를 저장합니다. 호출하는 쪽은 실패하거나 중단될 때도 Future를 끝내야 합니다.
+
+        :param key: 캐시 키
+        :param future: 생성 결과를 담을 Future
+        :param expires: False이면 결과가 만료되지 않음
+        :param cacheable: 결과를 저장할지 판단하는 함수 (오류 결과는 저장하지 않도록 할 때 사용)
+        """
+        self._stats['misses'] += 1
+        self._inflight[key] = future
+
+        def finish(done: "asyncio.Future[Dict[str, Any]]") -> None:
+            if self._inflight.get(key) is done:
+                del self._inflight[key]
+            if not done.cancelled() and done.exception() is None and (cacheable is None or cacheable(done.result())):
+                self.set(key, done.result(), expires)
+
+        future.add_done_callback(finish)
+
+    async def get_or_generate(self, key: str, generate: Callable[[], Awaitable[Dict[str, Any]]], use_cached: bool = True,
+                              expires: bool = True,
+                              cacheable: Optional[Callable[[Dict[str, Any]], bool]] = None) -> Tuple[Dict[str, Any], str]:
+        """
+        캐시된 결과나 진행 중인 생성의 결과를 반환하고, 둘 다 없으면 generate로 생성한 뒤 저장합니다.
+        생성은 별도의 작업으로 실행하므로 먼저 요청한 클라이언트가 연결을 끊어도 함께 기다리는 요청은 결과를 받습니다.
+
+        :param key: 캐시 키
+        :param generate: 결과를 생성하는 코루틴 함수
+        :param use_cached: False이면 완성된 결과는 사용하지 않고 진행 중인 생성만 공유합니다 (새 결과는 저장합니다)
+        :param expires: False이면 새 결과가 만료되지 않음
+        :param cacheable: 새 결과를 저장할지 판단하는 함수 (오류 결과는 저장하지 않도록 할 때 사용)
+        :return: (결과, 'hit' | 'coalesced' | 'miss')
+        """
+        if use_cached:
+            cached = self.get(key)
+            if cached is not None:
+                return cached, 'hit'
+        pending = self.inflight(key)
+        if pending is not None:
+            return await asyncio.shield(pending), 'coalesced'
+
+        task = asyncio.ensure_future(generate())
+        self.register(key, task, expires, cacheable)
+        return await asyncio.shield(task), 'miss'
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        캐시 적중률과 병합된 요청 수를 반환합니다.
+
+        :return: 캐시 통계
+        """
+        stats = dict(self._stats)
+        served = stats['hits'] + stats['coalesced']
+        total = served + stats['misses']
+        return {
+            'entries': len(self._entries),
+            'inflight': len(self._inflight),
+            'hits': stats['hits'],
+            'coalesced': stats['coalesced'],
+            'misses': stats['misses'],
+            'expired': stats['expired'],
+            'hit_rate': round(served / total, 4) if total else 0.0
+        }
+
+class StreamBroadcast:
+    def __init__(self):
+        """
+        StreamBroadcast 클래스 초기화
+        진행 중인 스트리밍 생성의 글 조각을 모아 두고, 구독자마다 처음 조각부터 차례로 전달합니다.
+        생성은 구독자와 별도의 작업에서 진행하므로 구독자가 연결을 끊어도 다른 구독자와 생성에는 영향이 없습니다.
+        이벤트 루프에서만 사용해야 합니다.
+        """
+        self.parts: List[str] = []
+        self.closed = False
+        self._changed = asyncio.Event()
+
+    def publish(self, part: str) -> None:
+        """
+        새 글 조각을 추가하고 기다리는 구독자를 깨웁니다.
+
+        :param part: 글 조각
+        """
+        self.parts.append(part)
+        self._notify()
+
+    def close(self) -> None:
+        """
+        생성이 끝났음(성공이든 실패든)을 알립니다. 구독자는 남은 조각을 받은 뒤 끝납니다.
+        """
+        self.closed = True
+        self._notify()
+
+    async def subscribe(self) -> AsyncIterator[str]:
+        """
+        지금까지 생성된 조각부터 생성이 끝날 때까지의 모든 글 조각을 차례로 반환합니다.
+
+        :return: 글 조각의 비동기 반복자
+        """
+        index = 0
+        while True:
+            changed = self._changed
+            while index < len(self.parts):
+                yield self.parts[index]
+                index += 1
+            if self.closed:
+                return
+            await changed.wait()
+
+    def _notify(self) -> None:
+        """
+        기다리는 구독자를 깨우고 다음 변경을 기다릴 새 이벤트를 만듭니다.
+        """
+        self._changed.set()
+        self._changed = asyncio.Event()
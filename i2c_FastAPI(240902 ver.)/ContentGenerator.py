@@ -1,33 +1,55 @@
+import json
+import time
+import asyncio
 import logging
-from openai import OpenAI
+import threading
 from datetime import datetime
-from writing_styles import STYLE_SPECIFIC_INSTRUCTIONS
-from writing_tones import WRITING_TONES
+from OpenAIClients import OpenAIClients
+from ImageCaptionGenerator import ImageCaptionGenerator
+from HashtagGenerator import HashtagGenerator
+from PromptTemplates import PromptTemplates, WRITER_ROLE
 
 class ContentGenerator:
-    def __init__(self, openai_api_key):
-        self.client = OpenAI(api_key=openai_api_key)
+    # 글/해시태그 생성 API 호출의 응답 대기 시간 제한(초)
+    STORY_TIMEOUT = 60.0
+    HASHTAG_TIMEOUT = 15.0
+
+    # 글과 해시태그 생성 방식
+    # - sequential: 글을 생성한 뒤 그 글로 해시태그를 생성 (API 호출 2번을 차례로)
+    # - combined: 글과 해시태그를 하나의 JSON 응답으로 생성 (API 호출 1번)
+    # - parallel: 글 생성 응답을 기다리는 동안 워커 스레드에서 캡션과 위치 정보로 해시태그를 만듦 (API 호출 1번)
+    #   로컬 해시태그를 그대로 사용자에게 보내므로 형태소 분석기로 명사만 뽑을 수 있을 때만 사용 가능 (available_strategies 참고)
+    STRATEGIES = ('sequential', 'combined', 'parallel')
+    # sequential 방식의 해시태그 생성기
+    # - llm: 생성된 글로 API를 한 번 더 호출
+    # - local: HashtagGenerator로 글, 캡션, 위치, 글쓰기 스타일에서 키워드를 뽑음 (API 호출 없음)
+    HASHTAG_BACKENDS = ('llm', 'local')
+    HASHTAG_COUNT = 5
+    # combined 방식에서 해시태그 출력에 더 허용하는 토큰 수
+    HASHTAG_MAX_TOKENS = 100
+    HASHTAG_ERROR_MESSAGE = "해시태그를 생성할 수 없습니다."
+
+    def __init__(self, openai_api_key, location_resolver=None, clients=None, hashtag_generator=None, prompt_templates=None):
+        # 캡션 생성과 같은 연결 풀을 쓰도록 공유 클라이언트를 주입받음
+        clients = clients or OpenAIClients(openai_api_key)
+        self.client = clients.client
+        self.async_client = clients.async_client
+        # 위치 ID로 백그라운드에서 보강된 위치 정보를 조회하는 함수 (location_id -> 위치 정보 또는 None)
+        self.location_resolver = location_resolver
+        self.hashtag_generator = hashtag_generator or HashtagGenerator(count=self.HASHTAG_COUNT)
+        # (스타일, 톤)별 시스템 프롬프트를 시작 시 한 번만 만들어 두고 재사용
+        self.prompt_templates = prompt_templates or PromptTemplates()
+        # API 응답의 usage에서 집계한 입력 토큰 수와 제공자 프롬프트 캐시에서 처리된 토큰 수
+        self._usage_stats = {'requests': 0, 'prompt_tokens': 0, 'cached_tokens': 0}
+        self._usage_lock = threading.Lock()
         self.logger = logging.getLogger(__name__)
 
     def create_story(self, image_data_list, user_context, writing_style, writing_length, temperature, user_info):
-        self.logger.info(f"User info type: {type(user_info)}")
-        self.logger.info(f"User info keys: {user_info.keys()}")
-        self.logger.info(f"Creating story with parameters: style={writing_style}, length={writing_length}, temperature={temperature}")
-        self.logger.info(f"Received image_data_list: {image_data_list}")
-        self.logger.info(f"Received user_context: {user_context}")
-        self.logger.info(f"Received user_info: {user_info}")
-        
-        # 이미지 데이터 정렬
-        sorted_image_data = self._sort_image_data(image_data_list)
-        self.logger.info(f"Sorted image data: {sorted_image_data}")
-        
-        # 프롬프트 생성
-        prompt = self._create_story_prompt(sorted_image_data, user_context, writing_style, writing_length, user_info)
-        self.logger.info(f"Generated prompt: {prompt}")
+        system_prompt, prompt = self._prepare_story_prompt(image_data_list, user_context, writing_style, writing_length, temperature, user_info)
 
         # OpenAI API를 사용하여 스토리 생성
         try:
-            response = self._generate_openai_response(prompt, writing_length, temperature)
+            response = self._generate_openai_response(prompt, writing_length, temperature, self.STORY_TIMEOUT, system_prompt)
             self.logger.info("OpenAI API response received successfully")
             return response.choices[0].message.content, user_info.get('writing_tone', 'default')
         except Exception as e:
@@ -35,16 +57,187 @@ class ContentGenerator:
             self.logger.exception(e)
             raise
 
+    async def acreate_story(self, image_data_list, user_context, writing_style, writing_length, temperature, user_info):
+        # create_story의 비동기 버전 (응답을 기다리는 동안 이벤트 루프를 막지 않음)
+        system_prompt, prompt = self._prepare_story_prompt(image_data_list, user_context, writing_style, writing_length, temperature, user_info)
+
+        try:
+            response = await self._agenerate_openai_response(prompt, writing_length, temperature, self.STORY_TIMEOUT, system_prompt)
+            self.logger.info("OpenAI API response received successfully")
+            return response.choices[0].message.content, user_info.get('writing_tone', 'default')
+        except Exception as e:
+            self.logger.error(f"스토리 생성 중 오류 발생: {e}")
+            self.logger.exception(e)
+            raise
+
+    async def astream_story(self, image_data_list, user_context, writing_style, writing_length, temperature, user_info):
+        # 스트리밍 API로 스토리를 생성하며 도착하는 텍스트 조각을 차례로 반환
+        # 전체 응답을 기다리지 않으므로 첫 토큰이 도착하는 즉시 화면에 표시할 수 있음
+        system_prompt, prompt = self._prepare_story_prompt(image_data_list, user_context, writing_style, writing_length, temperature, user_info)
+
+        try:
+            stream = await self._agenerate_openai_response(
+                prompt, writing_length, temperature, self.STORY_TIMEOUT, system_prompt, stream=True
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+                # 사용량은 마지막 조각(choices가 빈 조각)에 담겨 옴
+                if getattr(chunk, 'usage', None):
+                    self._record_usage(chunk.usage)
+            self.logger.info("OpenAI API stream completed successfully")
+        except Exception as e:
+            self.logger.error(f"스토리 생성 중 오류 발생: {e}")
+            self.logger.exception(e)
+            raise
+
+    def available_strategies(self):
+        # 사용할 수 있는 글/해시태그 생성 방식
+        # 규칙 기반 토크나이저는 형용사나 동사 활용형을 해시태그로 만들 수 있으므로 그때는 parallel을 제외함
+        if self.hashtag_generator.nouns_only:
+            return self.STRATEGIES
+        return tuple(strategy for strategy in self.STRATEGIES if strategy != 'parallel')
+
+    async def agenerate_content(self, image_data_list, user_context, writing_style, writing_length, temperature, user_info,
+                                strategy='sequential', hashtag_backend='llm'):
+        # 지정한 방식으로 글과 해시태그를 생성하고, 실제로 사용한 방식과 단계별 소요 시간(초)을 함께 반환
+        # hashtag_backend는 sequential 방식에만 적용됨 (combined는 llm, parallel은 항상 local)
+        if strategy not in self.available_strategies():
+            raise ValueError(f"지원하지 않는 생성 방식입니다: {strategy}")
+        started_at = time.perf_counter()
+        timings = {}
+        if strategy == 'combined':
+            hashtag_backend = 'llm'
+            story, writing_tone, hashtags = await self.acreate_story_with_hashtags(
+                image_data_list, user_context, writing_style, writing_length, temperature, user_info
+            )
+            if story is None:
+                # JSON 응답이 잘리는 등으로 글을 읽지 못하면 JSON 문법이 사용자에게 보이지 않도록 일반 글 생성으로 다시 요청함
+                # (해시태그는 아래에서 따로 만듦)
+                story, writing_tone = await self.acreate_story(
+                    image_data_list, user_context, writing_style, writing_length, temperature, user_info
+                )
+                strategy = 'combined+sequential'
+            timings['story'] = timings['hashtags'] = round(time.perf_counter() - started_at, 3)
+            if hashtags is None and self.hashtag_generator.nouns_only:
+                # JSON 응답에서 해시태그를 읽지 못하면 로컬 해시태그로 대신함
+                hashtag_started_at = time.perf_counter()
+                hashtags = self.create_local_hashtags(image_data_list, story, writing_style)
+                timings['hashtags'] = round(time.perf_counter() - hashtag_started_at, 3)
+                hashtag_backend = 'local'
+                if strategy == 'combined':
+                    strategy = 'combined+local'
+            elif hashtags is None:
+                # 로컬 해시태그가 명사만 뽑을 수 없으면 완성된 글로 해시태그 생성 API를 한 번 더 호출함
+                hashtags, timings['hashtags'] = await self._timed(self.acreate_hashtags(story))
+                if strategy == 'combined':
+                    strategy = 'combined+llm'
+        elif strategy == 'parallel':
+            hashtag_backend = 'local'
+            # 글 생성 요청을 기다리는 동안 로컬 해시태그는 워커 스레드에서 만듦 (이벤트 루프를 막지 않음)
+            ((story, writing_tone), timings['story']), (hashtags, timings['hashtags']) = await asyncio.gather(
+                self._timed(
+                    self.acreate_story(image_data_list, user_context, writing_style, writing_length, temperature, user_info)
+                ),
+                self._timed(asyncio.to_thread(self.create_local_hashtags, image_data_list, "", writing_style))
+            )
+        else:
+            (story, writing_tone), timings['story'] = await self._timed(
+                self.acreate_story(image_data_list, user_context, writing_style, writing_length, temperature, user_info)
+            )
+            if hashtag_backend == 'local':
+                hashtag_started_at = time.perf_counter()
+                hashtags = self.create_local_hashtags(image_data_list, story, writing_style)
+                timings['hashtags'] = round(time.perf_counter() - hashtag_started_at, 3)
+            else:
+                hashtags, timings['hashtags'] = await self._timed(self.acreate_hashtags(story))
+        timings['total'] = round(time.perf_counter() - started_at, 3)
+        self.logger.info(f"Content generated with strategy={strategy}, hashtag_backend={hashtag_backend}, timings={timings}")
+        return {
+            "story": story,
+            "writing_tone": writing_tone,
+            "hashtags": hashtags,
+            "strategy": strategy,
+            "hashtag_backend": hashtag_backend,
+            "timings": timings
+        }
+
+    async def acreate_story_with_hashtags(self, image_data_list, user_context, writing_style, writing_length, temperature, user_info):
+        # 글과 해시태그를 JSON 모드의 한 번의 호출로 생성
+        # 응답을 JSON으로 읽지 못하면 글과 해시태그 모두 None, 해시태그만 없으면 해시태그만 None으로 반환
+        system_prompt, prompt = self._prepare_story_prompt(image_data_list, user_context, writing_style, writing_length, temperature, user_info)
+        prompt += self._create_combined_output_instruction()
+
+        try:
+            response = await self._agenerate_openai_response(
+                prompt, writing_length + self.HASHTAG_MAX_TOKENS, temperature, self.STORY_TIMEOUT, system_prompt, json_output=True
+            )
+            self.logger.info("OpenAI API response received successfully")
+        except Exception as e:
+            self.logger.error(f"스토리 생성 중 오류 발생: {e}")
+            self.logger.exception(e)
+            raise
+        story, hashtags = self._parse_combined_response(response.choices[0].message.content)
+        return story, user_info.get('writing_tone', 'default'), hashtags
+
+    def create_local_hashtags(self, image_data_list, story="", writing_style=None):
+        # API 호출 없이 글, 캡션, 위치 정보, 글쓰기 스타일에서 해시태그를 만듦 (글이 아직 없으면 캡션과 위치만 사용)
+        # 근접 중복 이미지의 캡션은 대표 이미지와 같으므로 한 번만 셈
+        distinct_image_data = [image_data for image_data in image_data_list if not image_data.get('duplicate_of')]
+        captions = [
+            image_data.get('caption') or '' for image_data in distinct_image_data
+            if image_data.get('caption') != ImageCaptionGenerator.CAPTION_ERROR_MESSAGE
+        ]
+        locations = [self._get_location_info(image_data.get('metadata', {})) for image_data in image_data_list]
+        tags = self.hashtag_generator.generate(story, captions, locations, writing_style)
+        return ", ".join(tags) if tags else self.HASHTAG_ERROR_MESSAGE
+
     def create_hashtags(self, story):
         # 해시태그 생성을 위한 프롬프트 작성
         prompt = self._create_hashtag_prompt(story)
 
         try:
-            response = self._generate_openai_response(prompt, 100, 0.2)
+            response = self._generate_openai_response(prompt, 100, 0.2, self.HASHTAG_TIMEOUT)
             return response.choices[0].message.content
         except Exception as e:
             self.logger.error(f"해시태그 생성 중 오류 발생: {e}")
-            return "해시태그를 생성할 수 없습니다."
+            return self.HASHTAG_ERROR_MESSAGE
+
+    async def acreate_hashtags(self, story):
+        # create_hashtags의 비동기 버전
+        prompt = self._create_hashtag_prompt(story)
+
+        try:
+            response = await self._agenerate_openai_response(prompt, 100, 0.2, self.HASHTAG_TIMEOUT)
+            return response.choices[0].message.content
+        except Exception as e:
+            self.logger.error(f"해시태그 생성 중 오류 발생: {e}")
+            return self.HASHTAG_ERROR_MESSAGE
+
+    @staticmethod
+    async def _timed(awaitable):
+        # 코루틴의 결과와 소요 시간(초)을 함께 반환
+        started_at = time.perf_counter()
+        result = await awaitable
+        return result, round(time.perf_counter() - started_at, 3)
+
+    def _prepare_story_prompt(self, image_data_list, user_context, writing_style, writing_length, temperature, user_info):
+        self.logger.info(f"User info type: {type(user_info)}")
+        self.logger.info(f"User info keys: {user_info.keys()}")
+        self.logger.info(f"Creating story with parameters: style={writing_style}, length={writing_length}, temperature={temperature}")
+        self.logger.info(f"Received image_data_list: {image_data_list}")
+        self.logger.info(f"Received user_context: {user_context}")
+        self.logger.info(f"Received user_info: {user_info}")
+        
+        # 이미지 데이터 정렬
+        sorted_image_data = self._sort_image_data(image_data_list)
+        self.logger.info(f"Sorted image data: {sorted_image_data}")
+        
+        # 프롬프트 생성 (고정된 시스템 프롬프트를 앞에, 요청마다 달라지는 내용을 사용자 프롬프트로 뒤에 둠)
+        system_prompt = self.prompt_templates.system_prompt(writing_style, user_info.get('writing_tone'))
+        prompt = self._create_story_prompt(sorted_image_data, user_context, writing_style, writing_length, user_info)
+        self.logger.info(f"Generated prompt: {prompt}")
+        return system_prompt, prompt
 
     def _sort_image_data(self, image_data_list):
         # 이미지 데이터를 날짜순으로 정렬
@@ -73,49 +266,16 @@ class ContentGenerator:
             return datetime.strptime('1900-01-01 00:00:00', '%Y-%m-%d %H:%M:%S')
 
     def _create_story_prompt(self, sorted_image_data, user_context, writing_style, writing_length, user_info):
-        context_prompt = f"사용자 제공 추가 정보: {user_context}" if user_context else "사용자가 제공한 추가 정보 없음"
-        age = user_info.get('age', 'N/A')
-        gender = user_info.get('gender', 'N/A')
-        writing_tone = user_info.get('writing_tone', 'N/A')
-        writing_tone_description = user_info.get('writing_tone_description', 'N/A')
-        
-        # writing_tone의 value 값 중 두 번째 값을 가져옵니다.
-        tone_name = WRITING_TONES.get(writing_tone, ['', '', ''])[1]
-        
-        user_info_prompt = f"""저는 {age}세 {gender}입니다. 아래 지시사항에 따라 글을 작성하세요:
-            1. [{tone_name}] 문체를 사용하세요.
-            2. {writing_style} 형식으로 글을 작성하세요.
-            3. 문체 특징: {writing_tone_description}
-            이 특징들을 고려하여 자연스럽고 일관된 글을 작성해주세요."""
-
-        prompt = f"""다음 정보를 바탕으로 {writing_style}을 작성해주세요:
-            1. 컨텍스트: {context_prompt}
-            2. 글 길이: 정확히 {writing_length}자 (±10자 오차 허용)
-            3. 추가 정보: {user_context}
-            4. 작성자 정보:
-            {user_info_prompt}
-
-            주요 지침:
-            1. 제공된 이미지와 메타데이터를 기반으로 내용을 구성하세요.
-            2. {tone_name} 문체를 일관되게 유지하며, 적절한 어휘와 표현을 사용하세요.
-            3. 이미지와 메타데이터의 정보를 문체에 맞게 자연스럽게 표현하세요.
-            4. 전체적으로 통일성 있는 하나의 글로 작성하세요.
-            5. 반드시 지정된 글자 수({writing_length}자) 내에서 완결된 글을 작성하세요.
-            6. 글자 수에 맞추기 위해 내용을 적절히 조절하고, 필요한 경우 덜 중요한 세부사항은 생략하세요.
-            7. 글의 마지막 문장이 완전한 문장으로 끝나도록 하세요.
-            8. 글자 수가 부족하거나 초과하지 않도록 주의깊게 관리하세요.
-
-            이미지 정보:
-            """
-
-        for idx, image_data in enumerate(sorted_image_data, 1):
-            prompt += self._create_image_prompt(idx, image_data)
-
-        prompt += f"""{STYLE_SPECIFIC_INSTRUCTIONS[writing_style]}
-
-        중요: 모든 이미지를 종합하여 하나의 연결된 글을 작성해주세요. 각 이미지의 주요 객체나 장면에 초점을 맞추되, 전체적인 맥락을 고려하여 글을 작성해주세요.
-        마지막으로, 글자 수를 다시 한 번 확인하고 정확히 {writing_length}자(±10자)로 조정하세요. 필요하다면 내용을 약간 줄이거나 확장하여 글자 수를 맞추세요.
-        """
+        # 글쓰기 톤과 스타일 지침은 시스템 프롬프트에 들어가므로 여기에는 요청마다 달라지는 내용만 넣음
+        # 근접 중복 이미지(연속 촬영 등)는 대표 이미지와 같은 장면이므로 프롬프트에 넣지 않음
+        distinct_image_data = [image_data for image_data in sorted_image_data if not image_data.get('duplicate_of')]
+        image_section = "".join(
+            self._create_image_prompt(idx, image_data) for idx, image_data in enumerate(distinct_image_data, 1)
+        )
+        prompt = self.prompt_templates.story_prompt(
+            writing_style, writing_length, user_context,
+            user_info.get('age', 'N/A'), user_info.get('gender', 'N/A'), image_section
+        )
         return prompt
 
     def _create_image_prompt(self, idx, image_data):
@@ -127,7 +287,7 @@ class ContentGenerator:
         """
         metadata = image_data.get('metadata', {})
         labeled_exif = metadata.get('labeled_exif', {})
-        location_info = metadata.get('location_info', {})
+        location_info = self._get_location_info(metadata)
         
         if 'Date/Time' in labeled_exif:
             date_time = self._parse_date(labeled_exif['Date/Time'])
@@ -141,6 +301,14 @@ class ContentGenerator:
             image_prompt += "- 메타데이터 없음"
         return image_prompt
 
+    def _get_location_info(self, metadata):
+        # 업로드 시점에 주소 조회가 끝나지 않은 이미지는 생성 시점까지 보강된 주소를 사용
+        location_info = metadata.get('location_info') or {}
+        location_id = metadata.get('location_id')
+        if not location_info and location_id and self.location_resolver:
+            location_info = self.location_resolver(location_id) or {}
+        return location_info
+
     def _create_hashtag_prompt(self, story):
         # 해시태그 생성을 위한 프롬프트 작성
         return f"""
@@ -151,15 +319,83 @@ class ContentGenerator:
         해시태그는 '#' 기호로 시작하고, 각각 쉼표로 구분해주세요.
         """
 
-    def _generate_openai_response(self, prompt, max_tokens, temperature):
+    def _create_combined_output_instruction(self):
+        # combined 방식의 출력 형식 지시
+        return f"""
+        출력 형식: 다음 키를 가진 JSON 객체 하나만 출력하세요.
+        - "story": 작성한 글 (문자열)
+        - "hashtags": 글과 관련된 해시태그 {self.HASHTAG_COUNT}개 ('#' 기호로 시작하는 문자열 배열)
+        """
+
+    def _parse_combined_response(self, content):
+        # combined 응답에서 글과 해시태그를 꺼냄 (해시태그는 다른 방식과 같은 쉼표 구분 문자열로 맞춤)
+        try:
+            data = json.loads(content)
+            story = data['story']
+            if not isinstance(story, str) or not story.strip():
+                raise ValueError("story가 비어 있습니다")
+        except (TypeError, ValueError, KeyError) as e:
+            # 응답이 max_tokens에서 잘리면 JSON이 닫히지 않으므로 응답을 그대로 글로 쓰지 않음
+            self.logger.warning(f"JSON 응답에서 글을 읽을 수 없습니다: {e}")
+            return None, None
+        hashtags = data.get('hashtags')
+        if isinstance(hashtags, list):
+            hashtags = ", ".join(tag for tag in (HashtagGenerator.to_hashtag(str(tag)) for tag in hashtags) if tag)
+        return story, hashtags if isinstance(hashtags, str) and hashtags else None
+
+    def prompt_cache_stats(self):
+        # 입력 토큰 중 제공자 프롬프트 캐시에서 처리된 비율 (캐시된 토큰은 더 빠르고 싸게 처리됨)
+        with self._usage_lock:
+            stats = dict(self._usage_stats)
+        stats['cached_ratio'] = round(stats['cached_tokens'] / stats['prompt_tokens'], 4) if stats['prompt_tokens'] else 0.0
+        return stats
+
+    def _record_usage(self, usage):
+        # 응답의 usage에서 입력 토큰 수와 캐시된 토큰 수를 집계
+        if usage is None:
+            return
+        details = getattr(usage, 'prompt_tokens_details', None)
+        cached_tokens = (getattr(details, 'cached_tokens', 0) or 0) if details else 0
+        with self._usage_lock:
+            self._usage_stats['requests'] += 1
+            self._usage_stats['prompt_tokens'] += usage.prompt_tokens or 0
+            self._usage_stats['cached_tokens'] += cached_tokens
+        self.logger.info(f"Prompt tokens: {usage.prompt_tokens}, cached tokens: {cached_tokens}")
+
+    def _generate_openai_response(self, prompt, max_tokens, temperature, timeout, system_prompt=None):
         # OpenAI API를 사용하여 응답 생성
         self.logger.info(f"Sending request to OpenAI API with max_tokens={max_tokens}, temperature={temperature}")
-        return self.client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "당신은 여러 이미지의 정보를 종합하여 하나의 연결된 글을 작성하는 전문 작가입니다."},
+        response = self.client.chat.completions.create(**self._build_request(prompt, max_tokens, temperature, timeout, system_prompt))
+        self._record_usage(getattr(response, 'usage', None))
+        return response
+
+    async def _agenerate_openai_response(self, prompt, max_tokens, temperature, timeout, system_prompt=None, stream=False,
+                                         json_output=False):
+        # 비동기 클라이언트로 응답 생성 (stream이 True이면 응답 조각을 순서대로 내주는 스트림을 반환,
+        # json_output이 True이면 JSON 객체만 출력하도록 JSON 모드로 요청)
+        self.logger.info(f"Sending async request to OpenAI API with max_tokens={max_tokens}, temperature={temperature}, stream={stream}")
+        request = self._build_request(prompt, max_tokens, temperature, timeout, system_prompt)
+        if stream:
+            # 스트림의 마지막 조각으로 사용량을 받음
+            request["stream"] = True
+            request["stream_options"] = {"include_usage": True}
+        if json_output:
+            request["response_format"] = {"type": "json_object"}
+        response = await self.async_client.chat.completions.create(**request)
+        if not stream:
+            self._record_usage(getattr(response, 'usage', None))
+        return response
+
+    def _build_request(self, prompt, max_tokens, temperature, timeout, system_prompt=None):
+        # 동기/비동기 호출이 같은 요청 인자를 사용하도록 구성
+        # 시스템 프롬프트가 메시지 맨 앞에 오므로 같은 (스타일, 톤) 요청은 같은 접두부를 공유함
+        return {
+            "model": "gpt-4o-mini",
+            "messages": [
+                {"role": "system", "content": system_prompt or WRITER_ROLE},
                 {"role": "user", "content": prompt}
             ],
-            max_tokens=max_tokens,
-            temperature=temperature
-        )
\ No newline at end of file
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "timeout": timeout
+        }
\ No newline at end of file
@@ -0,0 +1,180 @@
+from PIL import Image
+import os
+import re
+import tempfile
+import logging
+from typing import List, Optional, Tuple
+from ImageHandle import ImageHandle
+
+# 파생 이미지 종류별 (확장자, 미디어 타입)
+# - caption: 캡션 생성에 사용하는 축소 JPEG (원본과 같은 방향, 재인코딩 손실을 줄이도록 높은 품질)
+# - preview: 화면 미리보기용 작은 WebP (EXIF 방향 적용)
+# - display: 해상도 상한을 둔 표시용 JPEG (EXIF 방향 적용, 선택)
+DERIVATIVE_VARIANTS = {
+    'caption': ('.jpg', 'image/jpeg'),
+    'preview': ('.webp', 'image/webp'),
+    'display': ('.jpg', 'image/jpeg')
+}
+
+_DIGEST_PATTERN = re.compile(r'[0-9a-f]{64}')
+
+# EXIF Orientation 태그 번호와 값별 회전/반전 방법
+ORIENTATION_TAG = 0x0112
+ORIENTATION_TRANSPOSE = {
+    2: Image.FLIP_LEFT_RIGHT,
+    3: Image.ROTATE_180,
+    4: Image.FLIP_TOP_BOTTOM,
+    5: Image.TRANSPOSE,
+    6: Image.ROTATE_270,
+    7: Image.TRANSVERSE,
+    8: Image.ROTATE_90
+}
+
+class DerivativeStore:
+    def __init__(self, folder: str = "image_upload", caption_size: int = 512, preview_size: int = 320,
+                 display_max_side: Optional[int] = None, caption_quality: int = 95, preview_quality: int = 75,
+                 display_quality: int = 85):
+        """
+        DerivativeStore 클래스 초기화
+        업로드 원본마다 캡션용 JPEG, 미리보기 WebP, (선택) 해상도 상한 JPEG을 한 번만 만들어 원본 옆에 저장합니다.
+        파일 이름은 원본 내용의 SHA-256 해시로 정해지므로 같은 이미지는 다시 만들지 않으며,
+        이후의 재처리와 미리보기 요청은 원본을 다시 디코딩하지 않습니다.
+        파생 이미지에는 EXIF(GPS 등)를 남기지 않습니다.
+
+        :param folder: 파생 이미지를 저장할 폴더
+        :param caption_size: 캡션용 이미지의 최대 긴 변 크기
+        :param preview_size: 미리보기 이미지의 최대 긴 변 크기
+        :param display_max_side: 표시용 이미지의 최대 긴 변 크기 (None이면 만들지 않음)
+        :param caption_quality: 캡션용 JPEG 품질
+        :param preview_quality: 미리보기 WebP 품질
+        :param display_quality: 표시용 JPEG 품질
+        """
+        self.folder = folder
+        self.caption_size = caption_size
+        self.preview_size = preview_size
+        self.display_max_side = display_max_side
+        self.caption_quality = caption_quality
+        self.preview_quality = preview_quality
+        self.display_quality = display_quality
+        self.logger = logging.getLogger(__name__)
+        self.variants: List[str] = ['caption', 'preview'] + (['display'] if display_max_side else [])
+        os.makedirs(self.folder, exist_ok=True)
+
+    def path_for(self, digest: str, variant: str) -> str:
+        """
+        파생 이미지의 저장 경로를 반환합니다.
+
+        :param digest: 원본 내용의 SHA-256 해시
+        :param variant: 파생 이미지 종류
+        :return: 저장 경로
+        """
+        return os.path.join(self.folder, f"{digest}.{variant}{DERIVATIVE_VARIANTS[variant][0]}")
+
+    def get(self, digest: str, variant: str) -> Optional[Tuple[str, str]]:
+        """
+        저장된 파생 이미지를 찾습니다.
+
+        :param digest: 원본 내용의 SHA-256 해시
+        :param variant: 파생 이미지 종류
+        :return: (경로, 미디어 타입), 없거나 잘못된 요청이면 None
+        """
+        if variant not in self.variants or not _DIGEST_PATTERN.fullmatch(digest):
+            return None
+        path = self.path_for(digest, variant)
+        return (path, DERIVATIVE_VARIANTS[variant][1]) if os.path.exists(path) else None
+
+    def missing(self, digest: str) -> List[str]:
+        """
+        아직 만들지 않은 파생 이미지 종류를 반환합니다.
+
+        :param digest: 원본 내용의 SHA-256 해시
+        :return: 파생 이미지 종류 목록
+        """
+        return [variant for variant in self.variants if not os.path.exists(self.path_for(digest, variant))]
+
+    def ensure(self, digest: str, handle: ImageHandle) -> List[str]:
+        """
+        없는 파생 이미지를 만듭니다. 캡션용과 미리보기는 캡션 크기로 한 번 축소 디코딩한 이미지에서 만들며,
+        같은 핸들로 이어지는 캡션 생성 단계도 이 디코딩 결과를 그대로 사용합니다.
+        블로킹 작업이므로 워커 스레드에서 호출해야 합니다.
+
+        :param digest: 원본 내용의 SHA-256 해시
+        :param handle: 원본 이미지 핸들
+        :return: 새로 만든 파생 이미지 종류 목록
+        """
+        missing = self.missing(digest)
+        if not missing:
+            return []
+
+        # 캡션용 이미지가 이미 있으면 핸들이 그 이미지를 읽으므로, 방향은 원본 EXIF에서 읽습니다.
+        source = handle.get_reduced_image((self.caption_size, self.caption_size))
+        orientation = handle.get_exif(tags={ORIENTATION_TAG}).get(ORIENTATION_TAG, 1)
+        for variant in missing:
+            if variant == 'caption':
+                img = self._fit(self._to_rgb(source), self.caption_size)
+                self._save(img, digest, variant, format="JPEG", quality=self.caption_quality)
+            elif variant == 'preview':
+                img = self._orient(self._fit(self._to_rgb(source), self.preview_size), orientation)
+                self._save(img, digest, variant, format="WEBP", quality=self.preview_quality, method=4)
+            elif variant == 'display':
+                display_source = handle.get_reduced_image((self.display_max_side, self.display_max_side))
+                img = self._orient(self._fit(self._to_rgb(display_source), self.display_max_side), orientation)
+                self._save(img, digest, variant, format="JPEG", quality=self.display_quality)
+        self.logger.info(f"파생 이미지 생성 완료: {handle.name} ({', '.join(missing)})")
+        return missing
+
+    def _save(self, img: Image.Image, digest: str, variant: str, **save_options) -> None:
+        """
+        파생 이미지를 임시 파일에 쓴 뒤 제자리로 옮깁니다. 동시에 같은 이미지를 만들어도 불완전한 파일이 보이지 않습니다.
+
+        :param img: 저장할 이미지
+        :param digest: 원본 내용의 SHA-256 해시
+        :param variant: 파생 이미지 종류
+        :param save_options: Image.save에 전달할 옵션
+        """
+        fd, temp_path = tempfile.mkstemp(dir=self.folder, prefix=".derivative-", suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                img.save(out, **save_options)
+            os.replace(temp_path, self.path_for(digest, variant))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    @staticmethod
+    def _orient(img: Image.Image, orientation: int) -> Image.Image:
+        """
+        EXIF 방향에 맞게 이미지를 바로 세웁니다.
+
+        :param img: PIL 이미지 객체
+        :param orientation: EXIF Orientation 값
+        :return: 방향을 적용한 이미지
+        """
+        method = ORIENTATION_TRANSPOSE.get(orientation)
+        return img.transpose(method) if method is not None else img
+
+    @staticmethod
+    def _to_rgb(img: Image.Image) -> Image.Image:
+        """
+        이미지를 RGB 모드로 변환합니다.
+
+        :param img: PIL 이미지 객체
+        :return: RGB 이미지
+        """
+        return img if img.mode == 'RGB' else img.convert('RGB')
+
+    @staticmethod
+    def _fit(img: Image.Image, max_side: int) -> Image.Image:
+        """
+        비율을 유지하며 긴 변이 max_side를 넘지 않도록 줄입니다 (확대하지 않음).
+        공유 이미지를 변경하지 않도록 thumbnail 대신 새 이미지를 반환하는 resize를 사용합니다.
+
+        :param img: PIL 이미지 객체
+        :param max_side: 최대 긴 변 크기
+        :return: 크기를 조정한 이미지
+        """
+        scale = max_side / max(img.size)
+        if scale >= 1:
+            return img
+        return img.resize((max(1, round(img.width * scale)), max(1, round(img.height * scale))), Image.LANCZOS)
@@ -0,0 +1,202 @@
+import struct
+import logging
+from typing import AbstractSet, Any, BinaryIO, Dict, Optional, Tuple
+from PIL.TiffImagePlugin import IFDRational
+
+# EXIF 하위 IFD를 가리키는 태그
+EXIF_IFD_TAG = 0x8769
+GPS_IFD_TAG = 0x8825
+
+# APP1(EXIF) 세그먼트를 찾기 위해 읽을 최대 바이트 수
+# EXIF는 SOF/SOS 이전의 APP 세그먼트에 있으므로 파일 앞부분만 확인하면 됩니다.
+MAX_HEADER_BYTES = 256 * 1024
+
+# TIFF 데이터 형식별 (구조체 문자, 바이트 크기)
+TIFF_TYPES = {
+    1: ('B', 1),    # BYTE
+    2: ('s', 1),    # ASCII
+    3: ('H', 2),    # SHORT
+    4: ('L', 4),    # LONG
+    5: ('LL', 8),   # RATIONAL
+    6: ('b', 1),    # SBYTE
+    7: ('s', 1),    # UNDEFINED
+    8: ('h', 2),    # SSHORT
+    9: ('l', 4),    # SLONG
+    10: ('ll', 8),  # SRATIONAL
+    11: ('f', 4),   # FLOAT
+    12: ('d', 8),   # DOUBLE
+}
+
+# 바이너리 값을 갖는 TIFF 데이터 형식 (BYTE, UNDEFINED)
+BINARY_TYPES = (1, 7)
+
+logger = logging.getLogger(__name__)
+
+def read_exif(fp: BinaryIO, tags: Optional[AbstractSet[int]] = None, gps_tags: Optional[AbstractSet[int]] = None,
+              max_binary_bytes: Optional[int] = None) -> Optional[Dict[int, Any]]:
+    """
+    JPEG 파일의 APP1 세그먼트에서 EXIF 정보를 직접 읽습니다.
+    Pillow로 이미지를 열지 않고 헤더 영역만 버퍼 단위로 읽으며,
+    반환값은 Pillow의 Image._getexif()와 같은 구조(태그 번호 키, GPSInfo는 하위 딕셔너리)입니다.
+    tags, gps_tags, max_binary_bytes를 지정하면 해당하지 않는 항목은 값을 해석하지 않고 건너뜁니다.
+
+    :param fp: 파일 시작 위치에 있는 바이너리 파일 객체
+    :param tags: 읽을 태그 번호 (None이면 모든 태그)
+    :param gps_tags: 읽을 GPS 하위 태그 번호 (None이면 모든 GPS 태그)
+    :param max_binary_bytes: 이 크기를 넘는 바이너리 태그는 건너뜁니다 (None이면 제한 없음)
+    :return: EXIF 정보 (EXIF가 없는 JPEG이면 빈 딕셔너리), JPEG가 아니거나 해석할 수 없으면 None
+    """
+    if fp.read(2) != b'\xff\xd8':
+        return None
+
+    position = 2
+    while position < MAX_HEADER_BYTES:
+        marker = fp.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        marker_type = marker[1]
+        position += 2
+        if marker_type == 0xFF:
+            # 채움 바이트는 건너뜁니다.
+            fp.seek(-1, 1)
+            position -= 1
+            continue
+        if marker_type == 0x01 or 0xD0 <= marker_type <= 0xD7:
+            continue
+        if marker_type in (0xDA, 0xD9):
+            # 이미지 데이터(SOS) 이전에 APP1이 없으면 EXIF가 없는 JPEG입니다.
+            return {}
+
+        length_bytes = fp.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = struct.unpack('>H', length_bytes)[0] - 2
+        position += 2 + length
+        if marker_type == 0xE1:
+            segment = fp.read(length)
+            if segment.startswith(b'Exif\x00\x00'):
+                try:
+                    return _parse_tiff(segment[6:], tags, gps_tags, max_binary_bytes)
+                except (struct.error, ValueError, IndexError) as e:
+                    logger.debug(f"EXIF 세그먼트를 해석할 수 없습니다: {e}")
+                    return None
+        else:
+            fp.seek(length, 1)
+    return None
+
+def project_exif(exif: Dict[int, Any], tags: Optional[AbstractSet[int]] = None,
+                 gps_tags: Optional[AbstractSet[int]] = None, max_binary_bytes: Optional[int] = None) -> Dict[int, Any]:
+    """
+    이미 읽은 EXIF 정보(예: Pillow의 _getexif 결과)에서 read_exif와 같은 기준으로 항목을 골라냅니다.
+
+    :param exif: 태그 번호를 키로 하는 EXIF 정보
+    :param tags: 남길 태그 번호 (None이면 모든 태그)
+    :param gps_tags: 남길 GPS 하위 태그 번호 (None이면 모든 GPS 태그)
+    :param max_binary_bytes: 이 크기를 넘는 바이트 값은 제외합니다 (None이면 제한 없음)
+    :return: 선택된 EXIF 정보
+    """
+    def keep(tag: int, value: Any, wanted: Optional[AbstractSet[int]]) -> bool:
+        if wanted is not None and tag not in wanted:
+            return False
+        return not (max_binary_bytes is not None and isinstance(value, bytes) and len(value) > max_binary_bytes)
+
+    projected = {tag: value for tag, value in exif.items() if keep(tag, value, tags)}
+    if isinstance(projected.get(GPS_IFD_TAG), dict):
+        projected[GPS_IFD_TAG] = {tag: value for tag, value in projected[GPS_IFD_TAG].items()
+                                  if keep(tag, value, gps_tags)}
+    return projected
+
+def _parse_tiff(data: bytes, tags: Optional[AbstractSet[int]] = None, gps_tags: Optional[AbstractSet[int]] = None,
+                max_binary_bytes: Optional[int] = None) -> Dict[int, Any]:
+    """
+    TIFF 구조의 EXIF 데이터를 해석하여 IFD0, Exif IFD, GPS IFD를 병합합니다.
+
+    :param data: 'Exif\\0\\0' 다음부터 시작하는 TIFF 데이터
+    :param tags: 읽을 태그 번호 (None이면 모든 태그)
+    :param gps_tags: 읽을 GPS 하위 태그 번호 (None이면 모든 GPS 태그)
+    :param max_binary_bytes: 이 크기를 넘는 바이너리 태그는 건너뜁니다
+    :return: 병합된 EXIF 정보
+    """
+    if data[:2] == b'II':
+        endian = '<'
+    elif data[:2] == b'MM':
+        endian = '>'
+    else:
+        raise ValueError("잘못된 TIFF 바이트 순서")
+    if struct.unpack(endian + 'H', data[2:4])[0] != 42:
+        raise ValueError("잘못된 TIFF 식별자")
+
+    ifd0_offset = struct.unpack(endian + 'L', data[4:8])[0]
+    # 하위 IFD 위치를 알아야 하므로 포인터 태그는 선택 여부와 관계없이 읽습니다.
+    ifd0_tags = None if tags is None else set(tags) | {EXIF_IFD_TAG, GPS_IFD_TAG}
+    exif = _read_ifd(data, ifd0_offset, endian, ifd0_tags, max_binary_bytes)
+
+    exif_ifd = exif.get(EXIF_IFD_TAG)
+    if isinstance(exif_ifd, int):
+        exif.update(_read_ifd(data, exif_ifd, endian, tags, max_binary_bytes))
+        if tags is not None and EXIF_IFD_TAG not in tags:
+            exif.pop(EXIF_IFD_TAG, None)
+    gps_ifd = exif.get(GPS_IFD_TAG)
+    if isinstance(gps_ifd, int):
+        if tags is None or GPS_IFD_TAG in tags:
+            exif[GPS_IFD_TAG] = _read_ifd(data, gps_ifd, endian, gps_tags, max_binary_bytes)
+        else:
+            exif.pop(GPS_IFD_TAG)
+    return exif
+
+def _read_ifd(data: bytes, offset: int, endian: str, tags: Optional[AbstractSet[int]] = None,
+              max_binary_bytes: Optional[int] = None) -> Dict[int, Any]:
+    """
+    IFD 하나의 항목을 읽습니다.
+
+    :param data: TIFF 데이터
+    :param offset: IFD 시작 위치
+    :param endian: 구조체 바이트 순서 ('<' 또는 '>')
+    :param tags: 읽을 태그 번호 (None이면 모든 태그)
+    :param max_binary_bytes: 이 크기를 넘는 바이너리 태그는 건너뜁니다
+    :return: 태그 번호를 키로 하는 값 딕셔너리
+    """
+    entries = {}
+    count = struct.unpack(endian + 'H', data[offset:offset + 2])[0]
+    for i in range(count):
+        entry = offset + 2 + i * 12
+        tag, value_type, value_count = struct.unpack(endian + 'HHL', data[entry:entry + 8])
+        if value_type not in TIFF_TYPES or (tags is not None and tag not in tags):
+            continue
+        fmt, size = TIFF_TYPES[value_type]
+        total = size * value_count
+        if max_binary_bytes is not None and value_type in BINARY_TYPES and total > max_binary_bytes:
+            continue
+        if total <= 4:
+            raw = data[entry + 8:entry + 8 + total]
+        else:
+            value_offset = struct.unpack(endian + 'L', data[entry + 8:entry + 12])[0]
+            raw = data[value_offset:value_offset + total]
+            if len(raw) < total:
+                continue
+        entries[tag] = _decode_value(raw, value_type, value_count, fmt, endian)
+    return entries
+
+def _decode_value(raw: bytes, value_type: int, value_count: int, fmt: str, endian: str) -> Any:
+    """
+    IFD 항목의 원시 바이트를 Pillow와 같은 형태의 파이썬 값으로 변환합니다.
+
+    :param raw: 값 바이트
+    :param value_type: TIFF 데이터 형식 번호
+    :param value_count: 값 개수
+    :param fmt: 구조체 문자
+    :param endian: 구조체 바이트 순서
+    :return: 문자열, 바이트, 정수/실수/IFDRational 또는 그 튜플
+    """
+    if value_type == 2:
+        return raw.split(b'\x00', 1)[0].decode('utf-8', errors='replace')
+    if value_type in BINARY_TYPES:
+        return raw
+
+    values: Tuple[Any, ...]
+    if value_type in (5, 10):
+        numbers = struct.unpack(endian + fmt[0] * (2 * value_count), raw)
+        values = tuple(IFDRational(numbers[i], numbers[i + 1]) for i in range(0, len(numbers), 2))
+    else:
+        values = struct.unpack(endian + fmt * value_count, raw)
+    return values[0] if len(values) == 1 else values
@@ -0,0 +1,171 @@
+from collections import OrderedDict
+from concurrent.futures import Future
+import json
+import sqlite3
+import threading
+import time
+import logging
+from typing import Any, Callable, Dict, Optional
+
+class GeocodeCache:
+    def __init__(self, precision: int = 3, max_entries: int = 10000, db_path: Optional[str] = None,
+                 namespace: str = ""):
+        """
+        GeocodeCache 클래스 초기화
+        좌표를 지정한 소수점 자릿수로 양자화한 키로 역지오코딩 결과를 캐시합니다.
+        (소수점 3자리 ≈ 110m, 4자리 ≈ 11m)
+        프로세스 내 LRU 캐시, 여러 워커가 공유하는 SQLite 캐시, 진행 중인 조회의 병합(coalescing)을 제공합니다.
+
+        :param precision: 좌표 양자화 소수점 자릿수
+        :param max_entries: 메모리 LRU 캐시의 최대 항목 수
+        :param db_path: SQLite 캐시 파일 경로 (None이면 메모리 캐시만 사용)
+        :param namespace: 캐시 키 접두어 (지오코딩 방식별로 결과를 구분할 때 사용)
+        """
+        self.precision = precision
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self.logger = logging.getLogger(__name__)
+        self._entries: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'persistent_hits': 0, 'coalesced': 0, 'misses': 0, 'miss_seconds': 0.0}
+
+        self._conn = None
+        if db_path:
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS geocode (key TEXT PRIMARY KEY, result TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+            self._db_lock = threading.Lock()
+
+    def quantize(self, lat: float, lon: float) -> str:
+        """
+        좌표를 캐시 키로 양자화합니다.
+
+        :param lat: 위도
+        :param lon: 경도
+        :return: "위도,경도" 형식의 캐시 키 (namespace가 있으면 "namespace:위도,경도")
+        """
+        key = f"{lat:.{self.precision}f},{lon:.{self.precision}f}"
+        return f"{self.namespace}:{key}" if self.namespace else key
+
+    def get_or_resolve(self, lat: float, lon: float,
+                       resolver: Callable[[float, float], Dict[str, str]],
+                       cacheable: Optional[Callable[[Dict[str, str]], bool]] = None) -> Dict[str, str]:
+        """
+        캐시에서 위치 정보를 찾고, 없으면 resolver로 조회한 뒤 저장합니다.
+        같은 키를 동시에 조회하는 요청은 하나의 조회 결과를 공유합니다.
+        빈 결과(조회 실패)와 cacheable이 거부한 결과는 저장하지 않으므로 다음 요청에서 다시 조회합니다.
+
+        :param lat: 위도
+        :param lon: 경도
+        :param resolver: 캐시에 없을 때 호출할 조회 함수 (lat, lon) -> 위치 정보
+        :param cacheable: 결과를 저장할지 판단하는 함수 (일시적인 오류로 대신한 결과는 저장하지 않도록 할 때 사용)
+        :return: 위치 정보
+        """
+        key = self.quantize(lat, lon)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return dict(self._entries[key])
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self._stats['coalesced'] += 1
+
+        if not owner:
+            return dict(future.result())
+
+        try:
+            result = self._load_persistent(key)
+            store = result is not None
+            if result is not None:
+                with self._lock:
+                    self._stats['persistent_hits'] += 1
+            else:
+                started_at = time.monotonic()
+                result = resolver(lat, lon)
+                with self._lock:
+                    self._stats['misses'] += 1
+                    self._stats['miss_seconds'] += time.monotonic() - started_at
+                store = bool(result) and (cacheable is None or cacheable(result))
+                if store:
+                    self._save_persistent(key, result)
+
+            if store:
+                with self._lock:
+                    self._entries[key] = result
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+            future.set_result(result)
+            return dict(result)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        캐시 적중률과 절약한 시간을 반환합니다.
+        절약한 시간은 실제 조회의 평균 소요 시간 × (캐시 적중 + 병합된 조회 수)로 추정합니다.
+
+        :return: 캐시 통계
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            entries = len(self._entries)
+        saved_lookups = stats['hits'] + stats['persistent_hits'] + stats['coalesced']
+        total = saved_lookups + stats['misses']
+        average_miss = stats['miss_seconds'] / stats['misses'] if stats['misses'] else 0.0
+        return {
+            'precision': self.precision,
+            'entries': entries,
+            'hits': stats['hits'],
+            'persistent_hits': stats['persistent_hits'],
+            'coalesced': stats['coalesced'],
+            'misses': stats['misses'],
+            'hit_rate': round(saved_lookups / total, 4) if total else 0.0,
+            'average_lookup_seconds': round(average_miss, 4),
+            'time_saved_seconds': round(saved_lookups * average_miss, 3)
+        }
+
+    def _load_persistent(self, key: str) -> Optional[Dict[str, str]]:
+        """
+        SQLite 캐시에서 위치 정보를 불러옵니다.
+
+        :param key: 캐시 키
+        :return: 위치 정보, 없으면 None
+        """
+        if self._conn is None:
+            return None
+        with self._db_lock:
+            row = self._conn.execute("SELECT result FROM geocode WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _save_persistent(self, key: str, result: Dict[str, str]) -> None:
+        """
+        SQLite 캐시에 위치 정보를 저장합니다.
+
+        :param key: 캐시 키
+        :param result: 위치 정보
+        """
+        if self._conn is None:
+            return
+        try:
+            with self._db_lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO geocode (key, result, created_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(result, ensure_ascii=False), time.time())
+                )
+        except sqlite3.Error as e:
+            self.logger.warning(f"지오코딩 캐시를 저장하지 못했습니다: {e}")
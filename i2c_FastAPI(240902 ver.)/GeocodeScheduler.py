@@ -0,0 +1,183 @@
+from concurrent.futures import Future, TimeoutError as FuturesTimeoutError
+import queue
+import threading
+import time
+import logging
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+from geopy.exc import GeocoderTimedOut, GeocoderUnavailable
+
+# 재시도할 지오코딩 예외 (일시적인 오류)
+RETRYABLE_EXCEPTIONS: Tuple[Type[BaseException], ...] = (GeocoderTimedOut, GeocoderUnavailable)
+
+class GeocodeScheduler:
+    def __init__(self, resolver: Callable[[float, float], Any], requests_per_second: float = 1.0,
+                 max_retries: int = 2):
+        """
+        GeocodeScheduler 클래스 초기화
+        모든 요청의 역지오코딩 조회를 하나의 큐에 모아 전용 스레드에서 순서대로 처리합니다.
+        전역 초당 요청 수(Nominatim 사용 정책은 초당 1회)를 지키고, 같은 좌표의 진행 중인 조회는 하나로 합칩니다.
+
+        :param resolver: 실제 조회 함수 (lat, lon) -> 역지오코딩 결과
+        :param requests_per_second: 초당 최대 조회 수
+        :param max_retries: 시간 초과 등 일시적인 오류가 났을 때 다시 시도할 횟수
+        """
+        self.resolver = resolver
+        self.min_interval = 1.0 / requests_per_second
+        self.max_retries = max_retries
+        self.logger = logging.getLogger(__name__)
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._inflight: Dict[Tuple[float, float], Future] = {}
+        self._lock = threading.Lock()
+        self._next_request_at = 0.0
+        self._stats = {'submitted': 0, 'deduplicated': 0, 'requests': 0, 'retries': 0, 'failed': 0, 'shed': 0,
+                       'timed_out': 0}
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="geocode-scheduler", daemon=True)
+        self._thread.start()
+
+    def submit(self, lat: float, lon: float) -> Future:
+        """
+        좌표 조회를 예약합니다. 같은 좌표를 조회 중이면 그 Future를 그대로 반환합니다.
+
+        :param lat: 위도
+        :param lon: 경도
+        :return: 역지오코딩 결과를 담을 Future
+        """
+        key = (lat, lon)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("지오코딩 스케줄러가 종료되었습니다.")
+            self._stats['submitted'] += 1
+            future = self._inflight.get(key)
+            if future is not None:
+                self._stats['deduplicated'] += 1
+                return future
+            future = Future()
+            self._inflight[key] = future
+        self._queue.put((key, 0))
+        return future
+
+    def resolve(self, lat: float, lon: float, max_wait: Optional[float] = None, request_timeout: float = 0.0) -> Any:
+        """
+        좌표 조회를 예약하고 결과를 기다립니다.
+        큐 길이와 요청 간격으로 계산한 예상 시간까지만 기다리며, 예상 시간이 max_wait를 넘으면 예약하지 않고
+        바로 실패합니다. 사진이 많은 앨범이 큐를 채워도 호출한 스레드가 큐에 묶여 있지 않도록 하기 위함입니다.
+        기다리다 포기한 조회는 큐에 남아 끝까지 실행됩니다 (같은 좌표를 기다리는 다른 요청이 있을 수 있음).
+
+        :param lat: 위도
+        :param lon: 경도
+        :param max_wait: 최대 대기 시간(초) (None이면 예상 시간만큼 기다림)
+        :param request_timeout: 요청 하나의 응답 대기 시간 제한(초)
+        :return: 역지오코딩 결과
+        :raises concurrent.futures.TimeoutError: 예상 대기 시간이 max_wait를 넘거나 결과가 제때 나오지 않은 경우
+        """
+        bound = self.estimated_wait(request_timeout)
+        if max_wait is not None and bound > max_wait:
+            with self._lock:
+                self._stats['shed'] += 1
+            raise FuturesTimeoutError(f"지오코딩 대기열이 깁니다 (예상 대기 {bound:.1f}초 > {max_wait:.1f}초)")
+        try:
+            return self.submit(lat, lon).result(timeout=bound)
+        except FuturesTimeoutError:
+            with self._lock:
+                self._stats['timed_out'] += 1
+            raise FuturesTimeoutError(f"지오코딩 결과를 {bound:.1f}초 안에 받지 못했습니다.")
+
+    def estimated_wait(self, request_timeout: float = 0.0) -> float:
+        """
+        지금 조회를 예약하면 결과가 나올 때까지 걸릴 시간의 상한을 추정합니다.
+        앞에 있는 조회 수와 일시적인 오류의 재시도 횟수만큼 요청 간격(또는 요청 시간 제한 중 긴 쪽)을 더합니다.
+
+        :param request_timeout: 요청 하나의 응답 대기 시간 제한(초)
+        :return: 예상 대기 시간(초)
+        """
+        with self._lock:
+            pending = len(self._inflight)
+        remaining = max(0.0, self._next_request_at - time.monotonic())
+        return remaining + (pending + 1 + self.max_retries) * max(self.min_interval, request_timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        스케줄러 처리 통계를 반환합니다.
+
+        :return: 대기 중인 조회 수, 실제 요청 수, 병합·재시도·실패 횟수,
+                 대기열이 길어 예약하지 않은 조회 수(shed)와 기다리다 포기한 조회 수(timed_out)
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['pending'] = len(self._inflight)
+        stats['requests_per_second'] = round(1.0 / self.min_interval, 3)
+        return stats
+
+    def shutdown(self) -> None:
+        """
+        스케줄러 스레드를 종료하고 처리하지 못한 조회는 실패로 처리합니다.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+        with self._lock:
+            pending = list(self._inflight.values())
+            self._inflight.clear()
+        for future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("지오코딩 스케줄러가 종료되었습니다."))
+
+    def _run(self) -> None:
+        """
+        큐에서 조회를 하나씩 꺼내 요청 간격을 지키며 실행합니다.
+        일시적인 오류는 큐 끝에 다시 넣어 재시도하므로 재시도도 같은 요청 간격을 따릅니다.
+        """
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            key, attempt = item
+            with self._lock:
+                future = self._inflight.get(key)
+            if future is None:
+                continue
+
+            wait = self._next_request_at - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._next_request_at = time.monotonic() + self.min_interval
+
+            try:
+                with self._lock:
+                    self._stats['requests'] += 1
+                result = self.resolver(*key)
+            except RETRYABLE_EXCEPTIONS as e:
+                if attempt < self.max_retries and not self._closed:
+                    self.logger.warning(f"지오코딩 재시도 {attempt + 1}/{self.max_retries}: {e}")
+                    with self._lock:
+                        self._stats['retries'] += 1
+                    self._queue.put((key, attempt + 1))
+                    continue
+                self._finish(key, exception=e)
+            except Exception as e:
+                self._finish(key, exception=e)
+            else:
+                self._finish(key, result=result)
+
+    def _finish(self, key: Tuple[float, float], result: Any = None, exception: BaseException = None) -> None:
+        """
+        조회 결과를 Future에 전달하고 진행 중인 조회 목록에서 제거합니다.
+
+        :param key: 좌표
+        :param result: 조회 결과
+        :param exception: 조회 중 발생한 예외
+        """
+        with self._lock:
+            future = self._inflight.pop(key, None)
+            if exception is not None:
+                self._stats['failed'] += 1
+        if future is None:
+            return
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
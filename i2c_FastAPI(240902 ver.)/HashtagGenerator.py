@@ -0,0 +1,280 @@
+import re
+import math
+import logging
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+from hashtag_corpus import (
+    CORPUS_DOCUMENT_COUNT, DOCUMENT_FREQUENCIES, STYLE_HASHTAGS, PARTICLES, AMBIGUOUS_PARTICLES, HA_ENDINGS,
+    PREDICATE_ENDINGS, STOPWORDS
+)
+
+try:
+    from kiwipiepy import Kiwi
+except ImportError:  # 형태소 분석기가 없으면 규칙 기반 토크나이저를 사용합니다.
+    Kiwi = None
+
+# 한글 단어, 영문 단어(숫자 포함), 숫자를 각각 하나의 토큰 후보로 봅니다.
+_TOKEN_PATTERN = re.compile(r'[가-힣]+|[A-Za-z][A-Za-z0-9]*|[0-9]+')
+_HASHTAG_INVALID = re.compile(r'[^0-9A-Za-z가-힣_]')
+
+# 한글 음절의 받침 번호는 (코드 - 0xAC00) % 28입니다 (0이면 받침 없음).
+_HANGUL_BASE = 0xAC00
+
+class HashtagGenerator:
+    # 출처별 단어 가중치 (캡션은 짧지만 이미지 내용을 직접 설명하므로 글보다 높게 봅니다)
+    SOURCE_WEIGHTS = {'caption': 1.5, 'story': 1.0}
+
+    # 연속한 두 단어(예: 서핑 보드 -> #서핑보드)는 이 횟수 이상 나와야 후보가 되며, 점수에 가중치를 곱합니다.
+    MIN_BIGRAM_COUNT = 2
+    BIGRAM_WEIGHT = 1.2
+
+    # 위치(도시, 국가) 해시태그의 최대 개수
+    MAX_LOCATION_TAGS = 2
+
+    # 형태소 분석 결과에서 해시태그 후보로 쓰는 품사 (일반 명사, 고유 명사, 외국어)
+    NOUN_TAGS = ('NNG', 'NNP', 'SL')
+
+    # 형태소 분석기는 불러오는 데 수백 밀리초가 걸리고 메모리를 많이 쓰므로 프로세스에서 하나만 만들어 공유합니다.
+    _shared_analyzer = None
+    _analyzer_lock = threading.Lock()
+
+    def __init__(self, count: int = 5, document_frequencies: Optional[Mapping[str, int]] = None,
+                 document_count: Optional[int] = None, use_analyzer: bool = True):
+        """
+        HashtagGenerator 클래스 초기화
+        API 호출 없이 글, 캡션, 위치 정보, 글쓰기 스타일에서 해시태그를 만듭니다.
+        kiwipiepy 형태소 분석기가 설치되어 있으면 명사만 뽑고, 없으면 조사와 어미를 떼어 내는 규칙 기반 토크나이저를 사용합니다.
+        단어와 연속한 두 단어(bigram)를 말뭉치 문서 빈도 표에 대한 TF-IDF로 점수를 매겨 고릅니다.
+        사전과 문서 빈도 표(와 형태소 분석기)는 메모리에 올려 두므로 요청마다 수 밀리초 안에 끝납니다.
+
+        :param count: 만들 해시태그 수
+        :param document_frequencies: 단어별 문서 빈도 표 (기본값: hashtag_corpus.DOCUMENT_FREQUENCIES)
+        :param document_count: 문서 빈도 표를 계산한 말뭉치의 문서 수 (기본값: hashtag_corpus.CORPUS_DOCUMENT_COUNT)
+        :param use_analyzer: 형태소 분석기가 설치되어 있을 때 사용할지 여부 (False이면 항상 규칙 기반 토크나이저를 사용)
+        """
+        self.count = count
+        self.document_frequencies = document_frequencies if document_frequencies is not None else DOCUMENT_FREQUENCIES
+        self.document_count = document_count or CORPUS_DOCUMENT_COUNT
+        self.use_analyzer = use_analyzer and Kiwi is not None
+        self.logger = logging.getLogger(__name__)
+        if use_analyzer and Kiwi is None:
+            self.logger.warning("kiwipiepy is not installed; local hashtags use the rule-based tokenizer")
+
+    @property
+    def nouns_only(self) -> bool:
+        """
+        형태소 분석기로 명사만 뽑는지 여부
+        규칙 기반 토크나이저는 어미 목록에 없는 서술어(예: 보니)를 놓칠 수 있으므로 False입니다.
+
+        :return: 형태소 분석기를 사용하면 True
+        """
+        return self.use_analyzer
+
+    def generate(self, story: str = "", captions: Iterable[str] = (), locations: Iterable[Mapping[str, Any]] = (),
+                 writing_style: Optional[str] = None) -> List[str]:
+        """
+        해시태그를 만듭니다.
+        위치(도시, 국가) 해시태그를 먼저 넣고, TF-IDF 점수가 높은 키워드로 채운 뒤,
+        남는 자리가 있으면 글쓰기 스타일 해시태그를 붙입니다 (스타일 해시태그는 최소 한 자리를 남겨 둡니다).
+
+        :param story: 생성된 글 (아직 없으면 빈 문자열)
+        :param captions: 이미지 캡션 목록
+        :param locations: 이미지별 위치 정보 ('city', 'country' 키 사용)
+        :param writing_style: 글쓰기 스타일
+        :return: '#'으로 시작하는 해시태그 목록 (최대 count개)
+        """
+        tags: List[str] = []
+        for location_info in locations:
+            for key in ('city', 'country'):
+                self._add_tag(tags, location_info.get(key) or '', self.MAX_LOCATION_TAGS)
+
+        style_tags = STYLE_HASHTAGS.get(writing_style, [])
+        keyword_limit = self.count - 1 if style_tags else self.count
+        for keyword in self.rank_keywords(story, captions):
+            if len(tags) >= keyword_limit:
+                break
+            self._add_tag(tags, keyword, keyword_limit)
+
+        for style_tag in style_tags:
+            self._add_tag(tags, style_tag, self.count)
+        return tags
+
+    def rank_keywords(self, story: str = "", captions: Iterable[str] = ()) -> List[str]:
+        """
+        글과 캡션의 단어와 두 단어 조합을 TF-IDF 점수 순으로 정렬합니다.
+
+        :param story: 생성된 글
+        :param captions: 이미지 캡션 목록
+        :return: 점수가 높은 순의 키워드 목록
+        """
+        unigrams: Counter = Counter()
+        bigrams: Counter = Counter()
+        bigram_counts: Counter = Counter()
+        sources = [(caption, self.SOURCE_WEIGHTS['caption']) for caption in captions]
+        sources.append((story, self.SOURCE_WEIGHTS['story']))
+        for text, weight in sources:
+            # 문장 경계를 넘는 두 단어는 조합으로 보지 않습니다.
+            for sentence in re.split(r'[.!?\n]+', text or ''):
+                tokens = self.tokenize(sentence)
+                for token in tokens:
+                    unigrams[token] += weight
+                for first, second in zip(tokens, tokens[1:]):
+                    if first != second:
+                        bigrams[(first, second)] += weight
+                        bigram_counts[(first, second)] += 1
+
+        scores: Dict[str, float] = {}
+        for token, tf in unigrams.items():
+            scores[token] = tf * self.idf(token)
+        for (first, second), tf in bigrams.items():
+            if bigram_counts[(first, second)] >= self.MIN_BIGRAM_COUNT:
+                idf = (self.idf(first) + self.idf(second)) / 2
+                scores[first + second] = max(scores.get(first + second, 0.0), tf * idf * self.BIGRAM_WEIGHT)
+        return [keyword for keyword, _ in sorted(scores.items(), key=lambda item: (-item[1], item[0]))]
+
+    def tokenize(self, text: str) -> List[str]:
+        """
+        문장을 해시태그 후보 단어로 나눕니다.
+        형태소 분석기를 사용하면 명사와 외국어 단어만 뽑습니다.
+        규칙 기반 토크나이저는 한글 단어 끝의 조사와 '-하다' 어미를 떼고 (문서 빈도 표에 있는 단어는 그대로 둡니다, 예: 바닷가),
+        서술어(예: 아름답습니다, 걸어가고, 보냈다, 예쁜)는 버립니다.
+        한 글자 한글 단어, 세 글자 미만의 영문 단어(소문자로 바꿉니다), 숫자만으로 된 단어는 버립니다.
+
+        :param text: 문장
+        :return: 단어 목록
+        """
+        analyzer = self._get_analyzer() if self.use_analyzer else None
+        if analyzer is not None:
+            words = [token.form for token in analyzer.tokenize(text) if token.tag in self.NOUN_TAGS]
+        else:
+            words = _TOKEN_PATTERN.findall(text)
+        tokens = []
+        for word in words:
+            if word.isdigit():
+                continue
+            if '가' <= word[0] <= '힣':
+                word = word if analyzer is not None else self._strip_korean_suffix(word)
+                if word is None or len(word) < 2:
+                    continue
+            else:
+                word = word.lower()
+                if len(word) < 3:
+                    continue
+            if word not in STOPWORDS:
+                tokens.append(word)
+        return tokens
+
+    def idf(self, term: str) -> float:
+        """
+        말뭉치 문서 빈도로 단어의 IDF를 계산합니다. 표에 없는 단어는 한 문서에만 나온 것으로 봅니다.
+
+        :param term: 단어
+        :return: IDF 값
+        """
+        document_frequency = self.document_frequencies.get(term, 1)
+        return math.log((self.document_count + 1) / (document_frequency + 1)) + 1
+
+    @staticmethod
+    def to_hashtag(text: str) -> str:
+        """
+        공백과 기호를 없애고 '#'을 붙입니다.
+
+        :param text: 해시태그로 만들 문자열
+        :return: 해시태그 (남는 글자가 없으면 빈 문자열)
+        """
+        word = _HASHTAG_INVALID.sub('', text.lstrip('#'))
+        return f"#{word}" if word else ''
+
+    @staticmethod
+    def build_document_frequencies(documents: Iterable[str],
+                                   tokenize: Optional[Callable[[str], List[str]]] = None) -> Tuple[int, Dict[str, int]]:
+        """
+        말뭉치에서 문서 빈도 표를 계산합니다. 결과는 hashtag_corpus.py의 CORPUS_DOCUMENT_COUNT와 DOCUMENT_FREQUENCIES로 저장합니다.
+
+        :param documents: 글 목록
+        :param tokenize: 토크나이저 (기본값: HashtagGenerator().tokenize)
+        :return: (문서 수, 단어별 문서 빈도)
+        """
+        tokenize = tokenize or HashtagGenerator().tokenize
+        document_count = 0
+        frequencies: Counter = Counter()
+        for document in documents:
+            document_count += 1
+            frequencies.update(set(tokenize(document)))
+        return document_count, dict(frequencies)
+
+    def _add_tag(self, tags: List[str], text: str, limit: int) -> None:
+        """
+        해시태그 목록에 새 해시태그를 추가합니다.
+        이미 있는 해시태그와 같거나 한쪽이 다른 쪽을 포함하면 (예: #서핑과 #서핑보드) 추가하지 않습니다.
+
+        :param tags: 해시태그 목록
+        :param text: 추가할 단어
+        :param limit: 목록의 최대 길이
+        """
+        tag = self.to_hashtag(text)
+        if not tag or len(tags) >= limit:
+            return
+        if any(tag[1:] in existing or existing[1:] in tag for existing in tags):
+            return
+        tags.append(tag)
+
+    @classmethod
+    def _get_analyzer(cls) -> Optional[Any]:
+        """
+        프로세스에서 공유하는 형태소 분석기를 (처음 호출할 때) 만들어 돌려줍니다.
+
+        :return: kiwipiepy.Kiwi 객체 (설치되어 있지 않으면 None)
+        """
+        if cls._shared_analyzer is None and Kiwi is not None:
+            with cls._analyzer_lock:
+                if cls._shared_analyzer is None:
+                    cls._shared_analyzer = Kiwi()
+        return cls._shared_analyzer
+
+    def _strip_korean_suffix(self, word: str) -> Optional[str]:
+        """
+        한글 단어 끝의 '-하다' 어미나 조사를 떼어 냅니다 (규칙 기반 토크나이저).
+        서술어인지는 조사를 뗀 뒤에 확인하므로 '먹었다는'처럼 조사가 붙은 서술어도 버립니다.
+        문서 빈도 표에 있는 단어는 (조사를 뗀 뒤라도) 명사로 보고 그대로 둡니다.
+        조사와 모양이 같은 관형형 어미(예: 마시는, 맑은, 따뜻한)는 떼고 남은 단어가 표에 있을 때만 명사로 봅니다.
+
+        :param word: 한글 단어
+        :return: 떼어 낸 단어, 서술어로 보이면 None
+        """
+        if word in self.document_frequencies:
+            return word
+        for ending in HA_ENDINGS:
+            if word.endswith(ending) and len(word) - len(ending) >= 2:
+                stem = word[:-len(ending)]
+                # '-한'은 형용사의 관형형(예: 따뜻한, 잔잔한)이기도 하므로 표에 있는 명사(예: 산책한)만 남깁니다.
+                return stem if ending != '한' or stem in self.document_frequencies else None
+        stem, particle = word, ''
+        for candidate in PARTICLES:
+            if word.endswith(candidate) and len(word) > len(candidate):
+                stem, particle = word[:-len(candidate)], candidate
+                break
+        if stem in self.document_frequencies:
+            return stem
+        if particle in AMBIGUOUS_PARTICLES:
+            return None
+        if len(stem) < 2:
+            # 조사를 떼고 한 글자만 남으면 두 글자 이상의 조사와 명사 끝에 잘 오지 않는 조사(예: 주에도, 위를, 집에)만
+            # 조사로 보고, 나머지는 명사의 끝 글자로 봅니다 (예: 도로, 포도, 아이).
+            return None if len(particle) > 1 or particle in ('을', '를', '에', '의') else word
+        return None if self._is_predicate(stem) else stem
+
+    @staticmethod
+    def _is_predicate(word: str) -> bool:
+        """
+        단어가 서술어(동사/형용사의 활용형)로 보이는지 확인합니다.
+
+        :param word: 조사를 뗀 한글 단어
+        :return: 종결, 연결, 관형형 어미로 끝나면 (예: 보냈다, 만났죠, 걸어가고, 예쁜) True
+        """
+        if word.endswith(PREDICATE_ENDINGS):
+            return True
+        # 받침 있는 음절 뒤의 '-아'는 연결 어미입니다 (예: 앉아, 잡아). 외래어 명사는 받침 없는 음절 뒤에 옵니다 (예: 아시아).
+        return (len(word) >= 2 and word[-1] == '아' and '가' <= word[-2] <= '힣'
+                and (ord(word[-2]) - _HANGUL_BASE) % 28 != 0)
@@ -1,46 +1,220 @@
 from PIL import Image
-import io
-import base64
-from openai import OpenAI
+import asyncio
+import json
+import threading
 import logging
+from ImageHandle import ImageHandle
+from ImageEncoder import ImageEncoder
+from CaptionBatcher import CaptionBatcher
+from CaptionCache import CaptionCache
+from OpenAIClients import OpenAIClients
 
 class ImageCaptionGenerator:
-    def __init__(self, openai_api_key):
+    # 캡션 생성에 실패했을 때 반환하는 문구
+    CAPTION_ERROR_MESSAGE = "캡션을 생성할 수 없습니다."
+
+    # 캡션 생성에 사용하는 모델
+    MODEL = "gpt-4o-mini"
+
+    # API에 보내는 이미지의 최대 크기 (OpenAI API 권장 최대 크기)
+    MAX_IMAGE_SIZE = (512, 512)
+
+    # 캡션 API 호출의 응답 대기 시간 제한(초)
+    REQUEST_TIMEOUT = 30.0
+
+    # 이미지 한 장당 캡션 응답에 허용하는 최대 토큰 수
+    MAX_CAPTION_TOKENS = 300
+
+    def __init__(self, openai_api_key, caption_cache=None, fast_resize=True, clients=None,
+                 batch_size=1, batch_wait_seconds=0.05, max_concurrent_batches=4,
+                 adaptive_encoding=True, token_budget=None, max_image_bytes=None):
         """
         ImageCaptionGenerator 클래스 초기화
+        OpenAI 클라이언트는 스레드 안전하므로 인스턴스를 여러 스레드에서 공유할 수 있습니다.
         
         :param openai_api_key: OpenAI API 키
+        :param caption_cache: 캡션 캐시 (None이면 매번 API를 호출)
+        :param fast_resize: True이면 JPEG을 목표 크기에 가까운 해상도로 축소 디코딩(draft)한 뒤 리샘플링합니다
+        :param clients: 공유 OpenAIClients (None이면 새로 생성)
+        :param batch_size: 2 이상이면 동시에 들어온 캡션 요청을 최대 batch_size장씩 묶어 한 번의 API 요청으로 생성합니다
+        :param batch_wait_seconds: 묶음을 채우기 위해 기다리는 최대 시간(초)
+        :param max_concurrent_batches: 동시에 진행할 묶음 요청 수
+        :param adaptive_encoding: True이면 장면의 복잡도와 예산에 따라 이미지별로 해상도, JPEG 품질, detail 수준을 정합니다
+        :param token_budget: 이미지당 최대 입력 토큰 (None이면 high detail 타일 1개 분량)
+        :param max_image_bytes: 이미지당 최대 전송 바이트 (None이면 제한 없음)
         """
-        self.client = OpenAI(api_key=openai_api_key)
+        clients = clients or OpenAIClients(openai_api_key)
+        self.client = clients.client
+        self.async_client = clients.async_client
+        self.caption_cache = caption_cache
+        self.fast_resize = fast_resize
         self.logger = logging.getLogger(__name__)
+        self.encoder = ImageEncoder(self.MODEL, adaptive_encoding, token_budget, max_image_bytes, self.MAX_IMAGE_SIZE)
+        self._encoding_stats = {'images': 0, 'bytes': 0, 'estimated_tokens': 0, 'low': 0, 'high': 0, 'auto': 0}
+        self._stats_lock = threading.Lock()
+        self.batcher = CaptionBatcher(
+            self._get_captions_from_api, batch_size, batch_wait_seconds, max_concurrent_batches
+        ) if batch_size > 1 else None
 
-    def generate_caption(self, image_path, metadata):
+    def generate_caption(self, image, metadata, encoding_info=None):
         """
         이미지에 대한 캡션을 생성합니다.
         
-        :param image_path: 이미지 파일 경로
+        :param image: 이미지 파일 경로 또는 ImageHandle
+        :param metadata: 이미지 메타데이터
+        :param encoding_info: 전달하면 보낸 이미지의 detail, 크기, 품질, 바이트 수, 추정 토큰 수를 채워 넣습니다
+        :return: 생성된 캡션
+        """
+        try:
+            encoded, prompt = self._prepare_request(image, metadata)
+            cache_key, caption = self._lookup_cache(encoded, prompt, self._source_digest(image))
+            self._report_encoding(encoded, caption is not None, encoding_info)
+            if caption is None:
+                if self.batcher is not None:
+                    # 다른 이미지의 요청과 묶어서 생성합니다.
+                    caption = self.batcher.submit((encoded, prompt, metadata)).result()
+                else:
+                    caption = self._get_caption_from_api(prompt, encoded)
+                self._store_cache(cache_key, caption)
+            return caption
+        except Exception as e:
+            self.logger.error(f"캡션 생성 중 오류 발생: {e}")
+            return self.CAPTION_ERROR_MESSAGE
+
+    def shutdown(self):
+        """
+        캡션 묶음 처리기를 정리합니다.
+        """
+        if self.batcher is not None:
+            self.batcher.shutdown()
+
+    def encoding_stats(self):
+        """
+        API로 보낸 이미지의 누적 전송량과 추정 토큰 수를 반환합니다 (캐시에서 찾은 캡션은 제외).
+        
+        :return: 이미지 수, 바이트 수, 추정 토큰 수, detail별 이미지 수와 이미지당 평균
+        """
+        with self._stats_lock:
+            stats = dict(self._encoding_stats)
+        images = stats['images']
+        stats['average_bytes'] = stats['bytes'] // images if images else 0
+        stats['average_estimated_tokens'] = stats['estimated_tokens'] // images if images else 0
+        return stats
+
+    async def agenerate_caption(self, image, metadata, encoding_info=None):
+        """
+        generate_caption의 비동기 버전입니다.
+        이미지 디코딩/리사이즈와 캐시 조회는 스레드에서, API 호출은 비동기 클라이언트로 실행하므로
+        API 응답을 기다리는 동안 스레드를 점유하지 않습니다.
+        
+        :param image: 이미지 파일 경로 또는 ImageHandle
         :param metadata: 이미지 메타데이터
+        :param encoding_info: 전달하면 보낸 이미지의 인코딩 정보를 채워 넣습니다
         :return: 생성된 캡션
         """
         try:
-            base64_image = self._process_image(image_path)
-            prompt = self._create_prompt(metadata)
-            return self._get_caption_from_api(prompt, base64_image)
+            encoded, prompt = await asyncio.to_thread(self._prepare_request, image, metadata)
+            cache_key, caption = await asyncio.to_thread(self._lookup_cache, encoded, prompt, self._source_digest(image))
+            self._report_encoding(encoded, caption is not None, encoding_info)
+            if caption is None:
+                caption = await self._aget_caption_from_api(prompt, encoded)
+                await asyncio.to_thread(self._store_cache, cache_key, caption)
+            return caption
         except Exception as e:
             self.logger.error(f"캡션 생성 중 오류 발생: {e}")
-            return "캡션을 생성할 수 없습니다."
+            return self.CAPTION_ERROR_MESSAGE
 
-    def _process_image(self, image_path):
+    def _prepare_request(self, image, metadata):
         """
-        이미지를 처리하여 base64 인코딩된 문자열로 변환합니다.
+        API에 보낼 이미지와 프롬프트를 준비합니다.
         
-        :param image_path: 이미지 파일 경로
-        :return: base64 인코딩된 이미지 문자열
+        :param image: 이미지 파일 경로 또는 ImageHandle
+        :param metadata: 이미지 메타데이터
+        :return: (인코딩된 이미지, 프롬프트)
         """
-        with Image.open(image_path) as img:
-            img = self._convert_to_rgb(img)
-            img = self._resize_image(img)
-            return self._image_to_base64(img)
+        if isinstance(image, ImageHandle):
+            encoded = self._process_image(image)
+        else:
+            with ImageHandle(image) as handle:
+                encoded = self._process_image(handle)
+        return encoded, self._create_prompt(metadata)
+
+    def _lookup_cache(self, encoded, prompt, source_digest=None):
+        """
+        같은 이미지와 프롬프트로 이미 생성한 캡션을 캐시에서 찾습니다.
+        원본 해시를 알면 인코딩된 바이트 대신 원본 해시와 인코딩 계획(detail, 긴 변 크기, JPEG 품질)으로 키를 만듭니다.
+        재처리할 때는 원본 대신 캡션용 파생 이미지에서 다시 인코딩하므로 바이트가 처음과 달라지기 때문입니다.
+        
+        :param encoded: 인코딩된 이미지
+        :param prompt: 캡션 프롬프트
+        :param source_digest: 원본 내용의 SHA-256 해시 (모르면 None)
+        :return: (캐시 키, 캡션), 캐시가 없거나 찾지 못하면 캡션은 None
+        """
+        if self.caption_cache is None:
+            return None, None
+        image_key = encoded['data']
+        if source_digest:
+            image_key = (f"sha256:{source_digest}:{max(encoded['width'], encoded['height'])}px:"
+                         f"q{encoded['quality']}")
+        # 같은 이미지라도 detail 수준이 다르면 모델이 보는 해상도가 다르므로 키에 포함합니다.
+        cache_key = CaptionCache.make_key(image_key, prompt, f"{self.MODEL}:{encoded['detail']}")
+        return cache_key, self.caption_cache.get(cache_key)
+
+    @staticmethod
+    def _source_digest(image):
+        """
+        이미지 핸들에 기록된 원본 내용의 해시를 반환합니다.
+        
+        :param image: 이미지 파일 경로 또는 ImageHandle
+        :return: SHA-256 해시, 모르면 None
+        """
+        return image.digest if isinstance(image, ImageHandle) else None
+
+    def _report_encoding(self, encoded, cached, encoding_info):
+        """
+        보낸 이미지의 인코딩 정보를 기록합니다.
+        
+        :param encoded: 인코딩된 이미지
+        :param cached: 캐시에서 캡션을 찾아 API로 보내지 않았으면 True
+        :param encoding_info: 인코딩 정보를 채워 넣을 딕셔너리 (None이면 생략)
+        """
+        if encoding_info is not None:
+            encoding_info.update({key: value for key, value in encoded.items() if key != 'data'})
+            encoding_info['cached'] = cached
+        if cached:
+            return
+        with self._stats_lock:
+            self._encoding_stats['images'] += 1
+            self._encoding_stats['bytes'] += encoded['bytes']
+            self._encoding_stats['estimated_tokens'] += encoded['estimated_tokens']
+            self._encoding_stats[encoded['detail']] += 1
+
+    def _store_cache(self, cache_key, caption):
+        """
+        생성한 캡션을 캐시에 저장합니다.
+        
+        :param cache_key: 캐시 키 (캐시가 없으면 None)
+        :param caption: 생성된 캡션
+        """
+        if self.caption_cache is not None and cache_key is not None:
+            self.caption_cache.set(cache_key, caption)
+
+    def _process_image(self, handle):
+        """
+        이미지를 API로 보낼 JPEG으로 인코딩합니다.
+        MAX_IMAGE_SIZE 크기의 이미지로 보낼 해상도, 품질, detail 수준을 정하고 그 크기 이하로 줄입니다.
+        fast_resize가 켜져 있으면 JPEG을 목표 크기 이상인 가장 작은 DCT 스케일로 디코딩하고,
+        꺼져 있으면 메타데이터 단계에서 연 이미지를 전체 해상도로 디코딩합니다.
+        어느 쪽이든 마지막 리샘플링은 LANCZOS로 같습니다.
+        
+        :param handle: 이미지 핸들
+        :return: base64 데이터('data')와 detail, 크기, 품질, 바이트 수, 추정 토큰 수를 담은 딕셔너리
+        """
+        img = handle.get_reduced_image(self.MAX_IMAGE_SIZE) if self.fast_resize else handle.image
+        img = self._convert_to_rgb(img)
+        plan = self.encoder.plan(img, handle.image.size)
+        img = self._resize_image(img, (plan['max_side'], plan['max_side']))
+        return self.encoder.encode(img, plan)
 
     def _convert_to_rgb(self, img):
         """
@@ -53,27 +227,21 @@ class ImageCaptionGenerator:
             return img.convert('RGB')
         return img
 
-    def _resize_image(self, img):
+    def _resize_image(self, img, max_size=None):
         """
         이미지 크기를 조정합니다.
         
         :param img: PIL 이미지 객체
+        :param max_size: 최대 (너비, 높이) (None이면 MAX_IMAGE_SIZE)
         :return: 크기가 조정된 이미지 객체
         """
-        max_size = (512, 512)  # OpenAI API 권장 최대 크기
-        img.thumbnail(max_size, Image.LANCZOS)
-        return img
-
-    def _image_to_base64(self, img):
-        """
-        이미지를 base64 인코딩된 문자열로 변환합니다.
-        
-        :param img: PIL 이미지 객체
-        :return: base64 인코딩된 이미지 문자열
-        """
-        buffer = io.BytesIO()
-        img.save(buffer, format="JPEG", quality=85)
-        return base64.b64encode(buffer.getvalue()).decode('utf-8')
+        max_size = max_size or self.MAX_IMAGE_SIZE
+        # 공유 이미지를 변경하지 않도록 thumbnail 대신 새 이미지를 반환하는 resize를 사용합니다.
+        scale = min(max_size[0] / img.width, max_size[1] / img.height)
+        if scale >= 1:
+            return img
+        size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+        return img.resize(size, Image.LANCZOS)
 
     def _create_prompt(self, metadata):
         """
@@ -84,33 +252,172 @@ class ImageCaptionGenerator:
         """
         return f"""이 이미지를 설명해주세요. 다음 메타데이터도 참고하세요:
         날짜/시간: {metadata['labeled_exif'].get('Date/Time', 'N/A')}
-        위치: {metadata['location_info'].get('full_address', 'N/A')}
+        위치: {self._format_location(metadata)}
+        """
+
+    def _format_location(self, metadata):
+        """
+        프롬프트에 넣을 위치 문자열을 만듭니다.
+        주소 조회가 아직 끝나지 않았으면 좌표를 대략적인 지역 힌트로 사용합니다.
+        
+        :param metadata: 이미지 메타데이터
+        :return: 위치 문자열
+        """
+        full_address = metadata.get('location_info', {}).get('full_address')
+        if full_address:
+            return full_address
+        labeled_exif = metadata['labeled_exif']
+        if 'Latitude' in labeled_exif and 'Longitude' in labeled_exif:
+            return f"위도 {labeled_exif['Latitude']:.2f}, 경도 {labeled_exif['Longitude']:.2f} 부근"
+        return 'N/A'
+
+    def _create_batch_prompt(self, count):
+        """
+        여러 이미지의 캡션을 한 번에 생성하기 위한 프롬프트를 생성합니다.
+        
+        :param count: 이미지 수
+        :return: 생성된 프롬프트 문자열
+        """
+        return f"""다음 {count}장의 이미지를 각각 설명해주세요. 각 이미지 앞에 있는 메타데이터도 참고하세요.
+        이미지마다 독립된 설명을 작성하고, 반드시 다음 JSON 형식으로만 답하세요:
+        {{"captions": [{{"index": 1, "caption": "이미지 1의 설명"}}, {{"index": 2, "caption": "이미지 2의 설명"}}]}}
+        """
+
+    def _create_batch_item_text(self, index, metadata):
+        """
+        묶음 요청에서 각 이미지 앞에 붙는 메타데이터 문구를 생성합니다.
+        
+        :param index: 이미지 번호 (1부터 시작)
+        :param metadata: 이미지 메타데이터
+        :return: 메타데이터 문구
+        """
+        return (f"이미지 {index} - 날짜/시간: {metadata['labeled_exif'].get('Date/Time', 'N/A')}, "
+                f"위치: {self._format_location(metadata)}")
+
+    def _get_captions_from_api(self, items):
+        """
+        여러 이미지의 캡션을 한 번의 API 요청으로 생성합니다.
+        응답을 JSON으로 해석하지 못하거나 일부 이미지의 캡션이 빠진 경우, 해당 이미지는 이미지별 요청으로 다시 생성합니다.
+        이미지별 요청이 실패하면 그 이미지 자리에만 예외 객체를 넣으므로, 묶음 응답에서 받은 다른 이미지의 캡션은 그대로 전달됩니다.
+        
+        :param items: (인코딩된 이미지, 이미지별 프롬프트, 메타데이터) 목록
+        :return: items와 같은 순서의 캡션 목록 (이미지별 요청이 실패한 자리는 예외 객체)
+        """
+        if len(items) == 1:
+            encoded, prompt, _ = items[0]
+            return [self._get_caption_from_api(prompt, encoded)]
+
+        content = [{"type": "text", "text": self._create_batch_prompt(len(items))}]
+        for index, (encoded, _, metadata) in enumerate(items, 1):
+            content.append({"type": "text", "text": self._create_batch_item_text(index, metadata)})
+            content.append(self._image_content(encoded))
+
+        captions = {}
+        try:
+            response = self.client.chat.completions.create(
+                model=self.MODEL,
+                messages=[{"role": "user", "content": content}],
+                response_format={"type": "json_object"},
+                max_tokens=self.MAX_CAPTION_TOKENS * len(items),
+                timeout=self.REQUEST_TIMEOUT
+            )
+            captions = self._parse_batch_captions(response.choices[0].message.content, len(items))
+        except Exception as e:
+            self.logger.warning(f"묶음 캡션 생성 실패, 이미지별 요청으로 전환합니다: {e}")
+
+        missing = [index for index in range(1, len(items) + 1) if index not in captions]
+        if missing:
+            self.logger.warning(f"묶음 응답에 캡션이 없는 이미지 {len(missing)}장을 이미지별 요청으로 생성합니다.")
+        for index in missing:
+            encoded, prompt, _ = items[index - 1]
+            try:
+                captions[index] = self._get_caption_from_api(prompt, encoded)
+            except Exception as e:
+                self.logger.error(f"묶음의 이미지 {index} 캡션 생성 실패: {e}")
+                captions[index] = e
+        return [captions[index] for index in range(1, len(items) + 1)]
+
+    def _parse_batch_captions(self, content, count):
+        """
+        묶음 요청의 JSON 응답에서 이미지 번호별 캡션을 추출합니다.
+        
+        :param content: API 응답 문자열
+        :param count: 요청한 이미지 수
+        :return: {이미지 번호: 캡션}, 해석할 수 없는 항목은 제외합니다
         """
+        captions = {}
+        try:
+            entries = json.loads(content).get('captions', [])
+        except (ValueError, AttributeError) as e:
+            self.logger.warning(f"묶음 캡션 응답을 해석할 수 없습니다: {e}")
+            return captions
+        if not isinstance(entries, list):
+            return captions
+        for position, entry in enumerate(entries, 1):
+            if not isinstance(entry, dict):
+                continue
+            index = entry.get('index', position)
+            caption = entry.get('caption')
+            if isinstance(index, int) and 1 <= index <= count and isinstance(caption, str) and caption.strip():
+                captions.setdefault(index, caption.strip())
+        return captions
 
-    def _get_caption_from_api(self, prompt, base64_image):
+    def _get_caption_from_api(self, prompt, encoded):
         """
         OpenAI API를 사용하여 이미지 캡션을 생성합니다.
         
         :param prompt: 캡션 생성을 위한 프롬프트
-        :param base64_image: base64 인코딩된 이미지 문자열
+        :param encoded: 인코딩된 이미지
         :return: 생성된 캡션
         """
-        response = self.client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
+        response = self.client.chat.completions.create(**self._build_request(prompt, encoded))
+        return response.choices[0].message.content
+
+    async def _aget_caption_from_api(self, prompt, encoded):
+        """
+        비동기 OpenAI 클라이언트로 이미지 캡션을 생성합니다.
+        
+        :param prompt: 캡션 생성을 위한 프롬프트
+        :param encoded: 인코딩된 이미지
+        :return: 생성된 캡션
+        """
+        response = await self.async_client.chat.completions.create(**self._build_request(prompt, encoded))
+        return response.choices[0].message.content
+
+    def _build_request(self, prompt, encoded):
+        """
+        캡션 생성 API 요청 인자를 구성합니다.
+        
+        :param prompt: 캡션 생성을 위한 프롬프트
+        :param encoded: 인코딩된 이미지
+        :return: chat.completions.create에 전달할 인자
+        """
+        return {
+            "model": self.MODEL,
+            "messages": [
                 {
                     "role": "user",
                     "content": [
                         {"type": "text", "text": prompt},
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:image/jpeg;base64,{base64_image}"
-                            }
-                        }
+                        self._image_content(encoded)
                     ],
                 }
             ],
-            max_tokens=300
-        )
-        return response.choices[0].message.content
\ No newline at end of file
+            "max_tokens": self.MAX_CAPTION_TOKENS,
+            "timeout": self.REQUEST_TIMEOUT
+        }
+
+    def _image_content(self, encoded):
+        """
+        인코딩된 이미지를 메시지의 이미지 항목으로 만듭니다.
+        
+        :param encoded: 인코딩된 이미지
+        :return: image_url 메시지 항목
+        """
+        return {
+            "type": "image_url",
+            "image_url": {
+                "url": f"data:image/jpeg;base64,{encoded['data']}",
+                "detail": encoded['detail']
+            }
+        }
\ No newline at end of file
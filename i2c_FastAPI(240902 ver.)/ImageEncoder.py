@@ -0,0 +1,175 @@
+from PIL import Image, ImageFilter
+import io
+import math
+import base64
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+# 모델별 이미지 입력 토큰 비용 (기본 토큰, high detail 512px 타일당 토큰)
+# low detail은 기본 토큰만, high detail은 기본 토큰 + 타일 수 x 타일당 토큰이 듭니다.
+VISION_TOKEN_COSTS = {
+    'gpt-4o-mini': (2833, 5667),
+    'gpt-4o': (85, 170)
+}
+
+class ImageEncoder:
+    # high detail에서 이미지를 나누는 타일 크기와 모델이 이미지를 줄이는 기준 크기
+    TILE_SIZE = 512
+    HIGH_DETAIL_MAX_SIDE = 2048
+    HIGH_DETAIL_SHORT_SIDE = 768
+
+    # high detail로 보낼 때의 긴 변 크기 (타일 1개)
+    # 더 큰 크기는 타일이 2~4개로 늘어 gpt-4o-mini에서 이미지당 14167~25501 토큰이 들고,
+    # 512px 캡션 파생 이미지로는 만들 수 없어 원본을 다시 디코딩해야 하므로 보내지 않습니다.
+    HIGH_DETAIL_SIDE = 512
+
+    # low detail로 보낼 때의 긴 변 크기와 JPEG 품질
+    LOW_DETAIL_SIDE = 512
+    SIMPLE_SCENE_SIDE = 384
+
+    # 에지 밀도 기준: 이보다 복잡한 장면은 high detail, 이보다 단순한 장면은 더 작게 보냅니다
+    HIGH_DETAIL_EDGE_DENSITY = 0.12
+    SIMPLE_SCENE_EDGE_DENSITY = 0.04
+
+    # 에지로 볼 밝기 변화량과 에지 밀도를 계산할 축소 이미지의 긴 변 크기
+    EDGE_THRESHOLD = 32
+    ANALYSIS_SIDE = 128
+
+    # 바이트 예산을 넘을 때 차례로 낮추는 JPEG 품질과 더 줄이지 않는 최소 긴 변 크기
+    QUALITY_LADDER = (85, 75, 65, 55)
+    MIN_SIDE = 256
+
+    def __init__(self, model: str, adaptive: bool = True, token_budget: Optional[int] = None,
+                 max_bytes: Optional[int] = None, default_size: Tuple[int, int] = (512, 512)):
+        """
+        ImageEncoder 클래스 초기화
+        캡션 요청에 넣을 이미지의 해상도, JPEG 품질, detail 수준을 이미지별로 정합니다.
+        장면의 에지 밀도로 필요한 세부 정도를 추정하고, 이미지당 토큰 예산과 바이트 예산 안에서 가장 좋은 설정을 고릅니다.
+
+        :param model: 캡션 생성 모델 (토큰 비용 추정에 사용)
+        :param adaptive: False이면 항상 default_size, 품질 85, detail auto로 보냅니다
+        :param token_budget: 이미지당 최대 입력 토큰 (None이면 high detail 타일 1개 분량, 이보다 작으면 high detail을 쓰지 않음)
+        :param max_bytes: 이미지당 최대 전송 바이트 (None이면 제한 없음)
+        :param default_size: adaptive가 꺼져 있을 때의 최대 크기
+        """
+        self.model = model
+        self.adaptive = adaptive
+        self.base_tokens, self.tile_tokens = VISION_TOKEN_COSTS.get(model, VISION_TOKEN_COSTS['gpt-4o-mini'])
+        self.token_budget = token_budget if token_budget is not None else self.base_tokens + self.tile_tokens
+        self.max_bytes = max_bytes
+        self.default_size = default_size
+        self.logger = logging.getLogger(__name__)
+
+    def estimate_tokens(self, width: int, height: int, detail: str) -> int:
+        """
+        이미지 하나의 입력 토큰 수를 추정합니다.
+        auto는 모델이 high로 처리할 수 있으므로 high로 계산합니다.
+
+        :param width: 보내는 이미지의 너비
+        :param height: 보내는 이미지의 높이
+        :param detail: low, high, auto 중 하나
+        :return: 추정 토큰 수
+        """
+        if detail == 'low':
+            return self.base_tokens
+        scale = min(1.0, self.HIGH_DETAIL_MAX_SIDE / max(width, height))
+        width, height = width * scale, height * scale
+        scale = min(1.0, self.HIGH_DETAIL_SHORT_SIDE / min(width, height))
+        width, height = width * scale, height * scale
+        tiles = math.ceil(width / self.TILE_SIZE) * math.ceil(height / self.TILE_SIZE)
+        return self.base_tokens + self.tile_tokens * tiles
+
+    def edge_density(self, img: Image.Image) -> float:
+        """
+        장면의 복잡도를 에지 픽셀 비율로 추정합니다. 작은 흑백 이미지에서 계산하므로 비용이 거의 들지 않습니다.
+
+        :param img: PIL 이미지 객체
+        :return: 0~1 사이의 에지 밀도
+        """
+        gray = img.convert('L')
+        scale = min(1.0, self.ANALYSIS_SIDE / max(gray.size))
+        if scale < 1:
+            gray = gray.resize((max(3, round(gray.width * scale)), max(3, round(gray.height * scale))), Image.BILINEAR)
+        # 가장자리 1픽셀은 필터 경계 효과가 있으므로 제외합니다.
+        edges = gray.filter(ImageFilter.FIND_EDGES).crop((1, 1, gray.width - 1, gray.height - 1))
+        histogram = edges.histogram()
+        total = sum(histogram)
+        return sum(histogram[self.EDGE_THRESHOLD:]) / total if total else 0.0
+
+    def plan(self, img: Image.Image, original_size: Tuple[int, int]) -> Dict[str, Any]:
+        """
+        이미지를 보낼 detail 수준, 최대 긴 변 크기, JPEG 품질을 정합니다.
+
+        :param img: 에지 밀도를 계산할 (축소된) 이미지
+        :param original_size: 원본 이미지 크기 (high detail 토큰 계산에 사용)
+        :return: 'detail', 'max_side', 'quality', 'edge_density'를 담은 딕셔너리
+        """
+        if not self.adaptive:
+            return {'detail': 'auto', 'max_side': max(self.default_size), 'quality': 85, 'edge_density': None}
+
+        density = self.edge_density(img)
+        if density >= self.HIGH_DETAIL_EDGE_DENSITY:
+            width, height = self._fit(original_size, self.HIGH_DETAIL_SIDE)
+            if self.estimate_tokens(width, height, 'high') <= self.token_budget:
+                return {'detail': 'high', 'max_side': self.HIGH_DETAIL_SIDE, 'quality': 85, 'edge_density': round(density, 4)}
+
+        if density >= self.SIMPLE_SCENE_EDGE_DENSITY:
+            return {'detail': 'low', 'max_side': self.LOW_DETAIL_SIDE, 'quality': 80, 'edge_density': round(density, 4)}
+        return {'detail': 'low', 'max_side': self.SIMPLE_SCENE_SIDE, 'quality': 70, 'edge_density': round(density, 4)}
+
+    def encode(self, img: Image.Image, plan: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        계획한 크기와 품질로 이미지를 JPEG으로 인코딩합니다.
+        바이트 예산을 넘으면 품질을 차례로 낮추고, 그래도 넘으면 크기를 줄입니다.
+
+        :param img: plan['max_side'] 이하로 줄인 RGB 이미지
+        :param plan: plan()이 반환한 설정
+        :return: base64 데이터('data')와 detail, 크기, 품질, 바이트 수, 추정 토큰 수를 담은 딕셔너리
+        """
+        qualities = [plan['quality']] + [q for q in self.QUALITY_LADDER if q < plan['quality']]
+        while True:
+            for quality in qualities:
+                data = self._to_jpeg(img, quality)
+                if self.max_bytes is None or len(data) <= self.max_bytes:
+                    break
+            if self.max_bytes is None or len(data) <= self.max_bytes or max(img.size) * 3 // 4 < self.MIN_SIDE:
+                break
+            img = img.resize((max(1, img.width * 3 // 4), max(1, img.height * 3 // 4)), Image.LANCZOS)
+
+        if self.max_bytes is not None and len(data) > self.max_bytes:
+            self.logger.warning(f"이미지를 바이트 예산({self.max_bytes} bytes) 안으로 줄이지 못했습니다: {len(data)} bytes")
+        return {
+            'data': base64.b64encode(data).decode('utf-8'),
+            'detail': plan['detail'],
+            'width': img.width,
+            'height': img.height,
+            'quality': quality,
+            'bytes': len(data),
+            'estimated_tokens': self.estimate_tokens(img.width, img.height, plan['detail']),
+            'edge_density': plan['edge_density']
+        }
+
+    @staticmethod
+    def _fit(size: Tuple[int, int], max_side: int) -> Tuple[int, int]:
+        """
+        비율을 유지하며 긴 변이 max_side를 넘지 않는 크기를 계산합니다 (확대하지 않음).
+
+        :param size: (너비, 높이)
+        :param max_side: 최대 긴 변 크기
+        :return: (너비, 높이)
+        """
+        scale = min(1.0, max_side / max(size))
+        return max(1, round(size[0] * scale)), max(1, round(size[1] * scale))
+
+    @staticmethod
+    def _to_jpeg(img: Image.Image, quality: int) -> bytes:
+        """
+        이미지를 JPEG 바이트로 저장합니다.
+
+        :param img: PIL 이미지 객체
+        :param quality: JPEG 품질
+        :return: JPEG 바이트
+        """
+        buffer = io.BytesIO()
+        img.save(buffer, format="JPEG", quality=quality)
+        return buffer.getvalue()
@@ -0,0 +1,191 @@
+from PIL import Image
+import io
+import os
+import threading
+import logging
+from typing import AbstractSet, Any, BinaryIO, Dict, Optional, Tuple, Union
+import ExifReader
+
+class ImageHandle:
+    def __init__(self, source: Union[str, bytes, BinaryIO], name: Optional[str] = None, path: Optional[str] = None,
+                 reduced_source: Optional[str] = None, digest: Optional[str] = None):
+        """
+        ImageHandle 클래스 초기화
+        업로드 버퍼(파일 객체 또는 바이트)나 파일 경로에서 이미지를 한 번만 열고,
+        EXIF 추출과 캡션용 리사이즈가 같은 이미지 객체를 공유하도록 합니다.
+        이미지는 처음 사용할 때 열리며, 헤더만 읽고 픽셀 디코딩은 필요할 때 수행됩니다.
+
+        :param source: 이미지 파일 경로, 바이트 또는 읽기 가능한 바이너리 파일 객체
+        :param name: 로그에 표시할 이미지 이름 (기본값: 파일 경로)
+        :param path: 버퍼와 별도로 디스크에 저장된 파일 경로 (저장하지 않았으면 None)
+        :param reduced_source: 미리 축소해 저장해 둔 같은 이미지의 경로 (충분히 크면 원본 대신 디코딩합니다)
+        :param digest: 원본 내용의 SHA-256 해시 (알고 있으면 캡션 캐시 키에 인코딩 결과 대신 사용합니다)
+        """
+        if isinstance(source, bytes):
+            source = io.BytesIO(source)
+        self.source = source
+        self.path = path or (source if isinstance(source, str) else None)
+        self.name = name or self.path or "<upload>"
+        self.reduced_source = reduced_source
+        self.digest = digest
+        self._image: Optional[Image.Image] = None
+        self._reduced: Dict[Tuple[int, int], Image.Image] = {}
+        self._exif: Dict[Tuple[Any, ...], Dict[int, Any]] = {}
+        self._lock = threading.RLock()
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def image(self) -> Image.Image:
+        """
+        공유 PIL 이미지 객체를 반환합니다. 처음 호출될 때 한 번만 엽니다.
+
+        :return: PIL 이미지 객체
+        """
+        with self._lock:
+            if self._image is None:
+                if not isinstance(self.source, str):
+                    self.source.seek(0)
+                self._image = Image.open(self.source)
+            return self._image
+
+    def get_reduced_image(self, size: Tuple[int, int]) -> Image.Image:
+        """
+        최소 size 이상의 크기로 축소 디코딩한 이미지를 반환합니다. 결과는 크기별로 핸들에 캐시됩니다.
+        JPEG은 Pillow의 draft 모드(DCT 스케일링)로 1/2, 1/4, 1/8 해상도에서 바로 디코딩하므로
+        전체 해상도를 디코딩한 뒤 줄이는 것보다 CPU 시간과 메모리를 크게 줄입니다.
+        draft는 이미지 객체의 디코딩 방식을 바꾸므로 공유 이미지와 별도의 객체로 엽니다.
+        미리 축소해 둔 이미지(reduced_source)가 size 이상이면 원본 대신 그 이미지를 디코딩합니다.
+        그 외에 JPEG이 아니면 공유 이미지를 그대로 반환합니다.
+
+        :param size: 필요한 최소 (너비, 높이)
+        :return: PIL 이미지 객체 (픽셀이 로드된 상태)
+        """
+        with self._lock:
+            if size not in self._reduced:
+                reduced = self._open_reduced_source(size)
+                if reduced is not None:
+                    self._reduced[size] = reduced
+                    return reduced
+            if self.image.format != "JPEG":
+                return self.image
+            if size not in self._reduced:
+                if not isinstance(self.source, str):
+                    self.source.seek(0)
+                reduced = Image.open(self.source)
+                reduced.draft("RGB", size)
+                # 업로드 버퍼를 공유하므로 잠금 안에서 픽셀을 모두 읽습니다.
+                reduced.load()
+                self._reduced[size] = reduced
+            return self._reduced[size]
+
+    def get_exif(self, tags: Optional[AbstractSet[int]] = None, gps_tags: Optional[AbstractSet[int]] = None,
+                 max_binary_bytes: Optional[int] = None) -> Dict[int, Any]:
+        """
+        이미지의 원시 EXIF 정보를 반환합니다. 결과는 선택 조건별로 핸들에 캐시됩니다.
+        JPEG은 ExifReader로 헤더 세그먼트만 읽고, 그 외 형식은 Pillow로 읽은 뒤 같은 조건으로 골라냅니다.
+
+        :param tags: 읽을 태그 번호 (None이면 모든 태그)
+        :param gps_tags: 읽을 GPS 하위 태그 번호 (None이면 모든 GPS 태그)
+        :param max_binary_bytes: 이 크기를 넘는 바이너리 태그는 제외합니다 (None이면 제한 없음)
+        :return: 태그 번호를 키로 하는 EXIF 정보 (없으면 빈 딕셔너리)
+        """
+        key = (
+            frozenset(tags) if tags is not None else None,
+            frozenset(gps_tags) if gps_tags is not None else None,
+            max_binary_bytes
+        )
+        with self._lock:
+            if key not in self._exif:
+                exif = self._read_exif_header(tags, gps_tags, max_binary_bytes)
+                if exif is None:
+                    exif = self._read_exif_with_pillow()
+                    if exif:
+                        exif = ExifReader.project_exif(exif, tags, gps_tags, max_binary_bytes)
+                self._exif[key] = exif or {}
+            return self._exif[key]
+
+    def _read_exif_with_pillow(self) -> Optional[Dict[int, Any]]:
+        """
+        Pillow로 EXIF 정보를 읽습니다. 파일이 잘렸거나 EXIF가 손상되어 읽을 수 없으면 EXIF가 없는 것으로 봅니다.
+
+        :return: EXIF 정보, 없거나 읽을 수 없으면 None
+        """
+        try:
+            getexif = getattr(self.image, "_getexif", None)
+            return getexif() if getexif else None
+        except Exception as e:
+            self.logger.warning(f"EXIF 정보를 읽을 수 없습니다: {self.name} ({e})")
+            return None
+
+    def _read_exif_header(self, tags: Optional[AbstractSet[int]] = None, gps_tags: Optional[AbstractSet[int]] = None,
+                          max_binary_bytes: Optional[int] = None) -> Optional[Dict[int, Any]]:
+        """
+        이미지를 열지 않고 파일 앞부분의 EXIF 세그먼트만 읽습니다.
+
+        :param tags: 읽을 태그 번호 (None이면 모든 태그)
+        :param gps_tags: 읽을 GPS 하위 태그 번호 (None이면 모든 GPS 태그)
+        :param max_binary_bytes: 이 크기를 넘는 바이너리 태그는 건너뜁니다
+        :return: EXIF 정보, 지원하지 않는 형식이면 None
+        """
+        try:
+            if isinstance(self.source, str):
+                with open(self.source, "rb") as fp:
+                    return ExifReader.read_exif(fp, tags, gps_tags, max_binary_bytes)
+            self.source.seek(0)
+            try:
+                return ExifReader.read_exif(self.source, tags, gps_tags, max_binary_bytes)
+            finally:
+                self.source.seek(0)
+        except OSError as e:
+            self.logger.warning(f"EXIF 헤더를 읽을 수 없어 Pillow로 대신 읽습니다: {self.name} ({e})")
+            return None
+
+    def _open_reduced_source(self, size: Tuple[int, int]) -> Optional[Image.Image]:
+        """
+        미리 축소해 둔 이미지가 요청한 크기를 만들기에 충분하면 엽니다.
+        원본 자체가 요청한 크기보다 작아 축소본이 원본 크기와 같은 경우도 사용합니다.
+
+        :param size: 필요한 최소 (너비, 높이)
+        :return: 픽셀이 로드된 PIL 이미지 객체, 사용할 수 없으면 None
+        """
+        if not self.reduced_source or not os.path.exists(self.reduced_source):
+            return None
+        try:
+            reduced = Image.open(self.reduced_source)
+        except OSError as e:
+            self.logger.warning(f"축소 이미지를 열 수 없어 원본을 사용합니다: {self.reduced_source} ({e})")
+            return None
+        if max(reduced.size) >= max(size) or max(reduced.size) >= max(self.image.size):
+            reduced.load()
+            return reduced
+        reduced.close()
+        return None
+
+    def close(self) -> None:
+        """
+        열린 이미지 객체를 닫습니다. 원본 파일 객체는 호출자가 닫습니다.
+        """
+        with self._lock:
+            for reduced in self._reduced.values():
+                self._close_image(reduced)
+            self._reduced.clear()
+            if self._image is not None:
+                self._close_image(self._image)
+                self._image = None
+
+    def _close_image(self, img: Image.Image) -> None:
+        """
+        이미지 객체를 닫습니다. Pillow는 이미지를 닫을 때 읽던 파일 객체도 닫으므로,
+        호출자의 업로드 버퍼를 읽고 있으면 먼저 떼어 내 버퍼가 계속 열려 있도록 합니다.
+
+        :param img: 닫을 PIL 이미지 객체
+        """
+        if not isinstance(self.source, str) and getattr(img, "fp", None) is self.source:
+            img.fp = None
+        img.close()
+
+    def __enter__(self) -> "ImageHandle":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
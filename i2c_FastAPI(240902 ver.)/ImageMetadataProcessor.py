@@ -2,36 +2,123 @@ from PIL import Image
 from PIL.ExifTags import TAGS, GPSTAGS
 from geopy.geocoders import Nominatim
 from geopy.exc import GeocoderTimedOut
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 import ssl
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, FrozenSet, Optional, Tuple, Union
 import logging
+from ImageHandle import ImageHandle
+from GeocodeCache import GeocodeCache
+from OfflineGeocoder import OfflineGeocoder
+from GeocodeScheduler import GeocodeScheduler
+from LocationEnricher import LocationEnricher
+from exif_profiles import EXIF_PROFILES, DEFAULT_EXIF_PROFILE, MAX_BINARY_EXIF_BYTES
+
+# 선택 가능한 역지오코딩 방식
+# - nominatim: Nominatim 웹 서비스만 사용
+# - offline: 로컬 지명 데이터(OfflineGeocoder)만 사용
+# - offline+nominatim: 로컬 지명 데이터로 먼저 찾고, Nominatim 결과가 있으면 도로명·우편번호까지 포함된 결과로 보완
+GEOCODER_BACKENDS = ('nominatim', 'offline', 'offline+nominatim')
+
+# offline+nominatim 방식에서 Nominatim 조회가 실패해 로컬 지명 데이터로 대신한 조회 결과에 붙이는 내부 표시 (값은 False)
+# (일시적인 네트워크 오류로 낮아진 정확도가 굳지 않도록 캐시와 처리 결과 저장소에 저장하지 않습니다)
+# 지오코딩 캐시가 결과를 거르는 데만 쓰며, resolve_location이 떼어 내므로 메타데이터에는 들어가지 않습니다.
+REFINED_FLAG = 'refined'
 
 class ImageMetadataProcessor:
-    def __init__(self):
+    def __init__(self, geocode_cache: Optional[GeocodeCache] = None, backend: str = "nominatim",
+                 offline_geocoder: Optional[OfflineGeocoder] = None, requests_per_second: float = 1.0,
+                 location_enricher: Optional[LocationEnricher] = None, exif_profile: str = DEFAULT_EXIF_PROFILE,
+                 max_geocode_wait: Optional[float] = 30.0):
         """
         ImageMetadataProcessor 클래스 초기화
         지오코더를 생성하고 로거를 설정합니다.
+        Nominatim 호출은 GeocodeScheduler가 전용 스레드에서 초당 요청 수를 지키며 실행하므로,
+        하나의 인스턴스를 여러 요청과 스레드에서 공유해도 사용 정책을 넘지 않습니다.
+        
+        :param geocode_cache: 역지오코딩 결과 캐시 (None이면 매번 지오코더를 호출)
+        :param backend: 역지오코딩 방식 (GEOCODER_BACKENDS 중 하나)
+        :param offline_geocoder: backend가 offline 계열일 때 사용할 로컬 지오코더
+        :param requests_per_second: Nominatim 전역 초당 최대 요청 수
+        :param location_enricher: 지정하면 주소 조회를 기다리지 않고 백그라운드에서 보강합니다 (지연 보강 모드)
+        :param exif_profile: 기본 EXIF 필드 선택 프로필 (exif_profiles.EXIF_PROFILES의 키)
+        :param max_geocode_wait: Nominatim 조회 결과를 기다릴 최대 시간(초). 스케줄러 대기열이 이보다 길면 조회를 건너뛰고
+                                 오프라인 결과(offline+nominatim) 또는 빈 위치 정보로 대신합니다 (None이면 제한 없음)
         """
+        if backend not in GEOCODER_BACKENDS:
+            raise ValueError(f"지원하지 않는 지오코딩 방식입니다: {backend}")
+        if backend != "nominatim" and offline_geocoder is None:
+            raise ValueError(f"{backend} 방식에는 offline_geocoder가 필요합니다.")
+        self.backend = backend
+        self.exif_profile = self._validate_profile(exif_profile)
+        self.offline_geocoder = offline_geocoder
         self.geolocator = self._create_geolocator()
+        self.geocode_cache = geocode_cache
+        self.location_enricher = location_enricher
+        self.max_geocode_wait = max_geocode_wait
+        self.geocode_scheduler = None
+        if backend != "offline":
+            self.geocode_scheduler = GeocodeScheduler(self._query_nominatim, requests_per_second)
         self.logger = logging.getLogger(__name__)
 
-    def process(self, image_path: str) -> Dict[str, Any]:
+    def process(self, image: Union[str, ImageHandle], exif_profile: Optional[str] = None) -> Dict[str, Any]:
         """
         이미지의 메타데이터를 처리합니다.
+        지연 보강 모드에서는 위치 정보가 아직 없을 수 있으며, 이때 'location_status'가 'pending'이고
+        'location_id'로 LocationEnricher에서 보강된 주소를 조회할 수 있습니다.
         
-        :param image_path: 처리할 이미지의 경로
+        :param image: 처리할 이미지의 경로 또는 ImageHandle
+        :param exif_profile: EXIF 필드 선택 프로필 (None이면 기본 프로필)
         :return: 추출된 EXIF 데이터와 위치 정보를 포함한 딕셔너리
         """
-        self.logger.info(f"{image_path}에서 메타데이터 추출 중")
-        exif_data = self._get_exif_data(image_path)
-        labeled_exif = self._get_labeled_exif(exif_data)
-        location_info = self._get_location_info(labeled_exif)
+        if not isinstance(image, ImageHandle):
+            with ImageHandle(image) as handle:
+                return self.process(handle, exif_profile)
+
+        metadata = self.extract(image, exif_profile)
+        metadata.update(self.locate(metadata['labeled_exif']))
+        return metadata
+
+    def extract(self, handle: ImageHandle, exif_profile: Optional[str] = None) -> Dict[str, Any]:
+        """
+        네트워크 조회 없이 이미지에서 EXIF 데이터와 좌표만 추출합니다.
+        위치 정보는 비어 있으며, locate의 결과로 채웁니다.
+        
+        :param handle: 메타데이터를 추출할 이미지 핸들
+        :param exif_profile: EXIF 필드 선택 프로필 (None이면 기본 프로필)
+        :return: 'exif_data', 'labeled_exif', 빈 'location_info'를 포함한 딕셔너리
+        """
+        self.logger.info(f"{handle.name}에서 메타데이터 추출 중")
+        exif_data = self._get_exif_data(handle, self._validate_profile(exif_profile or self.exif_profile))
         return {
             'exif_data': self._serialize_exif(exif_data),
-            'labeled_exif': labeled_exif,
-            'location_info': location_info
+            'labeled_exif': self._get_labeled_exif(exif_data),
+            'location_info': {}
         }
 
+    def locate(self, labeled_exif: Dict[str, Any], location_state: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        좌표의 위치 정보를 구합니다. 지연 보강 모드에서는 조회를 예약하고 바로 반환합니다.
+        
+        :param labeled_exif: 레이블이 추가된 EXIF 데이터
+        :param location_state: 위치 조회 상태를 채워 넣을 딕셔너리
+                               ('refined': 위치 정보가 설정된 방식의 최종 결과인지, 즉시 조회한 경우에만 채움)
+        :return: 메타데이터에 병합할 위치 필드 ('location_info', 지연 보강 모드에서는 'location_status', 'location_id' 포함)
+        """
+        if self.location_enricher and "Latitude" in labeled_exif and "Longitude" in labeled_exif:
+            return self._defer_location_info(labeled_exif)
+        return {'location_info': self._get_location_info(labeled_exif, location_state)}
+
+    def needs_remote_lookup(self, labeled_exif: Dict[str, Any]) -> bool:
+        """
+        locate가 네트워크 지오코딩을 기다려야 하는지 확인합니다.
+        좌표가 없거나, 지연 보강 모드이거나, 오프라인 지오코더만 사용하면 즉시 끝납니다.
+        
+        :param labeled_exif: 레이블이 추가된 EXIF 데이터
+        :return: 원격 조회가 필요하면 True
+        """
+        has_gps = "Latitude" in labeled_exif and "Longitude" in labeled_exif
+        return has_gps and self.location_enricher is None and self.geocode_scheduler is not None
+
     def _serialize_exif(self, exif_data: Dict[str, Any]) -> Dict[str, Any]:
             """
             EXIF 데이터를 JSON 직렬화 가능한 형태로 변환합니다.
@@ -75,19 +162,48 @@ class ImageMetadataProcessor:
         ctx.verify_mode = ssl.CERT_NONE
         return Nominatim(user_agent="my_app", ssl_context=ctx)
 
-    def _get_exif_data(self, image_path: str) -> Dict[str, Any]:
+    @staticmethod
+    def _validate_profile(exif_profile: str) -> str:
+        """
+        EXIF 프로필 이름을 확인합니다.
+        
+        :param exif_profile: 프로필 이름
+        :return: 프로필 이름
+        """
+        if exif_profile not in EXIF_PROFILES:
+            raise ValueError(f"지원하지 않는 EXIF 프로필입니다: {exif_profile}")
+        return exif_profile
+
+    @staticmethod
+    def _profile_tag_ids(exif_profile: str) -> Tuple[Optional[FrozenSet[int]], Optional[FrozenSet[int]]]:
+        """
+        프로필의 태그 이름을 태그 번호로 변환합니다.
+        
+        :param exif_profile: 프로필 이름
+        :return: (EXIF 태그 번호, GPS 태그 번호), 제한이 없으면 None
+        """
+        profile = EXIF_PROFILES[exif_profile]
+        tags = profile['tags']
+        gps_tags = profile['gps_tags']
+        tag_ids = None if tags is None else frozenset(tag for tag, name in TAGS.items() if name in tags)
+        gps_tag_ids = None if gps_tags is None else frozenset(tag for tag, name in GPSTAGS.items() if name in gps_tags)
+        return tag_ids, gps_tag_ids
+
+    def _get_exif_data(self, handle: ImageHandle, exif_profile: str) -> Dict[str, Any]:
         """
         이미지에서 EXIF 데이터를 추출합니다.
+        프로필에 없는 태그와 큰 바이너리 태그는 헤더에서 해석하지 않고 건너뜁니다.
         
-        :param image_path: EXIF 데이터를 추출할 이미지의 경로
+        :param handle: EXIF 데이터를 추출할 이미지 핸들
+        :param exif_profile: EXIF 필드 선택 프로필
         :return: 추출된 EXIF 데이터
         """
         exif_data = {}
         try:
-            with Image.open(image_path) as image:
-                info = image._getexif()
-                if info:
-                    exif_data = self._process_exif_info(info)
+            tags, gps_tags = self._profile_tag_ids(exif_profile)
+            info = handle.get_exif(tags, gps_tags, MAX_BINARY_EXIF_BYTES)
+            if info:
+                exif_data = self._process_exif_info(info)
         except Exception as e:
             self.logger.error(f"EXIF 데이터 추출 중 오류 발생: {e}")
         return exif_data
@@ -165,28 +281,119 @@ class ImageMetadataProcessor:
         d, m, s = [float(x) for x in value]
         return d + (m / 60.0) + (s / 3600.0)
 
-    def _get_location_info(self, labeled_exif: Dict[str, Any]) -> Dict[str, str]:
+    def _get_location_info(self, labeled_exif: Dict[str, Any],
+                           location_state: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
         """
         GPS 좌표를 이용해 위치 정보를 가져옵니다.
         
         :param labeled_exif: 레이블이 추가된 EXIF 데이터
+        :param location_state: 위치 조회 상태('refined')를 채워 넣을 딕셔너리
         :return: 위치 정보를 포함한 딕셔너리
         """
+        if "Latitude" not in labeled_exif or "Longitude" not in labeled_exif:
+            return {}
+        location_info, refined = self.resolve_location(labeled_exif['Latitude'], labeled_exif['Longitude'])
+        if location_state is not None:
+            location_state['refined'] = refined
+        return location_info
+
+    def _defer_location_info(self, labeled_exif: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        주소 조회를 백그라운드에 맡기고 현재까지의 위치 상태를 반환합니다.
+        
+        :param labeled_exif: 레이블이 추가된 EXIF 데이터 (좌표 포함)
+        :return: 'location_info', 'location_status', 'location_id'를 포함한 딕셔너리
+        """
+        state = self.location_enricher.submit(labeled_exif['Latitude'], labeled_exif['Longitude'],
+                                              self.resolve_location)
+        return {
+            'location_info': state['location_info'],
+            'location_status': state['status'],
+            'location_id': state['location_id']
+        }
+
+    def resolve_location(self, lat: float, lon: float) -> Tuple[Dict[str, str], bool]:
+        """
+        좌표의 위치 정보를 조회합니다. 캐시가 있으면 캐시를 먼저 확인합니다.
+        최종 결과인지는 위치 정보와 따로 반환하므로 위치 정보에는 내부 표시(REFINED_FLAG)가 남지 않습니다.
+        
+        :param lat: 위도
+        :param lon: 경도
+        :return: (위치 정보(조회에 실패하면 빈 딕셔너리), 설정된 방식의 최종 결과인지)
+                 offline+nominatim 방식에서 Nominatim 조회가 실패해 로컬 지명 데이터로 대신한 결과는 최종 결과가 아닙니다
+        """
+        if self.geocode_cache:
+            location_info = self.geocode_cache.get_or_resolve(lat, lon, self._lookup_location, cacheable=self._is_refined)
+        else:
+            location_info = self._lookup_location(lat, lon)
+        return {key: value for key, value in location_info.items() if key != REFINED_FLAG}, self._is_refined(location_info)
+
+    @staticmethod
+    def _is_refined(location_info: Dict[str, Any]) -> bool:
+        """
+        _lookup_location의 조회 결과가 설정된 방식의 최종 결과인지 확인합니다.
+
+        :param location_info: 내부 표시가 남아 있는 조회 결과
+        :return: 최종 결과이면 True
+        """
+        return location_info.get(REFINED_FLAG, True) is not False
+
+    def _lookup_location(self, lat: float, lon: float) -> Dict[str, str]:
+        """
+        설정된 방식으로 좌표의 위치 정보를 조회합니다.
+        offline+nominatim 방식에서 Nominatim 조회가 실패하면 로컬 지명 데이터의 결과를 대신 사용하되,
+        내부 표시(REFINED_FLAG: False)를 붙여 캐시에 저장하지 않고 다음 요청에서 다시 조회하도록 합니다.
+        
+        :param lat: 위도
+        :param lon: 경도
+        :return: 위치 정보를 포함한 딕셔너리 (조회에 실패하면 빈 딕셔너리)
+        """
+        if self.backend == "nominatim":
+            return self._lookup_nominatim(lat, lon)
+        location_info = self.offline_geocoder.reverse(lat, lon)
+        if self.backend == "offline":
+            return location_info
+        refined = self._lookup_nominatim(lat, lon)
+        if refined:
+            return refined
+        return {**location_info, REFINED_FLAG: False} if location_info else location_info
+
+    def _lookup_nominatim(self, lat: float, lon: float) -> Dict[str, str]:
+        """
+        Nominatim으로 좌표의 위치 정보를 조회합니다.
+        
+        :param lat: 위도
+        :param lon: 경도
+        :return: 위치 정보를 포함한 딕셔너리 (조회에 실패하면 빈 딕셔너리)
+        """
         location_info = {}
-        if "Latitude" in labeled_exif and "Longitude" in labeled_exif:
-            try:
-                location = self._reverse_geocode(labeled_exif['Latitude'], labeled_exif['Longitude'])
-                if location:
-                    location_info = self._extract_address_components(location)
-            except GeocoderTimedOut:
-                self.logger.warning("지오코딩 서비스 시간 초과. 다시 시도해주세요.")
-            except Exception as e:
-                self.logger.error(f"위치 정보를 가져오는 데 실패했습니다: {e}")
+        try:
+            location = self._reverse_geocode(lat, lon)
+            if location:
+                location_info = self._extract_address_components(location)
+        except GeocoderTimedOut:
+            self.logger.warning("지오코딩 서비스 시간 초과. 재시도 횟수를 모두 사용했습니다.")
+        except FuturesTimeoutError as e:
+            self.logger.warning(f"지오코딩 대기 시간 초과로 주소 조회를 건너뜁니다: {e}")
+        except Exception as e:
+            self.logger.error(f"위치 정보를 가져오는 데 실패했습니다: {e}")
         return location_info
 
     def _reverse_geocode(self, lat: float, lon: float) -> Any:
         """
         위도와 경도를 이용해 역지오코딩을 수행합니다.
+        조회는 공유 스케줄러의 큐에 등록되고, 큐 길이와 요청 간격으로 계산한 시간(최대 max_geocode_wait)까지 기다립니다.
+        
+        :param lat: 위도
+        :param lon: 경도
+        :return: 역지오코딩 결과
+        :raises concurrent.futures.TimeoutError: 대기열이 너무 길거나 제한 시간 안에 결과가 나오지 않은 경우
+        """
+        return self.geocode_scheduler.resolve(lat, lon, self.max_geocode_wait, self.geolocator.timeout or 0.0)
+
+    def _query_nominatim(self, lat: float, lon: float) -> Any:
+        """
+        Nominatim에 역지오코딩을 요청합니다. 스케줄러 스레드에서만 호출됩니다.
         
         :param lat: 위도
         :param lon: 경도
@@ -1,72 +1,143 @@
 from ImageMetadataProcessor import ImageMetadataProcessor
 from ImageCaptionGenerator import ImageCaptionGenerator
-from typing import Dict, Any
+from ImageHandle import ImageHandle
+from LocationEnricher import LOCATION_PENDING
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, Optional, Union
 import logging
 
 class ImageProcessor:
-    def __init__(self, openai_api_key):
+    def __init__(self, openai_api_key, metadata_processor: Optional[ImageMetadataProcessor] = None,
+                 caption_generator: Optional[ImageCaptionGenerator] = None, pipelined: bool = True,
+                 stage_workers: int = 4):
         """
         ImageProcessor 클래스 초기화
+        인스턴스는 이미지별 상태를 갖지 않으므로 여러 스레드에서 동시에 process_image를 호출해도 안전합니다.
         
         :param openai_api_key: OpenAI API 키
+        :param metadata_processor: 사용할 메타데이터 처리기 (None이면 기본 설정으로 생성)
+        :param caption_generator: 사용할 캡션 생성기 (None이면 기본 설정으로 생성)
+        :param pipelined: True이면 네트워크 지오코딩과 캡션 생성을 동시에 진행합니다
+        :param stage_workers: 지오코딩 단계를 실행할 스레드 수
         """
-        self.metadata_processor = ImageMetadataProcessor()
-        self.caption_generator = ImageCaptionGenerator(openai_api_key)
+        self.metadata_processor = metadata_processor or ImageMetadataProcessor()
+        self.caption_generator = caption_generator or ImageCaptionGenerator(openai_api_key)
+        self.pipelined = pipelined
+        self.stage_executor = ThreadPoolExecutor(max_workers=stage_workers, thread_name_prefix="geocode-stage") if pipelined else None
         self.logger = logging.getLogger(__name__)
 
-    def process_image(self, image_path: str) -> Dict[str, Any]:
+    def process_image(self, image: Union[str, ImageHandle],
+                      on_stage: Optional[Callable[[str, Any], None]] = None,
+                      exif_profile: Optional[str] = None, caption: Optional[str] = None,
+                      location_state: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         이미지를 처리하고 메타데이터와 캡션을 생성합니다.
+        이미지는 한 번만 열리며 메타데이터 추출과 캡션 생성 단계가 같은 ImageHandle을 공유합니다.
+        파이프라인 모드에서는 네트워크 지오코딩을 별도 스레드에서 진행하는 동안 날짜와 좌표 힌트로 캡션을 생성하고,
+        주소는 조회가 끝난 뒤 메타데이터에 붙이므로 이미지당 소요 시간은 두 단계 중 긴 쪽에 가까워집니다.
+        이때 on_stage에는 EXIF와 좌표만 담긴 메타데이터('location_status': 'pending')를 먼저 보내고,
+        주소 조회가 끝나면 주소를 붙인 메타데이터를 다시 보냅니다.
         
-        :param image_path: 처리할 이미지의 경로
+        :param image: 처리할 이미지의 경로 또는 ImageHandle
+        :param on_stage: 각 단계가 끝날 때마다 ('metadata', 메타데이터) / ('caption', 캡션)으로 호출되는 콜백
+                         (파이프라인 모드에서 원격 조회가 필요하면 'metadata'가 두 번 호출됨)
+        :param exif_profile: EXIF 필드 선택 프로필 (None이면 메타데이터 처리기의 기본 프로필)
+        :param caption: 이미 정해진 캡션 (근접 중복 이미지는 대표 이미지의 캡션을 쓰고 캡션 생성을 건너뜁니다)
+        :param location_state: 위치 조회 상태를 채워 넣을 딕셔너리 ('refined': 위치 정보가 최종 결과인지, is_complete에 전달)
         :return: 이미지 경로, 메타데이터, 캡션을 포함한 딕셔너리
         """
+        if not isinstance(image, ImageHandle):
+            with ImageHandle(image) as handle:
+                return self.process_image(handle, on_stage, exif_profile, caption, location_state)
+
         try:
-            self.logger.info(f"이미지 처리 시작: {image_path}")
-            metadata = self._process_metadata(image_path)
-            caption = self._generate_caption(image_path, metadata)
-            return {
-                'image_path': image_path,
-                'metadata': metadata,
-                'caption': caption
-            }
+            self.logger.info(f"이미지 처리 시작: {image.name}")
+            metadata = self._process_metadata(image, exif_profile)
+            location_future = None
+            if self.pipelined and self.metadata_processor.needs_remote_lookup(metadata['labeled_exif']):
+                location_future = self.stage_executor.submit(self.metadata_processor.locate, metadata['labeled_exif'],
+                                                             location_state)
+                if on_stage:
+                    # 주소를 기다리지 않고 날짜와 좌표를 먼저 보냄 (주소는 아래에서 조회가 끝나면 다시 보냄)
+                    on_stage('metadata', {**metadata, 'location_status': 'pending'})
+            else:
+                metadata.update(self.metadata_processor.locate(metadata['labeled_exif'], location_state))
+                if on_stage:
+                    on_stage('metadata', metadata)
+
+            caption_encoding = {}
+            if caption is None:
+                caption = self._generate_caption(image, metadata, caption_encoding)
+
+            if location_future is not None:
+                metadata.update(location_future.result())
+                if on_stage:
+                    on_stage('metadata', metadata)
+            if on_stage:
+                on_stage('caption', caption)
+            return self._construct_result(image.path, metadata, caption, caption_encoding)
         except Exception as e:
-            self.logger.error(f"이미지 {image_path} 처리 중 오류 발생: {str(e)}")
+            self.logger.error(f"이미지 {image.name} 처리 중 오류 발생: {str(e)}")
             self.logger.exception(e)
             raise
 
-    def _process_metadata(self, image_path: str) -> Dict[str, Any]:
+    @staticmethod
+    def is_complete(result: Dict[str, Any], location_refined: bool = True) -> bool:
+        """
+        처리 결과가 재사용해도 될 만큼 완전한지 확인합니다.
+        캡션 생성이나 지오코딩이 일시적으로 실패한 결과는 저장하지 않기 위해 사용합니다.
+        
+        :param result: process_image의 처리 결과
+        :param location_refined: process_image가 location_state에 채운 'refined' 값
+        :return: 캡션과 (GPS 정보가 있는 경우) 위치 정보가 모두 채워졌으면 True
+                 (위치를 백그라운드에서 보강 중인 결과와 Nominatim 조회 실패로 로컬 지명 데이터만 쓴 결과도 False)
+        """
+        if result.get('caption') == ImageCaptionGenerator.CAPTION_ERROR_MESSAGE:
+            return False
+        metadata = result.get('metadata', {})
+        has_gps = 'Latitude' in metadata.get('labeled_exif', {})
+        location_info = metadata.get('location_info') or {}
+        pending = metadata.get('location_status') == LOCATION_PENDING
+        return not has_gps or (bool(location_info) and location_refined and not pending)
+
+    def _process_metadata(self, handle: ImageHandle, exif_profile: Optional[str] = None) -> Dict[str, Any]:
         """
-        이미지의 메타데이터를 추출합니다.
+        이미지의 메타데이터를 추출합니다. 위치 정보는 process_image에서 채웁니다.
         
-        :param image_path: 메타데이터를 추출할 이미지의 경로
+        :param handle: 메타데이터를 추출할 이미지 핸들
+        :param exif_profile: EXIF 필드 선택 프로필
         :return: 추출된 메타데이터
         """
-        self.logger.info(f"{image_path}에서 메타데이터 추출 중")
-        return self.metadata_processor.process(image_path)
+        self.logger.info(f"{handle.name}에서 메타데이터 추출 중")
+        return self.metadata_processor.extract(handle, exif_profile)
 
-    def _generate_caption(self, image_path: str, metadata: Dict[str, Any]) -> str:
+    def _generate_caption(self, handle: ImageHandle, metadata: Dict[str, Any],
+                          encoding_info: Optional[Dict[str, Any]] = None) -> str:
         """
         이미지에 대한 캡션을 생성합니다.
         
-        :param image_path: 캡션을 생성할 이미지의 경로
+        :param handle: 캡션을 생성할 이미지 핸들
         :param metadata: 이미지의 메타데이터
+        :param encoding_info: 캡션 요청에 보낸 이미지의 인코딩 정보를 채워 넣을 딕셔너리
         :return: 생성된 캡션
         """
-        self.logger.info(f"{image_path}에 대한 캡션 생성 중")
-        return self.caption_generator.generate_caption(image_path, metadata)
+        self.logger.info(f"{handle.name}에 대한 캡션 생성 중")
+        return self.caption_generator.generate_caption(handle, metadata, encoding_info)
 
-    def _construct_result(self, image_path: str, metadata: Dict[str, Any], caption: str) -> Dict[str, Any]:
+    def _construct_result(self, image_path: str, metadata: Dict[str, Any], caption: str,
+                          caption_encoding: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         처리 결과를 구성합니다.
         
         :param image_path: 처리된 이미지의 경로
         :param metadata: 추출된 메타데이터
         :param caption: 생성된 캡션
+        :param caption_encoding: 캡션 요청에 보낸 이미지의 detail, 크기, 품질, 바이트 수, 추정 토큰 수
         :return: 처리 결과를 포함한 딕셔너리
         """
         return {
             'image_path': image_path,
             'metadata': metadata,
-            'caption': caption
+            'caption': caption,
+            'caption_encoding': caption_encoding or {}
         }
\ No newline at end of file
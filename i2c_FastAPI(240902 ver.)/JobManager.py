@@ -0,0 +1,144 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+import socket
+import uuid
+import logging
+from typing import Any, Callable, Dict, List, Optional
+from JobStore import TERMINAL_IMAGE_STATUSES
+
+class JobManager:
+    def __init__(self, store, process_func: Callable[..., Dict[str, Any]], max_workers: int = 2,
+                 owner: Optional[str] = None):
+        """
+        JobManager 클래스 초기화
+        업로드된 이미지를 작업(job)으로 등록하고, 크기가 제한된 워커 풀에서 이미지별로 처리합니다.
+        처리 진행 상황과 결과는 작업 저장소에 기록됩니다.
+        여러 서버 워커 프로세스가 같은 저장소를 공유해도 각 작업은 그 작업을 소유한 JobManager 하나만 처리합니다.
+
+        :param store: 작업 저장소 (InMemoryJobStore 또는 SQLiteJobStore)
+        :param process_func: 저장된 업로드 하나를 처리하는 함수 (stored, on_stage) -> 처리 결과
+        :param max_workers: 동시에 처리할 이미지 수
+        :param owner: 저장소에 기록할 이 JobManager의 ID (None이면 '호스트 이름:프로세스 ID')
+        """
+        self.store = store
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+        self.process_func = process_func
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job-worker")
+        self.logger = logging.getLogger(__name__)
+
+    def submit(self, stored_uploads: List[Dict[str, Any]]) -> str:
+        """
+        저장된 업로드들을 새 작업으로 등록하고 처리를 예약합니다.
+
+        :param stored_uploads: UploadStore.ingest의 반환값 목록 (디스크에 저장된 파일이어야 합니다)
+        :return: 작업 ID
+        """
+        job_id = uuid.uuid4().hex
+        images = [
+            {
+                'index': index,
+                'file_name': stored['filename'],
+                'sha256': stored['sha256'],
+                'path': stored['path'],
+                'exif_profile': stored.get('exif_profile'),
+                'status': 'queued'
+            }
+            for index, stored in enumerate(stored_uploads)
+        ]
+        self.store.create_job(job_id, images, owner=self.owner)
+        self._schedule(job_id, images)
+        self.logger.info(f"작업 {job_id} 등록: 이미지 {len(images)}개")
+        return job_id
+
+    def resume(self) -> None:
+        """
+        서버 재시작 전에 끝나지 않은 작업을 다시 예약합니다.
+        모든 워커 프로세스가 시작할 때 호출하므로, 소유자가 없거나 소유자 프로세스가 종료된 작업만
+        저장소에서 원자적으로 가져와(claim) 예약합니다. 다른 워커가 먼저 가져간 작업은 건너뜁니다.
+        원본 파일이 남아 있지 않은 이미지는 실패로 표시합니다.
+        """
+        for job in self.store.claim_unfinished(self.owner, self._owner_is_gone):
+            pending = []
+            for image in job['images']:
+                if image['status'] in TERMINAL_IMAGE_STATUSES:
+                    continue
+                if image.get('path') and os.path.exists(image['path']):
+                    pending.append(image)
+                else:
+                    self.store.update_image(job['job_id'], image['index'], status='failed',
+                                            error="원본 이미지를 찾을 수 없어 작업을 이어서 처리할 수 없습니다.")
+            self._schedule(job['job_id'], pending)
+            self.logger.info(f"작업 {job['job_id']} 재개: 이미지 {len(pending)}개")
+
+    def shutdown(self) -> None:
+        """
+        워커 풀을 정리하고 작업 소유를 해제합니다. 처리 중이던 작업은 다음 시작 시 resume으로 이어서 처리됩니다.
+        """
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.store.release(self.owner)
+
+    def _owner_is_gone(self, owner: str) -> bool:
+        """
+        작업 소유자가 더 이상 작업을 처리하지 않는지 확인합니다.
+        SQLite WAL 모드는 한 호스트에서만 공유할 수 있으므로 다른 호스트 이름의 소유자는 이전 실행(컨테이너 등)으로 봅니다.
+        같은 호스트에서는 프로세스가 살아 있는지 확인하며, 같은 ID(재시작으로 프로세스 ID가 같아진 경우)는 자기 작업으로 봅니다.
+
+        :param owner: 저장소에 기록된 소유자 ID
+        :return: 소유자가 종료되어 작업을 가져가도 되면 True
+        """
+        if owner == self.owner:
+            return True
+        host, _, pid = owner.rpartition(':')
+        if host != socket.gethostname() or not pid.isdigit():
+            return True
+        if os.name == 'nt':
+            # Windows의 os.kill은 프로세스를 종료시키므로 확인하지 않고 살아 있는 것으로 봅니다.
+            return False
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            return False
+        return False
+
+    def _schedule(self, job_id: str, images: List[Dict[str, Any]]) -> None:
+        """
+        이미지별 처리 작업을 워커 풀에 제출합니다.
+
+        :param job_id: 작업 ID
+        :param images: 처리할 이미지 목록
+        """
+        for image in images:
+            self.executor.submit(self._run_image, job_id, image)
+
+    def _run_image(self, job_id: str, image: Dict[str, Any]) -> None:
+        """
+        이미지 하나를 처리하고 단계별 진행 상황을 저장소에 기록합니다.
+
+        :param job_id: 작업 ID
+        :param image: 처리할 이미지 정보
+        """
+        index = image['index']
+        self.store.update_image(job_id, index, status='running')
+
+        def on_stage(stage: str, value: Any) -> None:
+            if stage == 'metadata':
+                self.store.update_image(job_id, index, status='metadata', metadata=value)
+
+        stored = {
+            'path': image['path'],
+            'sha256': image['sha256'],
+            'filename': image['file_name'],
+            'file': image['path'],
+            'exif_profile': image.get('exif_profile')
+        }
+        try:
+            result = self.process_func(stored, on_stage)
+            self.store.update_image(job_id, index, status='done', metadata=result['metadata'],
+                                    caption=result['caption'], image_path=result['image_path'])
+        except Exception as e:
+            self.logger.error(f"작업 {job_id}의 이미지 {image['file_name']} 처리 중 오류 발생: {str(e)}")
+            self.logger.exception(e)
+            self.store.update_image(job_id, index, status='failed',
+                                    error=f"이미지 {image['file_name']} 처리 중 오류 발생: {str(e)}")
@@ -0,0 +1,290 @@
+import copy
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# 더 이상 상태가 바뀌지 않는 작업/이미지 상태
+TERMINAL_JOB_STATUSES = ('completed', 'failed')
+TERMINAL_IMAGE_STATUSES = ('done', 'failed')
+
+def derive_job_status(images: List[Dict[str, Any]]) -> str:
+    """
+    이미지별 상태로부터 작업 전체의 상태를 계산합니다.
+
+    :param images: 작업에 포함된 이미지 목록
+    :return: 'queued', 'running', 'completed', 'failed' 중 하나
+    """
+    statuses = [image['status'] for image in images]
+    if all(status in TERMINAL_IMAGE_STATUSES for status in statuses):
+        return 'failed' if statuses and all(status == 'failed' for status in statuses) else 'completed'
+    if all(status == 'queued' for status in statuses):
+        return 'queued'
+    return 'running'
+
+class InMemoryJobStore:
+    def __init__(self):
+        """
+        InMemoryJobStore 클래스 초기화
+        작업 상태를 프로세스 메모리에 보관합니다. 서버를 재시작하면 작업이 사라집니다.
+        """
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        # 작업을 처리하는 JobManager의 ID (작업 상태와 따로 두어 조회 결과에 포함되지 않음)
+        self._owners: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+
+    def create_job(self, job_id: str, images: List[Dict[str, Any]], owner: Optional[str] = None) -> None:
+        """
+        새 작업을 등록합니다.
+
+        :param job_id: 작업 ID
+        :param images: 이미지 목록 (각 항목은 'index', 'file_name', 'status' 등을 포함)
+        :param owner: 작업을 처리할 JobManager의 ID
+        """
+        now = time.time()
+        with self._lock:
+            self._owners[job_id] = owner
+            self._jobs[job_id] = {
+                'job_id': job_id,
+                'status': derive_job_status(images),
+                'version': 0,
+                'created_at': now,
+                'updated_at': now,
+                'images': copy.deepcopy(images)
+            }
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        작업 상태를 조회합니다.
+
+        :param job_id: 작업 ID
+        :return: 작업 상태의 복사본, 없으면 None
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return copy.deepcopy(job) if job else None
+
+    def update_image(self, job_id: str, index: int, **fields: Any) -> None:
+        """
+        작업에 포함된 이미지 하나의 상태를 갱신하고 작업 버전을 올립니다.
+
+        :param job_id: 작업 ID
+        :param index: 이미지 인덱스
+        :param fields: 갱신할 필드
+        """
+        with self._lock:
+            job = self._jobs[job_id]
+            job['images'][index].update(copy.deepcopy(fields))
+            job['status'] = derive_job_status(job['images'])
+            job['version'] += 1
+            job['updated_at'] = time.time()
+
+    def list_unfinished(self) -> List[Dict[str, Any]]:
+        """
+        아직 끝나지 않은 작업 목록을 반환합니다.
+
+        :return: 작업 상태 목록
+        """
+        with self._lock:
+            return [copy.deepcopy(job) for job in self._jobs.values() if job['status'] not in TERMINAL_JOB_STATUSES]
+
+    def claim_unfinished(self, owner: str, is_stale: Callable[[str], bool]) -> List[Dict[str, Any]]:
+        """
+        끝나지 않은 작업 중 처리하는 JobManager가 없거나 is_stale이 True인 작업을 owner 소유로 바꾸고 반환합니다.
+
+        :param owner: 작업을 가져갈 JobManager의 ID
+        :param is_stale: 기존 소유자 ID를 받아 더 이상 처리하지 않는 소유자이면 True를 반환하는 함수
+        :return: 가져온 작업 상태 목록
+        """
+        with self._lock:
+            claimed = []
+            for job_id, job in self._jobs.items():
+                current = self._owners.get(job_id)
+                if job['status'] not in TERMINAL_JOB_STATUSES and (current is None or is_stale(current)):
+                    self._owners[job_id] = owner
+                    claimed.append(copy.deepcopy(job))
+            return claimed
+
+    def release(self, owner: str) -> None:
+        """
+        owner가 처리하던 작업의 소유를 해제하여 다음에 시작하는 JobManager가 이어서 처리하도록 합니다.
+
+        :param owner: JobManager의 ID
+        """
+        with self._lock:
+            for job_id, current in self._owners.items():
+                if current == owner:
+                    self._owners[job_id] = None
+
+class SQLiteJobStore:
+    def __init__(self, db_path: str = "jobs.sqlite3"):
+        """
+        SQLiteJobStore 클래스 초기화
+        작업 상태를 SQLite 파일에 보관하므로 서버를 재시작해도 작업을 이어서 처리할 수 있습니다.
+        여러 워커 프로세스가 같은 파일을 공유할 수 있으며, 각 작업은 owner 열에 기록된 JobManager 하나만 처리합니다.
+
+        :param db_path: SQLite 데이터베이스 파일 경로
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                images TEXT NOT NULL,
+                owner TEXT
+            )
+        """)
+        self._add_owner_column()
+        self._conn.commit()
+
+    def _add_owner_column(self) -> None:
+        """
+        owner 열이 없는 이전 버전의 데이터베이스에 열을 추가합니다.
+        여러 워커가 동시에 시작해 다른 워커가 먼저 추가한 경우는 무시합니다.
+        """
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")]
+        if 'owner' in columns:
+            return
+        try:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+        except sqlite3.OperationalError as e:
+            if 'duplicate column' not in str(e):
+                raise
+
+    def create_job(self, job_id: str, images: List[Dict[str, Any]], owner: Optional[str] = None) -> None:
+        """
+        새 작업을 등록합니다.
+
+        :param job_id: 작업 ID
+        :param images: 이미지 목록 (각 항목은 'index', 'file_name', 'status' 등을 포함)
+        :param owner: 작업을 처리할 JobManager의 ID
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, status, version, created_at, updated_at, images, owner) "
+                "VALUES (?, ?, 0, ?, ?, ?, ?)",
+                (job_id, derive_job_status(images), now, now, json.dumps(images, ensure_ascii=False), owner)
+            )
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        작업 상태를 조회합니다.
+
+        :param job_id: 작업 ID
+        :return: 작업 상태, 없으면 None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT job_id, status, version, created_at, updated_at, images FROM jobs WHERE job_id = ?",
+                (job_id,)
+            ).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def update_image(self, job_id: str, index: int, **fields: Any) -> None:
+        """
+        작업에 포함된 이미지 하나의 상태를 갱신하고 작업 버전을 올립니다.
+
+        :param job_id: 작업 ID
+        :param index: 이미지 인덱스
+        :param fields: 갱신할 필드
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT images FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            images = json.loads(row[0])
+            images[index].update(fields)
+            self._conn.execute(
+                "UPDATE jobs SET images = ?, status = ?, version = version + 1, updated_at = ? WHERE job_id = ?",
+                (json.dumps(images, ensure_ascii=False), derive_job_status(images), time.time(), job_id)
+            )
+
+    def list_unfinished(self) -> List[Dict[str, Any]]:
+        """
+        아직 끝나지 않은 작업 목록을 반환합니다.
+
+        :return: 작업 상태 목록
+        """
+        placeholders = ", ".join("?" for _ in TERMINAL_JOB_STATUSES)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT job_id, status, version, created_at, updated_at, images FROM jobs "
+                f"WHERE status NOT IN ({placeholders})",
+                TERMINAL_JOB_STATUSES
+            ).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def claim_unfinished(self, owner: str, is_stale: Callable[[str], bool]) -> List[Dict[str, Any]]:
+        """
+        끝나지 않은 작업 중 처리하는 JobManager가 없거나 is_stale이 True인 작업을 owner 소유로 바꾸고 반환합니다.
+        소유자는 읽은 값이 그대로일 때만 바꾸므로(compare-and-set) 여러 워커가 동시에 호출해도 작업마다 한 워커만 가져갑니다.
+
+        :param owner: 작업을 가져갈 JobManager의 ID
+        :param is_stale: 기존 소유자 ID를 받아 더 이상 처리하지 않는 소유자이면 True를 반환하는 함수
+        :return: 가져온 작업 상태 목록
+        """
+        placeholders = ", ".join("?" for _ in TERMINAL_JOB_STATUSES)
+        with self._lock:
+            candidates = self._conn.execute(
+                f"SELECT job_id, owner FROM jobs WHERE status NOT IN ({placeholders})",
+                TERMINAL_JOB_STATUSES
+            ).fetchall()
+            claimed_ids = []
+            for job_id, current in candidates:
+                if current is not None and not is_stale(current):
+                    continue
+                with self._conn:
+                    cursor = self._conn.execute(
+                        f"UPDATE jobs SET owner = ? WHERE job_id = ? AND owner IS ? AND status NOT IN ({placeholders})",
+                        (owner, job_id, current, *TERMINAL_JOB_STATUSES)
+                    )
+                if cursor.rowcount == 1:
+                    claimed_ids.append(job_id)
+        return [job for job in map(self.get_job, claimed_ids) if job is not None]
+
+    def release(self, owner: str) -> None:
+        """
+        owner가 처리하던 작업의 소유를 해제하여 다음에 시작하는 JobManager가 이어서 처리하도록 합니다.
+
+        :param owner: JobManager의 ID
+        """
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE jobs SET owner = NULL WHERE owner = ?", (owner,))
+
+    @staticmethod
+    def _row_to_job(row: tuple) -> Dict[str, Any]:
+        """
+        데이터베이스 행을 작업 상태 딕셔너리로 변환합니다.
+
+        :param row: jobs 테이블의 행
+        :return: 작업 상태
+        """
+        job_id, status, version, created_at, updated_at, images = row
+        return {
+            'job_id': job_id,
+            'status': status,
+            'version': version,
+            'created_at': created_at,
+            'updated_at': updated_at,
+            'images': json.loads(images)
+        }
+
+def create_job_store(kind: str = "memory", db_path: str = "jobs.sqlite3"):
+    """
+    설정에 맞는 작업 저장소를 생성합니다.
+
+    :param kind: 'memory' 또는 'sqlite'
+    :param db_path: SQLite 저장소를 사용할 때의 데이터베이스 파일 경로
+    :return: 작업 저장소 객체
+    """
+    if kind == "sqlite":
+        return SQLiteJobStore(db_path)
+    if kind != "memory":
+        raise ValueError(f"지원하지 않는 작업 저장소입니다: {kind}")
+    return InMemoryJobStore()
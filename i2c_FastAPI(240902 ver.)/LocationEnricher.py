@@ -0,0 +1,128 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import copy
+import hashlib
+import threading
+import logging
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# 위치 보강 상태
+LOCATION_PENDING = 'pending'
+LOCATION_RESOLVED = 'resolved'
+LOCATION_FAILED = 'failed'
+
+class LocationEnricher:
+    def __init__(self, max_workers: int = 2, max_entries: int = 10000):
+        """
+        LocationEnricher 클래스 초기화
+        업로드 처리 경로에서 지오코딩을 기다리지 않도록, 좌표의 주소 조회를 백그라운드에서 진행하고
+        위치 ID별로 진행 상태와 결과를 보관합니다.
+
+        :param max_workers: 동시에 진행할 조회 수 (실제 요청 속도는 지오코딩 스케줄러가 제한합니다)
+        :param max_entries: 보관할 위치 항목의 최대 수 (오래된 항목부터 제거)
+        """
+        self.max_entries = max_entries
+        self.logger = logging.getLogger(__name__)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="location-enricher")
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # 조회는 끝났지만 resolver가 최종 결과가 아니라고 알린 (임시로 대신한) 결과의 위치 ID
+        self._provisional = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def location_id(lat: float, lon: float) -> str:
+        """
+        좌표의 위치 ID를 계산합니다.
+
+        :param lat: 위도
+        :param lon: 경도
+        :return: 위치 ID
+        """
+        return hashlib.sha1(f"{lat:.6f},{lon:.6f}".encode()).hexdigest()[:16]
+
+    def submit(self, lat: float, lon: float,
+               resolver: Callable[[float, float], Tuple[Dict[str, str], bool]]) -> Dict[str, Any]:
+        """
+        좌표의 주소 조회를 백그라운드에 예약하고 현재 상태를 즉시 반환합니다.
+        이미 조회했거나 조회 중인 좌표는 다시 예약하지 않으며, 실패했던 좌표는 다시 조회합니다.
+        최종 결과가 아닌 결과는 그대로 보여 주되, 같은 좌표가 다시 들어오면 'pending' 상태로 되돌리고 백그라운드에서 다시 조회합니다.
+
+        :param lat: 위도
+        :param lon: 경도
+        :param resolver: 주소 조회 함수 (lat, lon) -> (위치 정보, 최종 결과인지)
+        :return: 'location_id', 'status', 'location_info'를 포함한 위치 상태
+        """
+        location_id = self.location_id(lat, lon)
+        with self._lock:
+            entry = self._entries.get(location_id)
+            if entry is None or entry['status'] == LOCATION_FAILED:
+                entry = {'location_id': location_id, 'status': LOCATION_PENDING, 'location_info': {}}
+                self._entries[location_id] = entry
+                schedule = True
+            elif location_id in self._provisional:
+                self._provisional.discard(location_id)
+                entry['status'] = LOCATION_PENDING
+                schedule = True
+            else:
+                schedule = False
+            self._entries.move_to_end(location_id)
+            while len(self._entries) > self.max_entries:
+                evicted_id, _ = self._entries.popitem(last=False)
+                self._provisional.discard(evicted_id)
+            snapshot = copy.deepcopy(entry)
+
+        if schedule:
+            self.executor.submit(self._resolve, location_id, lat, lon, resolver)
+        return snapshot
+
+    def get(self, location_id: str) -> Optional[Dict[str, Any]]:
+        """
+        위치 상태를 조회합니다.
+
+        :param location_id: 위치 ID
+        :return: 위치 상태의 복사본, 없으면 None
+        """
+        with self._lock:
+            entry = self._entries.get(location_id)
+            return copy.deepcopy(entry) if entry else None
+
+    def get_location_info(self, location_id: str) -> Optional[Dict[str, str]]:
+        """
+        조회가 끝난 위치 정보만 반환합니다. 최종 결과가 아니어서 다시 조회 중인 좌표는 이전 결과를 반환합니다.
+
+        :param location_id: 위치 ID
+        :return: 위치 정보, 아직 조회 중이거나 실패했으면 None
+        """
+        entry = self.get(location_id)
+        if entry and entry['status'] != LOCATION_FAILED and entry['location_info']:
+            return entry['location_info']
+        return None
+
+    def shutdown(self) -> None:
+        """
+        백그라운드 조회 스레드 풀을 정리합니다.
+        """
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _resolve(self, location_id: str, lat: float, lon: float,
+                 resolver: Callable[[float, float], Tuple[Dict[str, str], bool]]) -> None:
+        """
+        주소를 조회하고 결과를 기록합니다.
+
+        :param location_id: 위치 ID
+        :param lat: 위도
+        :param lon: 경도
+        :param resolver: 주소 조회 함수 (lat, lon) -> (위치 정보, 최종 결과인지)
+        """
+        try:
+            location_info, refined = resolver(lat, lon)
+        except Exception as e:
+            self.logger.error(f"위치 {location_id} 보강 중 오류 발생: {e}")
+            location_info, refined = {}, True
+        with self._lock:
+            entry = self._entries.get(location_id)
+            if entry is not None:
+                entry['status'] = LOCATION_RESOLVED if location_info else LOCATION_FAILED
+                entry['location_info'] = location_info
+                if location_info and not refined:
+                    self._provisional.add(location_id)
@@ -0,0 +1,196 @@
+import csv
+import math
+import os
+import sys
+import logging
+from typing import Dict, List, Optional, Tuple
+
+# 지구 평균 반지름 (km)
+EARTH_RADIUS_KM = 6371.0088
+
+# 위도 1도의 거리 (km)
+KM_PER_DEGREE = 111.195
+
+# GeoNames 지명 파일(citiesXXX.txt, allCountries.txt)의 열 위치
+GEONAMES_COLUMNS = {
+    'name': 1,
+    'latitude': 4,
+    'longitude': 5,
+    'feature_class': 6,
+    'feature_code': 7,
+    'country_code': 8,
+    'admin1_code': 10
+}
+
+# 도시의 일부 구역을 나타내는 지명 코드 (suburb로 사용)
+SECTION_FEATURE_CODES = ('PPLX',)
+
+# 역지오코딩에 사용하지 않는 지명 코드 (폐허, 폐지된 지명 등)
+IGNORED_FEATURE_CODES = ('PPLH', 'PPLQ', 'PPLW')
+
+class OfflineGeocoder:
+    def __init__(self, gazetteer_path: str, cell_degrees: float = 0.25, max_distance_km: float = 30.0):
+        """
+        OfflineGeocoder 클래스 초기화
+        GeoNames 형식의 지명 데이터를 격자(grid) 색인으로 메모리에 올려 네트워크 없이 역지오코딩합니다.
+        같은 폴더에 admin1CodesASCII.txt, countryInfo.txt가 있으면 행정구역과 국가 이름도 채웁니다.
+
+        :param gazetteer_path: GeoNames 지명 파일 경로 (예: gazetteer/cities1000.txt)
+        :param cell_degrees: 격자 한 칸의 크기 (도 단위)
+        :param max_distance_km: 이 거리 안에 지명이 없으면 결과를 반환하지 않습니다
+        """
+        self.gazetteer_path = gazetteer_path
+        self.cell_degrees = cell_degrees
+        self.max_distance_km = max_distance_km
+        self.logger = logging.getLogger(__name__)
+        self._cells: Dict[Tuple[int, int], List[Tuple[float, float, str, str, str, bool]]] = {}
+        self._lon_cells = int(round(360 / cell_degrees))
+
+        directory = os.path.dirname(gazetteer_path)
+        self._admin1_names = self._load_admin1_names(os.path.join(directory, "admin1CodesASCII.txt"))
+        self._country_names = self._load_country_names(os.path.join(directory, "countryInfo.txt"))
+        self.place_count = self._load_places(gazetteer_path)
+        self.logger.info(f"오프라인 지오코더: 지명 {self.place_count}개, 격자 {len(self._cells)}칸 로드 완료")
+
+    def reverse(self, lat: float, lon: float) -> Dict[str, str]:
+        """
+        좌표에서 가장 가까운 지명을 찾아 위치 정보를 반환합니다.
+        반환 형식은 ImageMetadataProcessor._extract_address_components와 같습니다.
+
+        :param lat: 위도
+        :param lon: 경도
+        :return: 위치 정보를 포함한 딕셔너리 (max_distance_km 안에 지명이 없으면 빈 딕셔너리)
+        """
+        nearest_place, nearest_section = self._nearest(lat, lon)
+        if nearest_place is None:
+            return {}
+        _, _, city, country_code, admin1_code, _ = nearest_place
+
+        suburb = ''
+        if nearest_section is not None and nearest_section[3] == country_code:
+            suburb = nearest_section[2]
+
+        country = self._country_names.get(country_code, country_code)
+        state = self._admin1_names.get(f"{country_code}.{admin1_code}", '')
+        return {
+            "full_address": ", ".join(part for part in (suburb, city, state, country) if part),
+            "country": country,
+            "state": state,
+            "city": city,
+            "suburb": suburb,
+            "road": '',
+            "house_number": '',
+            "postcode": ''
+        }
+
+    def _nearest(self, lat: float, lon: float) -> Tuple[Optional[tuple], Optional[tuple]]:
+        """
+        max_distance_km 반경에 걸치는 격자 칸만 확인하여 가장 가까운 지명과 도시 구역(PPLX)을 찾습니다.
+
+        :param lat: 위도
+        :param lon: 경도
+        :return: (가장 가까운 지명, 가장 가까운 도시 구역), 없으면 각각 None
+        """
+        lat_radius = math.ceil(self.max_distance_km / (KM_PER_DEGREE * self.cell_degrees))
+        cos_lat = max(math.cos(math.radians(min(abs(lat) + lat_radius * self.cell_degrees, 90.0))), 1e-6)
+        lon_radius = min(math.ceil(lat_radius / cos_lat), self._lon_cells // 2)
+        row, col = self._cell(lat, lon)
+
+        # 인덱스 0: 일반 지명, 1: 도시 구역
+        best = [None, None]
+        best_distance = [self.max_distance_km, self.max_distance_km]
+        for d_row in range(-lat_radius, lat_radius + 1):
+            for d_col in range(-lon_radius, lon_radius + 1):
+                for place in self._cells.get((row + d_row, (col + d_col) % self._lon_cells), ()):
+                    distance = haversine_km(lat, lon, place[0], place[1])
+                    kind = int(place[5])
+                    if distance <= best_distance[kind]:
+                        best[kind], best_distance[kind] = place, distance
+        return best[0], best[1]
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        """
+        좌표가 속한 격자 칸을 계산합니다.
+
+        :param lat: 위도
+        :param lon: 경도
+        :return: (행, 열)
+        """
+        return (math.floor(lat / self.cell_degrees),
+                math.floor((lon + 180.0) / self.cell_degrees) % self._lon_cells)
+
+    def _load_places(self, path: str) -> int:
+        """
+        GeoNames 지명 파일에서 인구 밀집 지역(feature class 'P')을 읽어 격자 색인에 추가합니다.
+
+        :param path: 지명 파일 경로
+        :return: 색인한 지명 수
+        """
+        count = 0
+        columns = GEONAMES_COLUMNS
+        with open(path, encoding="utf-8", newline="") as f:
+            for row in csv.reader(f, delimiter="\t", quoting=csv.QUOTE_NONE):
+                if len(row) <= columns['admin1_code'] or row[columns['feature_class']] != 'P':
+                    continue
+                feature_code = row[columns['feature_code']]
+                if feature_code in IGNORED_FEATURE_CODES:
+                    continue
+                lat = float(row[columns['latitude']])
+                lon = float(row[columns['longitude']])
+                place = (
+                    lat,
+                    lon,
+                    row[columns['name']],
+                    sys.intern(row[columns['country_code']]),
+                    sys.intern(row[columns['admin1_code']]),
+                    feature_code in SECTION_FEATURE_CODES
+                )
+                self._cells.setdefault(self._cell(lat, lon), []).append(place)
+                count += 1
+        return count
+
+    def _load_admin1_names(self, path: str) -> Dict[str, str]:
+        """
+        admin1CodesASCII.txt에서 1차 행정구역 이름을 읽습니다.
+
+        :param path: 파일 경로
+        :return: "국가코드.행정구역코드"를 키로 하는 행정구역 이름
+        """
+        names = {}
+        if not os.path.exists(path):
+            self.logger.warning(f"{path}가 없어 state 정보를 채우지 않습니다.")
+            return names
+        with open(path, encoding="utf-8", newline="") as f:
+            for row in csv.reader(f, delimiter="\t", quoting=csv.QUOTE_NONE):
+                if len(row) >= 2:
+                    names[row[0]] = row[1]
+        return names
+
+    def _load_country_names(self, path: str) -> Dict[str, str]:
+        """
+        countryInfo.txt에서 국가 이름을 읽습니다.
+
+        :param path: 파일 경로
+        :return: ISO 국가코드를 키로 하는 국가 이름
+        """
+        names = {}
+        if not os.path.exists(path):
+            self.logger.warning(f"{path}가 없어 국가 이름 대신 국가 코드를 사용합니다.")
+            return names
+        with open(path, encoding="utf-8", newline="") as f:
+            for row in csv.reader(f, delimiter="\t", quoting=csv.QUOTE_NONE):
+                if len(row) >= 5 and not row[0].startswith('#'):
+                    names[row[0]] = row[4]
+        return names
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    두 좌표 사이의 대원 거리를 계산합니다.
+
+    :return: 거리 (km)
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
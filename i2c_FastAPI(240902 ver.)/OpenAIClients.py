@@ -0,0 +1,46 @@
+import httpx
+import logging
+from openai import OpenAI, AsyncOpenAI
+
+class OpenAIClients:
+    def __init__(self, openai_api_key: str, max_connections: int = 200, max_keepalive_connections: int = 50,
+                 keepalive_expiry: float = 60.0, connect_timeout: float = 5.0, read_timeout: float = 60.0,
+                 max_retries: int = 2):
+        """
+        OpenAIClients 클래스 초기화
+        캡션 생성과 글 생성이 함께 사용할 OpenAI 클라이언트(동기/비동기)를 한 번만 만듭니다.
+        두 클라이언트는 각각 하나의 HTTP 연결 풀을 keep-alive로 재사용하므로 호출마다 TLS 연결을 새로 맺지 않으며,
+        비동기 클라이언트는 스레드 하나 없이 수백 개의 호출을 동시에 진행할 수 있습니다.
+
+        :param openai_api_key: OpenAI API 키
+        :param max_connections: 클라이언트별 최대 동시 연결 수
+        :param max_keepalive_connections: 유휴 상태로 유지할 최대 연결 수
+        :param keepalive_expiry: 유휴 연결을 유지하는 시간(초)
+        :param connect_timeout: 연결 시간 제한(초)
+        :param read_timeout: 기본 응답 대기 시간 제한(초), 호출마다 timeout으로 바꿀 수 있습니다
+        :param max_retries: 일시적인 오류에 대한 재시도 횟수
+        """
+        self.logger = logging.getLogger(__name__)
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.client = OpenAI(
+            api_key=openai_api_key,
+            max_retries=max_retries,
+            http_client=httpx.Client(limits=limits, timeout=timeout)
+        )
+        self.async_client = AsyncOpenAI(
+            api_key=openai_api_key,
+            max_retries=max_retries,
+            http_client=httpx.AsyncClient(limits=limits, timeout=timeout)
+        )
+
+    async def aclose(self) -> None:
+        """
+        두 클라이언트의 연결 풀을 닫습니다.
+        """
+        self.client.close()
+        await self.async_client.close()
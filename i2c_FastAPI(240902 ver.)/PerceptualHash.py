@@ -0,0 +1,51 @@
+import numpy as np
+from PIL import Image
+from typing import Dict, List, Sequence
+
+# dHash 크기: (HASH_SIZE + 1) x HASH_SIZE 흑백 이미지에서 HASH_SIZE * HASH_SIZE 비트 해시를 만듭니다.
+HASH_SIZE = 8
+
+def dhash(img: Image.Image, hash_size: int = HASH_SIZE) -> int:
+    """
+    이미지의 차분 해시(dHash)를 계산합니다.
+    작은 흑백 이미지에서 가로로 이웃한 픽셀의 밝기 증감을 비트로 기록하므로
+    크기 조정, 재압축, 약간의 노출 변화에는 해시가 거의 바뀌지 않습니다.
+
+    :param img: PIL 이미지 객체
+    :param hash_size: 해시 한 변의 비트 수
+    :return: hash_size * hash_size 비트 정수
+    """
+    gray = img.convert('L').resize((hash_size + 1, hash_size), Image.BOX)
+    pixels = np.asarray(gray, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+def hamming_distance(a: int, b: int) -> int:
+    """
+    두 해시의 다른 비트 수를 계산합니다.
+
+    :param a: 해시
+    :param b: 해시
+    :return: 해밍 거리
+    """
+    return bin(a ^ b).count('1')
+
+def group_near_duplicates(hashes: Sequence[int], threshold: int) -> Dict[int, int]:
+    """
+    해시가 서로 가까운 이미지를 묶고, 각 묶음에서 가장 먼저 나온 이미지를 대표로 정합니다.
+    이미지는 입력 순서대로 기존 대표 이미지와 비교하며, 해밍 거리가 threshold 이하인 대표가 있으면 그 묶음에 들어갑니다.
+
+    :param hashes: 이미지별 해시 (입력 순서)
+    :param threshold: 같은 장면으로 볼 최대 해밍 거리
+    :return: {중복 이미지 위치: 대표 이미지 위치} (대표 이미지는 포함하지 않음)
+    """
+    representatives: List[int] = []
+    duplicates: Dict[int, int] = {}
+    for position, value in enumerate(hashes):
+        for representative in representatives:
+            if hamming_distance(value, hashes[representative]) <= threshold:
+                duplicates[position] = representative
+                break
+        else:
+            representatives.append(position)
+    return duplicates
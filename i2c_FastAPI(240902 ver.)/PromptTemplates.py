@@ -0,0 +1,100 @@
+import logging
+from typing import Dict, Mapping, Optional, Tuple
+from writing_styles import STYLE_SPECIFIC_INSTRUCTIONS
+from writing_tones import WRITING_TONES
+
+# 모든 요청에 공통인 작가 역할 지시 (해시태그 생성처럼 스타일/톤이 없는 요청의 시스템 프롬프트로도 사용)
+WRITER_ROLE = "당신은 여러 이미지의 정보를 종합하여 하나의 연결된 글을 작성하는 전문 작가입니다."
+
+class PromptTemplates:
+    def __init__(self, styles: Optional[Mapping[str, str]] = None, tones: Optional[Mapping[str, tuple]] = None):
+        """
+        PromptTemplates 클래스 초기화
+        글 생성 프롬프트를 (글쓰기 스타일, 톤)마다 변하지 않는 시스템 프롬프트와 요청마다 달라지는 사용자 프롬프트로 나눕니다.
+        스타일 지침과 톤 설명처럼 길고 고정된 내용을 모두 시스템 프롬프트 앞쪽에 두고 시작 시 한 번만 만들어 두므로,
+        같은 (스타일, 톤) 요청은 항상 같은 접두부로 시작하여 API 제공자의 프롬프트 접두부 캐시를 사용할 수 있습니다.
+        사용자 정보, 컨텍스트, 글 길이, 이미지 정보는 모두 사용자 프롬프트(뒤쪽)에 들어갑니다.
+
+        :param styles: 글쓰기 스타일별 지침 (기본값: STYLE_SPECIFIC_INSTRUCTIONS)
+        :param tones: 톤 키별 (영문 이름, 한글 이름, 설명) (기본값: WRITING_TONES)
+        """
+        self.styles = styles if styles is not None else STYLE_SPECIFIC_INSTRUCTIONS
+        self.tones = tones if tones is not None else WRITING_TONES
+        self.logger = logging.getLogger(__name__)
+        self._system_prompts: Dict[Tuple[str, str], str] = {
+            (style, tone): self._compile_system_prompt(style, tone) for style in self.styles for tone in self.tones
+        }
+        self.logger.info(f"시스템 프롬프트 {len(self._system_prompts)}개를 미리 만들었습니다.")
+
+    def system_prompt(self, writing_style: str, writing_tone: str) -> str:
+        """
+        (글쓰기 스타일, 톤)의 시스템 프롬프트를 반환합니다.
+        알 수 없는 톤은 톤 지시 없이 그때그때 만들며 (요청 값으로 캐시가 커지지 않도록 저장하지 않음),
+        알 수 없는 스타일은 KeyError가 발생합니다.
+
+        :param writing_style: 글쓰기 스타일
+        :param writing_tone: 톤 키
+        :return: 시스템 프롬프트
+        """
+        prompt = self._system_prompts.get((writing_style, writing_tone))
+        return prompt if prompt is not None else self._compile_system_prompt(writing_style, writing_tone)
+
+    def story_prompt(self, writing_style: str, writing_length: int, user_context: str, age: str, gender: str,
+                     image_section: str) -> str:
+        """
+        요청마다 달라지는 내용으로 사용자 프롬프트를 만듭니다.
+
+        :param writing_style: 글쓰기 스타일
+        :param writing_length: 글 길이(자)
+        :param user_context: 사용자 제공 추가 정보
+        :param age: 작성자 나이
+        :param gender: 작성자 성별
+        :param image_section: 이미지별 캡션과 메타데이터를 담은 이미지 정보
+        :return: 사용자 프롬프트
+        """
+        context_prompt = f"사용자 제공 추가 정보: {user_context}" if user_context else "사용자가 제공한 추가 정보 없음"
+        return f"""다음 정보를 바탕으로 {writing_style}을 작성해주세요:
+            1. 컨텍스트: {context_prompt}
+            2. 글 길이: 정확히 {writing_length}자 (±10자 오차 허용)
+            3. 작성자 정보: 저는 {age}세 {gender}입니다.
+
+            이미지 정보:
+            {image_section}
+
+        글자 수를 다시 한 번 확인하고 정확히 {writing_length}자(±10자)로 조정하세요.
+        """
+
+    def _compile_system_prompt(self, writing_style: str, writing_tone: str) -> str:
+        """
+        (글쓰기 스타일, 톤)의 시스템 프롬프트를 만듭니다. 요청마다 달라지는 값은 넣지 않습니다.
+
+        :param writing_style: 글쓰기 스타일
+        :param writing_tone: 톤 키
+        :return: 시스템 프롬프트
+        """
+        _, tone_name, tone_description = self.tones.get(writing_tone, ('', '', 'N/A'))
+        return f"""{WRITER_ROLE}
+        사용자가 보내는 컨텍스트, 글 길이, 작성자 정보, 이미지 정보를 바탕으로 {writing_style}을 작성하세요.
+
+        문체 지시사항:
+            1. [{tone_name}] 문체를 사용하세요.
+            2. {writing_style} 형식으로 글을 작성하세요.
+            3. 문체 특징: {tone_description}
+            이 특징들을 고려하여 자연스럽고 일관된 글을 작성해주세요.
+
+        주요 지침:
+            1. 제공된 이미지와 메타데이터를 기반으로 내용을 구성하세요.
+            2. {tone_name} 문체를 일관되게 유지하며, 적절한 어휘와 표현을 사용하세요.
+            3. 이미지와 메타데이터의 정보를 문체에 맞게 자연스럽게 표현하세요.
+            4. 전체적으로 통일성 있는 하나의 글로 작성하세요.
+            5. 반드시 사용자가 지정한 글자 수 내에서 완결된 글을 작성하세요.
+            6. 글자 수에 맞추기 위해 내용을 적절히 조절하고, 필요한 경우 덜 중요한 세부사항은 생략하세요.
+            7. 글의 마지막 문장이 완전한 문장으로 끝나도록 하세요.
+            8. 글자 수가 부족하거나 초과하지 않도록 주의깊게 관리하세요.
+
+        {writing_style} 작성 지침:
+        {self.styles[writing_style]}
+
+        중요: 모든 이미지를 종합하여 하나의 연결된 글을 작성해주세요. 각 이미지의 주요 객체나 장면에 초점을 맞추되, 전체적인 맥락을 고려하여 글을 작성해주세요.
+        필요하다면 내용을 약간 줄이거나 확장하여 글자 수를 맞추세요.
+        """
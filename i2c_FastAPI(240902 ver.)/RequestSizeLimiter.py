@@ -0,0 +1,79 @@
+import json
+import logging
+
+class RequestTooLargeError(Exception):
+    """요청 본문이 크기 제한을 넘었을 때 receive에서 발생하는 예외"""
+
+class RequestSizeLimitMiddleware:
+    def __init__(self, app, max_body_bytes: int, message: str = "요청 크기가 제한을 초과했습니다."):
+        """
+        RequestSizeLimitMiddleware 클래스 초기화
+        요청 본문 크기를 제한하는 ASGI 미들웨어입니다.
+        Content-Length가 제한을 넘으면 본문을 읽기 전에 거부하고, Content-Length가 없는 요청(chunked 전송 등)은
+        앱이 본문을 읽는 동안 받은 바이트 수를 세어 제한을 넘는 순간 읽기를 중단하고 413을 반환합니다.
+
+        :param app: 감쌀 ASGI 앱
+        :param max_body_bytes: 요청 본문의 최대 바이트 수
+        :param message: 413 응답의 오류 메시지
+        """
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+        self.message = message
+        self.logger = logging.getLogger(__name__)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope['headers']).get(b'content-length', b'')
+        if content_length.isdigit() and int(content_length) > self.max_body_bytes:
+            await self._reject(send)
+            return
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            if exceeded:
+                raise RequestTooLargeError(self.message)
+            message = await receive()
+            if message['type'] == 'http.request':
+                received += len(message.get('body', b''))
+                if received > self.max_body_bytes:
+                    exceeded = True
+                    raise RequestTooLargeError(self.message)
+            return message
+
+        async def guarded_send(message):
+            nonlocal response_started
+            # 제한을 넘은 뒤 앱이 본문 파싱 오류로 보내는 응답은 버리고 아래에서 413을 보냄
+            if exceeded and not response_started:
+                return
+            if message['type'] == 'http.response.start':
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not exceeded or response_started:
+                raise
+        if exceeded and not response_started:
+            self.logger.warning(f"요청 본문이 {self.max_body_bytes} bytes를 넘어 읽기를 중단했습니다: {scope.get('path')}")
+            await self._reject(send)
+
+    async def _reject(self, send) -> None:
+        """
+        413 JSON 응답을 보냅니다.
+        """
+        body = json.dumps({"error": self.message}, ensure_ascii=False).encode('utf-8')
+        await send({
+            'type': 'http.response.start',
+            'status': 413,
+            'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode()),
+                        (b'connection', b'close')]
+        })
+        await send({'type': 'http.response.body', 'body': body})
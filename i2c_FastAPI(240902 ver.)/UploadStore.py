@@ -0,0 +1,199 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import logging
+from collections import OrderedDict
+from typing import BinaryIO, Dict, Any, Optional
+
+class UploadTooLargeError(Exception):
+    """업로드 크기 제한을 초과했을 때 발생하는 예외"""
+
+class UploadStore:
+    def __init__(self, upload_folder: str = "image_upload", chunk_size: int = 1024 * 1024,
+                 max_file_bytes: int = 25 * 1024 * 1024, max_request_bytes: int = 200 * 1024 * 1024,
+                 persist: bool = True, max_cached_results: int = 1000):
+        """
+        UploadStore 클래스 초기화
+        업로드 파일을 고정 크기 청크 단위로 저장소에 복사하므로
+        파일 크기와 관계없이 요청당 메모리 사용량이 청크 크기로 일정하게 유지됩니다.
+        파일은 클라이언트 파일 이름 대신 내용의 SHA-256 해시로 저장되며(content-addressed),
+        같은 해시에 대한 처리 결과도 함께 보관하여 재업로드 시 재사용합니다.
+
+        :param upload_folder: 업로드 파일을 저장할 폴더
+        :param chunk_size: 한 번에 읽고 쓸 바이트 수
+        :param max_file_bytes: 파일 하나의 최대 크기
+        :param max_request_bytes: 요청 하나에 포함된 전체 파일의 최대 크기
+        :param persist: False이면 이미지 파일을 디스크에 쓰지 않고 해시와 크기만 계산합니다
+        :param max_cached_results: 메모리에 둘 처리 결과의 최대 수 (오래 사용하지 않은 결과부터 제거하며, 디스크의 결과 파일은 남음)
+        """
+        self.upload_folder = upload_folder
+        self.chunk_size = chunk_size
+        self.max_file_bytes = max_file_bytes
+        self.max_request_bytes = max_request_bytes
+        self.persist = persist
+        self.logger = logging.getLogger(__name__)
+        self.max_cached_results = max_cached_results
+        self._results: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._results_lock = threading.Lock()
+        os.makedirs(self.upload_folder, exist_ok=True)
+
+    def ingest(self, file_obj: BinaryIO, filename: str, remaining_request_bytes: int,
+               persist: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        업로드 파일을 청크 단위로 저장하면서 SHA-256 해시를 계산합니다.
+        블로킹 I/O를 수행하므로 워커 스레드에서 호출해야 합니다.
+
+        :param file_obj: 읽을 업로드 파일 객체
+        :param filename: 클라이언트가 전달한 파일 이름
+        :param remaining_request_bytes: 현재 요청에서 남은 허용 바이트 수
+        :param persist: 디스크 저장 여부 (None이면 생성 시 설정을 따릅니다)
+        :return: 저장 경로(저장하지 않으면 None), SHA-256 해시, 파일 크기, 원본 파일 이름을 포함한 딕셔너리
+        :raises UploadTooLargeError: 파일 또는 요청 크기 제한을 초과한 경우
+        """
+        limit = min(self.max_file_bytes, remaining_request_bytes)
+        digest = hashlib.sha256()
+        size = 0
+
+        if not (self.persist if persist is None else persist):
+            while True:
+                chunk = file_obj.read(self.chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > limit:
+                    raise UploadTooLargeError(self._limit_message(filename, limit))
+                digest.update(chunk)
+            file_obj.seek(0)
+            return {
+                'path': None,
+                'sha256': digest.hexdigest(),
+                'size': size,
+                'filename': filename
+            }
+
+        # 제한 초과 시 불완전한 파일이 남지 않도록 임시 파일에 먼저 기록합니다.
+        fd, temp_path = tempfile.mkstemp(dir=self.upload_folder, prefix=".upload-", suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                while True:
+                    chunk = file_obj.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > limit:
+                        raise UploadTooLargeError(self._limit_message(filename, limit))
+                    digest.update(chunk)
+                    out.write(chunk)
+            file_obj.seek(0)
+
+            file_path = self.path_for(digest.hexdigest(), filename)
+            if os.path.exists(file_path):
+                # 이미 저장된 내용이므로 새로 쓴 파일은 버립니다.
+                os.remove(temp_path)
+            else:
+                os.replace(temp_path, file_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        self.logger.info(f"업로드 저장 완료: {filename} -> {file_path} ({size} bytes)")
+        return {
+            'path': file_path,
+            'sha256': digest.hexdigest(),
+            'size': size,
+            'filename': filename
+        }
+
+    def path_for(self, digest: str, filename: str) -> str:
+        """
+        해시와 원본 확장자로 저장 경로를 생성합니다.
+
+        :param digest: 파일 내용의 SHA-256 해시
+        :param filename: 클라이언트가 전달한 파일 이름 (확장자만 사용)
+        :return: 저장 경로
+        """
+        extension = os.path.splitext(os.path.basename(filename))[1].lower()
+        if not extension[1:].isalnum():
+            extension = ""
+        return os.path.join(self.upload_folder, f"{digest}{extension}")
+
+    def load_result(self, digest: str) -> Optional[Dict[str, Any]]:
+        """
+        해시에 대해 이전에 저장된 처리 결과를 불러옵니다.
+
+        :param digest: 파일 내용의 SHA-256 해시
+        :return: 저장된 처리 결과, 없으면 None
+        """
+        with self._results_lock:
+            if digest in self._results:
+                self._results.move_to_end(digest)
+                return self._results[digest]
+
+        result_path = self._result_path(digest)
+        if not os.path.exists(result_path):
+            return None
+        try:
+            with open(result_path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"저장된 처리 결과를 읽을 수 없습니다: {result_path} ({e})")
+            return None
+
+        self._remember_result(digest, result)
+        return result
+
+    def save_result(self, digest: str, result: Dict[str, Any]) -> None:
+        """
+        해시에 대한 처리 결과를 메모리와 디스크에 저장합니다.
+
+        :param digest: 파일 내용의 SHA-256 해시
+        :param result: ImageProcessor.process_image의 처리 결과
+        """
+        self._remember_result(digest, result)
+
+        fd, temp_path = tempfile.mkstemp(dir=self.upload_folder, prefix=".result-", suffix=".part")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(result, f, ensure_ascii=False)
+            os.replace(temp_path, self._result_path(digest))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def _remember_result(self, digest: str, result: Dict[str, Any]) -> None:
+        """
+        처리 결과를 메모리 LRU 캐시에 넣고, 최대 수를 넘으면 가장 오래 사용하지 않은 결과를 제거합니다.
+
+        :param digest: 파일 내용의 SHA-256 해시
+        :param result: 처리 결과
+        """
+        with self._results_lock:
+            self._results[digest] = result
+            self._results.move_to_end(digest)
+            while len(self._results) > self.max_cached_results:
+                self._results.popitem(last=False)
+
+    def _result_path(self, digest: str) -> str:
+        """
+        처리 결과를 저장할 경로를 반환합니다.
+
+        :param digest: 파일 내용의 SHA-256 해시
+        :return: 처리 결과 JSON 파일 경로
+        """
+        return os.path.join(self.upload_folder, f"{digest}.result.json")
+
+    def _limit_message(self, filename: str, limit: int) -> str:
+        """
+        크기 제한 초과 시 사용자에게 반환할 메시지를 생성합니다.
+
+        :param filename: 제한을 초과한 파일 이름
+        :param limit: 적용된 제한 바이트 수
+        :return: 오류 메시지
+        """
+        if limit == self.max_file_bytes:
+            return f"이미지 {filename}의 크기가 파일당 제한({self.max_file_bytes} bytes)을 초과했습니다."
+        return f"업로드한 이미지의 전체 크기가 요청당 제한({self.max_request_bytes} bytes)을 초과했습니다."
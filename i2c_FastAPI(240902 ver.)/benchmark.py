@@ -0,0 +1,199 @@
+"""
+이미지 처리 단계별 성능 측정 스크립트
+
+사용법:
+    python benchmark.py exif [이미지 경로 ...] [--repeat 20]
+    python benchmark.py resize [이미지 경로 ...] [--repeat 5]
+    python benchmark.py encode [이미지 경로 ...] [--token-budget N] [--max-bytes N]
+
+이미지 경로를 지정하지 않으면 image_upload 폴더의 JPEG 파일을 사용합니다.
+resize는 모드와 이미지마다 별도의 프로세스에서 측정하므로 최대 메모리(RSS)가 서로 섞이지 않습니다.
+"""
+import argparse
+import glob
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+from PIL import Image
+import ExifReader
+
+# 캡션 리사이즈 측정 모드: full은 전체 해상도 디코딩, draft는 JPEG 축소 디코딩
+RESIZE_MODES = ("full", "draft")
+
+def pillow_exif(path: str):
+    """기존 방식: Pillow로 이미지를 열고 _getexif()로 EXIF를 읽습니다."""
+    with Image.open(path) as image:
+        return image._getexif() or {}
+
+def header_exif(path: str):
+    """ExifReader로 JPEG 헤더 세그먼트만 읽고, 지원하지 않는 형식이면 Pillow로 읽습니다."""
+    with open(path, "rb") as fp:
+        exif = ExifReader.read_exif(fp)
+    return pillow_exif(path) if exif is None else exif
+
+def time_per_image(func: Callable[[str], object], paths: List[str], repeat: int) -> Dict[str, float]:
+    """
+    이미지별로 func을 repeat번 실행하여 중앙값 실행 시간(ms)을 측정합니다.
+
+    :param func: 측정할 함수
+    :param paths: 이미지 경로 목록
+    :param repeat: 반복 횟수
+    :return: 이미지 경로별 중앙값 실행 시간(ms)
+    """
+    timings = {}
+    for path in paths:
+        samples = []
+        for _ in range(repeat):
+            started_at = time.perf_counter()
+            func(path)
+            samples.append((time.perf_counter() - started_at) * 1000)
+        timings[path] = statistics.median(samples)
+    return timings
+
+def bench_exif(paths: List[str], repeat: int) -> None:
+    """
+    Pillow 방식과 헤더 전용 방식의 EXIF 추출 시간을 비교하고 결과가 같은지 확인합니다.
+    """
+    baseline = time_per_image(pillow_exif, paths, repeat)
+    header = time_per_image(header_exif, paths, repeat)
+
+    print(f"{'image':<40} {'size(MB)':>9} {'pillow(ms)':>11} {'header(ms)':>11} {'speedup':>8} {'same':>5}")
+    for path in paths:
+        same = pillow_exif(path) == header_exif(path)
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        speedup = baseline[path] / header[path] if header[path] else float('inf')
+        print(f"{os.path.basename(path)[:40]:<40} {size_mb:>9.2f} {baseline[path]:>11.3f} {header[path]:>11.3f} {speedup:>7.1f}x {str(same):>5}")
+
+    total_baseline = sum(baseline.values())
+    total_header = sum(header.values())
+    print(f"\n평균 이미지당 시간: pillow {total_baseline / len(paths):.3f} ms, header {total_header / len(paths):.3f} ms")
+
+def resize_worker(mode: str, path: str, repeat: int) -> None:
+    """
+    (하위 프로세스에서 실행) 캡션 생성기의 이미지 처리 경로를 repeat번 실행하고
+    이미지당 CPU 시간(ms)과 프로세스 최대 RSS(MB)를 JSON으로 출력합니다.
+    """
+    from ImageCaptionGenerator import ImageCaptionGenerator
+    from ImageHandle import ImageHandle
+
+    # API를 호출하지 않으므로 키는 사용되지 않습니다.
+    # 디코딩 경로만 비교하도록 적응형 인코딩은 끄고 같은 크기와 품질로 인코딩합니다.
+    generator = ImageCaptionGenerator("benchmark", fast_resize=(mode == "draft"), adaptive_encoding=False)
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    samples = []
+    for _ in range(repeat):
+        started_at = time.process_time()
+        with ImageHandle(path) as handle:
+            encoded = generator._process_image(handle)
+        samples.append((time.process_time() - started_at) * 1000)
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux의 ru_maxrss 단위는 KB, macOS는 바이트입니다.
+    unit = 1024 * 1024 if sys.platform == "darwin" else 1024
+    print(json.dumps({
+        "cpu_ms": statistics.median(samples),
+        "peak_rss_mb": peak_rss / unit,
+        "delta_rss_mb": (peak_rss - baseline_rss) / unit,
+        "output_bytes": encoded['bytes']
+    }))
+
+def bench_resize(paths: List[str], repeat: int) -> None:
+    """
+    전체 해상도 디코딩과 JPEG 축소 디코딩의 캡션 리사이즈 CPU 시간과 최대 메모리를 비교합니다.
+    """
+    results = {}
+    for path in paths:
+        for mode in RESIZE_MODES:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "resize-worker", mode, path, "--repeat", str(repeat)],
+                capture_output=True, text=True, check=True
+            ).stdout
+            results[(path, mode)] = json.loads(output.strip().splitlines()[-1])
+
+    print(f"{'image':<32} {'MP':>5} {'full cpu(ms)':>12} {'draft cpu(ms)':>13} {'speedup':>8} "
+          f"{'full Δrss(MB)':>13} {'draft Δrss(MB)':>14}")
+    for path in paths:
+        with Image.open(path) as image:
+            megapixels = image.width * image.height / 1_000_000
+        full, draft = results[(path, "full")], results[(path, "draft")]
+        speedup = full["cpu_ms"] / draft["cpu_ms"] if draft["cpu_ms"] else float('inf')
+        print(f"{os.path.basename(path)[:32]:<32} {megapixels:>5.1f} {full['cpu_ms']:>12.1f} {draft['cpu_ms']:>13.1f} "
+              f"{speedup:>7.1f}x {full['delta_rss_mb']:>13.1f} {draft['delta_rss_mb']:>14.1f}")
+
+    for mode in RESIZE_MODES:
+        cpu = [results[(path, mode)]["cpu_ms"] for path in paths]
+        rss = [results[(path, mode)]["peak_rss_mb"] for path in paths]
+        print(f"{mode}: 평균 CPU {statistics.mean(cpu):.1f} ms/이미지, 최대 RSS {max(rss):.1f} MB")
+
+def bench_encode(paths: List[str], token_budget: Optional[int], max_bytes: Optional[int]) -> None:
+    """
+    고정 인코딩(512px, 품질 85, detail auto)과 적응형 인코딩이 이미지별로 보내는 바이트 수와 추정 토큰 수를 비교합니다.
+    """
+    from ImageCaptionGenerator import ImageCaptionGenerator
+    from ImageHandle import ImageHandle
+
+    # API를 호출하지 않으므로 키는 사용되지 않습니다.
+    fixed = ImageCaptionGenerator("benchmark", adaptive_encoding=False)
+    adaptive = ImageCaptionGenerator("benchmark", token_budget=token_budget, max_image_bytes=max_bytes)
+    print(f"{'image':<30} {'fixed bytes':>12} {'fixed tokens':>13} {'detail':>7} {'size':>10} {'q':>3} "
+          f"{'edges':>6} {'bytes':>9} {'tokens':>7}")
+    totals = {'fixed_bytes': 0, 'fixed_tokens': 0, 'bytes': 0, 'tokens': 0}
+    for path in paths:
+        with ImageHandle(path) as handle:
+            before = fixed._process_image(handle)
+            after = adaptive._process_image(handle)
+        totals['fixed_bytes'] += before['bytes']
+        totals['fixed_tokens'] += before['estimated_tokens']
+        totals['bytes'] += after['bytes']
+        totals['tokens'] += after['estimated_tokens']
+        print(f"{os.path.basename(path)[:30]:<30} {before['bytes']:>12} {before['estimated_tokens']:>13} "
+              f"{after['detail']:>7} {after['width']:>4}x{after['height']:<5} {after['quality']:>3} "
+              f"{after['edge_density']:>6.3f} {after['bytes']:>9} {after['estimated_tokens']:>7}")
+    print(f"\n합계: 고정 {totals['fixed_bytes']} bytes / {totals['fixed_tokens']} tokens, "
+          f"적응형 {totals['bytes']} bytes / {totals['tokens']} tokens")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="이미지 처리 단계별 성능 측정")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    exif_parser = subparsers.add_parser("exif", help="EXIF 추출 시간 비교")
+    exif_parser.add_argument("paths", nargs="*", help="측정할 이미지 경로")
+    exif_parser.add_argument("--repeat", type=int, default=20, help="이미지별 반복 횟수")
+
+    resize_parser = subparsers.add_parser("resize", help="캡션 리사이즈의 CPU 시간과 최대 메모리 비교")
+    resize_parser.add_argument("paths", nargs="*", help="측정할 이미지 경로")
+    resize_parser.add_argument("--repeat", type=int, default=5, help="이미지별 반복 횟수")
+
+    encode_parser = subparsers.add_parser("encode", help="고정 인코딩과 적응형 인코딩의 전송량과 추정 토큰 비교")
+    encode_parser.add_argument("paths", nargs="*", help="측정할 이미지 경로")
+    encode_parser.add_argument("--token-budget", type=int, default=None, help="이미지당 최대 입력 토큰")
+    encode_parser.add_argument("--max-bytes", type=int, default=None, help="이미지당 최대 전송 바이트")
+
+    # resize가 내부적으로 실행하는 하위 프로세스용 명령
+    worker_parser = subparsers.add_parser("resize-worker")
+    worker_parser.add_argument("mode", choices=RESIZE_MODES)
+    worker_parser.add_argument("path")
+    worker_parser.add_argument("--repeat", type=int, default=5)
+
+    args = parser.parse_args()
+    if args.command == "resize-worker":
+        resize_worker(args.mode, args.path, args.repeat)
+        return
+
+    paths = args.paths or sorted(glob.glob(os.path.join("image_upload", "*.jp*g")))
+    if not paths:
+        parser.error("측정할 이미지가 없습니다.")
+
+    if args.command == "exif":
+        bench_exif(paths, args.repeat)
+    elif args.command == "resize":
+        bench_resize(paths, args.repeat)
+    elif args.command == "encode":
+        bench_encode(paths, args.token_budget, args.max_bytes)
+
+if __name__ == "__main__":
+    main()
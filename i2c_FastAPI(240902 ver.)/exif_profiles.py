@@ -0,0 +1,29 @@
+# EXIF 필드 선택(projection) 프로필
+# - tags: 응답에 포함할 EXIF 태그 이름 (None이면 모든 태그)
+# - gps_tags: 포함할 GPS 하위 태그 이름 (None이면 모든 GPS 태그)
+# 선택하지 않은 태그는 EXIF 헤더에서 값을 해석하지 않고 건너뜁니다.
+EXIF_PROFILES = {
+    'minimal': {
+        'tags': ['DateTimeOriginal', 'GPSInfo'],
+        'gps_tags': ['GPSLatitudeRef', 'GPSLatitude', 'GPSLongitudeRef', 'GPSLongitude']
+    },
+    'standard': {
+        'tags': [
+            'DateTimeOriginal', 'DateTime', 'OffsetTimeOriginal', 'GPSInfo',
+            'Orientation', 'Make', 'Model', 'LensModel', 'ExifImageWidth', 'ExifImageHeight'
+        ],
+        'gps_tags': [
+            'GPSLatitudeRef', 'GPSLatitude', 'GPSLongitudeRef', 'GPSLongitude',
+            'GPSAltitudeRef', 'GPSAltitude', 'GPSDateStamp', 'GPSTimeStamp'
+        ]
+    },
+    'full': {
+        'tags': None,
+        'gps_tags': None
+    }
+}
+
+DEFAULT_EXIF_PROFILE = 'standard'
+
+# 이 크기(바이트)를 넘는 바이너리 태그(MakerNote, 썸네일 등)는 모든 프로필에서 해석하지 않습니다.
+MAX_BINARY_EXIF_BYTES = 64
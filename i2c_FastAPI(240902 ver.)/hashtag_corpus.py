@@ -0,0 +1,73 @@
+# 로컬 해시태그 생성기(HashtagGenerator)가 사용하는 말뭉치 통계와 사전
+# DOCUMENT_FREQUENCIES는 CORPUS_DOCUMENT_COUNT개의 글(블로그/SNS 게시글) 중 단어가 나온 글 수입니다.
+# 여러 글에 흔히 나오는 단어일수록 IDF가 낮아 해시태그 후보에서 밀려나며, 표에 없는 단어는 드문 단어로 취급합니다.
+# 표는 HashtagGenerator.build_document_frequencies로 새 말뭉치에서 다시 계산할 수 있습니다.
+CORPUS_DOCUMENT_COUNT = 100000
+
+DOCUMENT_FREQUENCIES = {
+    # 거의 모든 글에 나오는 일반 명사/부사
+    '오늘': 41000, '정말': 38000, '너무': 37000, '시간': 33000, '사람': 31000, '생각': 30000,
+    '하루': 22000, '느낌': 21000, '기분': 20000, '모습': 26000, '사진': 27000, '이미지': 9000,
+    '마음': 19000, '우리': 29000, '다음': 18000, '가장': 17000, '조금': 16000, '정도': 16000,
+    '이번': 15000, '처음': 14000, '함께': 24000, '모두': 14000, '다시': 15000, '가득': 8000,
+    '순간': 9000, '분위기': 12000, '풍경': 7000, '장면': 6000, '배경': 6500, '주변': 7500,
+    '하나': 17000, '여기': 13000, '이곳': 9000, '그곳': 6000, '자리': 9000, '부분': 8000,
+    'the': 20000, 'and': 19000, 'with': 12000, 'this': 11000, 'for': 12000,
+    # 자주 나오지만 주제를 나타내는 단어
+    '여행': 6500, '카페': 4800, '바다': 3200, '하늘': 5200, '커피': 3900, '음식': 4200,
+    '맛집': 3600, '산책': 2600, '공원': 2400, '주말': 6000, '가족': 5200, '친구': 7400,
+    '저녁': 6800, '아침': 6300, '점심': 5100, '노을': 1400, '해변': 1200, '바닷가': 1100, '마을': 1500, '도시': 3000,
+    '거리': 3800, '건물': 2600, '나무': 2500, '꽃': 2900, '여름': 3500, '겨울': 3400,
+    '가을': 3300, '봄': 3600, '야경': 900, '일상': 5600, '데일리': 2100, '후기': 5400,
+    '추천': 6200, '리뷰': 4100, '사람들': 8000, '도로': 1900, '자동차': 1500, '강아지': 1700,
+    '고양이': 1600, '케이크': 1100, '디저트': 1300, '빵': 1600, '맥주': 1200, '와인': 800,
+    # 서술어 어미(-고, -게 등)처럼 끝나지만 명사인 단어 (표에 있는 단어는 어미를 떼거나 버리지 않습니다)
+    '최고': 9000, '가게': 2100, '광고': 1800, '사고': 1200, '창고': 300, '무게': 400, '배려': 500,
+    # 관형형 어미(-간, -운, -른 등)처럼 끝나지만 명사인 단어
+    '공간': 4000, '인간': 2500, '기간': 3000, '행운': 700, '계란': 900, '어른': 1300, '지진': 600, '제주도': 1800,
+}
+
+# 글쓰기 스타일별로 덧붙이는 해시태그
+STYLE_HASHTAGS = {
+    '일기': ['일기', '일상기록'],
+    'SNS 포스팅': ['일상', '데일리'],
+    '여행기': ['여행', '여행기록'],
+    '중고 판매 설명문': ['중고거래', '중고판매'],
+    '음식 후기': ['맛집', '먹스타그램'],
+    '제품 후기': ['내돈내산', '제품리뷰'],
+    '장소 방문 후기': ['방문후기', '가볼만한곳'],
+    '인물 소개': ['인물소개'],
+    '앨범/음원 소개': ['음악추천', '플레이리스트']
+}
+
+# 단어 끝에서 떼어낼 조사 (긴 것부터 확인합니다)
+PARTICLES = (
+    '에서는', '에게서', '으로는', '에는', '에도', '까지', '부터', '에서', '으로', '에게', '한테', '처럼', '보다', '마다', '이나',
+    '와', '과', '을', '를', '이', '가', '은', '는', '의', '에', '로', '도', '만', '랑'
+)
+
+# '-하다' 동사에서 떼어낼 어미 (떼고 남은 부분을 명사로 봅니다, 예: 서핑하는 -> 서핑)
+HA_ENDINGS = (
+    '했습니다', '합니다', '하였다', '하는', '하고', '하며', '하면', '했던', '했다', '하다', '해요', '해서', '한', '할'
+)
+
+# 조사처럼 보이지만 관형형 어미(예: 마시는, 맑은)와 모양이 같은 끝 (떼고 남은 단어가 문서 빈도 표에 있을 때만 조사로 봅니다)
+AMBIGUOUS_PARTICLES = ('은', '는')
+
+# 서술어로 보고 버리는 단어의 끝
+# 종결 어미(예: 있다, 보냈다, 만났죠, 걸어갔어요), 연결 어미(예: 걸어가고, 걸으며, 즐겁게, 빌려, 펼쳐져, 놓여),
+# 관형형 어미(예: 즐거운, 예쁜, 빨간, 파란, 하얀, 푸른, 켜진)
+# 조사를 뗀 뒤에 확인하며 (예: 먹었다는 -> 먹었다), 문서 빈도 표에 있는 단어(예: 바다, 최고, 가게, 공간)는 버리지 않습니다.
+PREDICATE_ENDINGS = (
+    '다', '죠', '요', '면서', '어서', '아서', '지만', '어가', '고', '며', '게', '던', '려', '져', '여',
+    '운', '쁜', '간', '란', '얀', '른', '픈', '은', '진'
+)
+
+# 해시태그로 쓰지 않는 단어
+STOPWORDS = {
+    '있는', '있다', '있고', '있어', '없는', '같은', '보이는', '보이며', '그리고', '하지만', '그래서', '또한',
+    '위에', '앞에', '뒤에', '옆에', '속에', '안에', '이런', '저런', '그런', '어떤', '많은', '모든', '여러',
+    '들고', '지는', '보는', '바라본', '가는', '오는', '있던', '없이', '향해', '만큼',
+    '아주', '매우', '진짜', '그냥', '이것', '그것', '저것', '때문', '하나', '사진', '이미지', '모습',
+    'the', 'and', 'with', 'this', 'that', 'for', 'from', 'are', 'was', 'image', 'photo'
+}
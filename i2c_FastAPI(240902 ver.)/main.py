@@ -1,17 +1,37 @@
-from fastapi import FastAPI, File, UploadFile, Form, Request
+from fastapi import FastAPI, File, UploadFile, Form, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse, FileResponse
+from fastapi.concurrency import run_in_threadpool
 from fastapi.templating import Jinja2Templates
-from typing import List
+from typing import Dict, List, Optional, Callable
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import uvicorn
 from ImageProcessor import ImageProcessor
+from ImageCaptionGenerator import ImageCaptionGenerator
+from OpenAIClients import OpenAIClients
+from CaptionCache import CaptionCache
+from ImageMetadataProcessor import ImageMetadataProcessor
+from OfflineGeocoder import OfflineGeocoder
+from LocationEnricher import LocationEnricher
+from GeocodeCache import GeocodeCache
 from ContentGenerator import ContentGenerator
+from ContentCache import ContentCache, StreamBroadcast
+from UploadStore import UploadStore, UploadTooLargeError
+from RequestSizeLimiter import RequestSizeLimitMiddleware
+from DerivativeStore import DerivativeStore
+import PerceptualHash
+from ImageHandle import ImageHandle
+from JobStore import create_job_store, TERMINAL_JOB_STATUSES
+from JobManager import JobManager
 import os
 from dotenv import load_dotenv
 import json
+import time
 from writing_styles import STYLE_SPECIFIC_INSTRUCTIONS
 from writing_tones import WRITING_TONES
+from exif_profiles import EXIF_PROFILES
 import logging
 
 # 로깅 설정
@@ -44,9 +64,207 @@ templates = Jinja2Templates(directory=".")
 # OpenAI API 키 로드
 OPENAI_API_KEY = os.getenv("ENTER OPENAI API KEY")
 
+# 캡션 생성과 글 생성이 함께 사용하는 OpenAI 클라이언트 연결 풀 설정
+# OPENAI_MAX_CONNECTIONS: 클라이언트별 최대 동시 연결 수
+# OPENAI_TIMEOUT_SECONDS: 기본 응답 대기 시간 제한(초), 호출 종류별 제한은 각 생성기에서 지정합니다
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", 200))
+OPENAI_TIMEOUT_SECONDS = float(os.getenv("OPENAI_TIMEOUT_SECONDS", 60.0))
+openai_clients = OpenAIClients(
+    OPENAI_API_KEY,
+    max_connections=OPENAI_MAX_CONNECTIONS,
+    max_keepalive_connections=min(50, OPENAI_MAX_CONNECTIONS),
+    read_timeout=OPENAI_TIMEOUT_SECONDS
+)
+
+# 역지오코딩 방식 설정
+# GEOCODER_BACKEND: nominatim, offline, offline+nominatim 중 하나
+# offline 계열은 GAZETTEER_PATH의 GeoNames 지명 파일(예: cities1000.txt)을 시작 시 메모리에 올립니다.
+GEOCODER_BACKEND = os.getenv("GEOCODER_BACKEND", "nominatim")
+GAZETTEER_PATH = os.getenv("GAZETTEER_PATH", "gazetteer/cities1000.txt")
+offline_geocoder = OfflineGeocoder(GAZETTEER_PATH) if GEOCODER_BACKEND != "nominatim" else None
+
+# 역지오코딩 캐시 설정
+# 좌표를 GEOCODE_CACHE_PRECISION 자릿수로 양자화하여 가까운 위치의 조회 결과를 재사용합니다.
+# GEOCODE_CACHE_DB를 비우면 프로세스 내 메모리 캐시만 사용합니다.
+GEOCODE_CACHE_PRECISION = int(os.getenv("GEOCODE_CACHE_PRECISION", 3))
+GEOCODE_CACHE_SIZE = int(os.getenv("GEOCODE_CACHE_SIZE", 10000))
+GEOCODE_CACHE_DB = os.getenv("GEOCODE_CACHE_DB", "geocode_cache.sqlite3")
+geocode_cache = GeocodeCache(GEOCODE_CACHE_PRECISION, GEOCODE_CACHE_SIZE, GEOCODE_CACHE_DB or None,
+                             namespace=GEOCODER_BACKEND)
+
+# Nominatim 전역 초당 요청 수 (공개 서버 사용 정책은 초당 1회)
+# 모든 요청의 조회는 하나의 스케줄러 큐를 거쳐 이 속도로 실행됩니다.
+GEOCODE_REQUESTS_PER_SECOND = float(os.getenv("GEOCODE_REQUESTS_PER_SECOND", 1.0))
+# 이미지 처리 스레드가 Nominatim 결과를 기다리는 최대 시간(초)
+# 대기열(앞선 조회 수 / 초당 요청 수)이 이보다 길면 조회를 건너뛰고 오프라인 결과나 빈 위치 정보로 대신합니다 (저장하지 않음).
+GEOCODE_MAX_WAIT_SECONDS = float(os.getenv("GEOCODE_MAX_WAIT_SECONDS", 30))
+
+# 위치 정보 보강 방식
+# - inline: 업로드 처리 중에 주소 조회를 마치고 캡션 프롬프트에도 주소를 사용
+# - deferred: 좌표와 캡션을 먼저 반환하고 주소는 백그라운드에서 보강 (GET /locations/{location_id}로 확인)
+LOCATION_ENRICHMENT = os.getenv("LOCATION_ENRICHMENT", "inline")
+location_enricher = LocationEnricher() if LOCATION_ENRICHMENT == "deferred" else None
+
+# 캡션 캐시 설정
+# 같은 이미지(리사이즈 결과)와 프롬프트로 생성한 캡션을 CAPTION_CACHE_TTL_SECONDS 동안 재사용합니다.
+# CAPTION_CACHE_DB를 비우면 프로세스 내 메모리 캐시만 사용합니다.
+CAPTION_CACHE_SIZE = int(os.getenv("CAPTION_CACHE_SIZE", 1000))
+CAPTION_CACHE_TTL_SECONDS = float(os.getenv("CAPTION_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+CAPTION_CACHE_DB = os.getenv("CAPTION_CACHE_DB", "caption_cache.sqlite3")
+caption_cache = CaptionCache(CAPTION_CACHE_SIZE, CAPTION_CACHE_TTL_SECONDS, CAPTION_CACHE_DB or None)
+
+# 응답에 포함할 EXIF 필드 프로필 (minimal, standard, full)
+# 요청별로 exif_profile 쿼리 파라미터로 바꿀 수 있습니다.
+EXIF_PROFILE = os.getenv("EXIF_PROFILE", "standard")
+
 # 이미지 처리기와 콘텐츠 생성기 초기화
-image_processor = ImageProcessor(OPENAI_API_KEY)
-content_generator = ContentGenerator(OPENAI_API_KEY)
+metadata_processor = ImageMetadataProcessor(
+    geocode_cache=geocode_cache,
+    backend=GEOCODER_BACKEND,
+    offline_geocoder=offline_geocoder,
+    requests_per_second=GEOCODE_REQUESTS_PER_SECOND,
+    location_enricher=location_enricher,
+    exif_profile=EXIF_PROFILE,
+    max_geocode_wait=GEOCODE_MAX_WAIT_SECONDS
+)
+content_generator = ContentGenerator(
+    OPENAI_API_KEY,
+    location_resolver=location_enricher.get_location_info if location_enricher else None,
+    clients=openai_clients
+)
+
+# 글과 해시태그 생성 방식의 기본값 (요청별로 strategy 폼 필드로 바꿀 수 있습니다)
+# - sequential: 글을 생성한 뒤 그 글로 해시태그를 생성 (API 호출 2번을 차례로)
+# - combined: 글과 해시태그를 하나의 JSON 응답으로 생성 (API 호출 1번)
+# - parallel: 글 생성 응답을 기다리는 동안 워커 스레드에서 캡션과 위치 정보로 해시태그를 만듦 (API 호출 1번,
+#   kiwipiepy 형태소 분석기가 설치되어 있어야 하며 없으면 400 응답)
+CONTENT_STRATEGY = os.getenv("CONTENT_STRATEGY", "sequential")
+# 해시태그 생성기의 기본값 (요청별로 hashtag_backend 폼 필드로 바꿀 수 있습니다)
+# - llm: 생성된 글로 API를 한 번 더 호출하여 해시태그를 생성
+# - local: API 호출 없이 글, 캡션, 위치, 글쓰기 스타일에서 키워드를 뽑아 해시태그를 생성
+HASHTAG_BACKEND = os.getenv("HASHTAG_BACKEND", "llm")
+
+# 글 생성 결과 캐시 설정
+# 같은 요청(이미지 데이터, 스타일, 톤, 길이, temperature, 사용자 정보, 컨텍스트 등)이 동시에 들어오면 한 번만 생성하여 결과를 함께 받고,
+# 완성된 결과는 다음 요청에 재사용합니다.
+# - temperature 0 결과는 만료되지 않으며 항상 재사용합니다.
+# - 그 외에는 CONTENT_CACHE_TTL_SECONDS 동안, 클라이언트가 allow_cached=true를 보내거나 같은 Idempotency-Key 헤더로 다시 보낼 때만 재사용합니다.
+CONTENT_CACHE_SIZE = int(os.getenv("CONTENT_CACHE_SIZE", 500))
+CONTENT_CACHE_TTL_SECONDS = float(os.getenv("CONTENT_CACHE_TTL_SECONDS", 600))
+content_cache = ContentCache(CONTENT_CACHE_SIZE, CONTENT_CACHE_TTL_SECONDS)
+# 진행 중인 스트리밍 생성의 글 조각 (캐시 키 -> StreamBroadcast, 같은 요청이 진행 중인 스트림을 처음부터 함께 받음)
+story_broadcasts: Dict[str, StreamBroadcast] = {}
+
+# 이미지 처리(EXIF, 지오코딩, 캡션 생성)는 블로킹 작업이므로 별도의 스레드 풀에서 실행합니다.
+# IMAGE_WORKERS로 동시에 처리할 이미지 수의 상한을 지정합니다.
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", 4))
+image_executor = ThreadPoolExecutor(max_workers=IMAGE_WORKERS, thread_name_prefix="image-worker")
+
+# CAPTION_PIPELINE이 true이면 네트워크 지오코딩과 캡션 생성을 동시에 진행합니다.
+# 이때 캡션 프롬프트에는 주소 대신 날짜와 대략적인 좌표가 들어갑니다.
+CAPTION_PIPELINE = os.getenv("CAPTION_PIPELINE", "true").lower() == "true"
+
+# CAPTION_BATCH_SIZE가 2 이상이면 동시에 처리 중인 이미지들의 캡션을 최대 CAPTION_BATCH_SIZE장씩 묶어
+# 한 번의 API 요청으로 생성합니다. 한 묶음에 들어갈 수 있는 이미지 수는 동시에 처리하는 이미지 수(IMAGE_WORKERS)를 넘지 않습니다.
+# CAPTION_BATCH_WAIT_SECONDS는 묶음을 채우기 위해 첫 요청 이후 기다리는 최대 시간(초)입니다.
+CAPTION_BATCH_SIZE = int(os.getenv("CAPTION_BATCH_SIZE", 1))
+CAPTION_BATCH_WAIT_SECONDS = float(os.getenv("CAPTION_BATCH_WAIT_SECONDS", 0.05))
+
+# 캡션 요청 이미지 인코딩 설정
+# CAPTION_ADAPTIVE_ENCODING이 true이면 장면의 복잡도(에지 밀도)에 따라 이미지별로 해상도, JPEG 품질, detail 수준을 정합니다.
+# CAPTION_TOKEN_BUDGET: 이미지당 최대 입력 토큰 (비우면 high detail 타일 1개 분량, 이보다 작으면 high detail을 쓰지 않습니다)
+# CAPTION_MAX_IMAGE_BYTES: 이미지당 최대 전송 바이트 (비우면 제한 없음, 넘으면 품질과 크기를 낮춥니다)
+CAPTION_ADAPTIVE_ENCODING = os.getenv("CAPTION_ADAPTIVE_ENCODING", "true").lower() == "true"
+CAPTION_TOKEN_BUDGET = int(os.getenv("CAPTION_TOKEN_BUDGET")) if os.getenv("CAPTION_TOKEN_BUDGET") else None
+CAPTION_MAX_IMAGE_BYTES = int(os.getenv("CAPTION_MAX_IMAGE_BYTES")) if os.getenv("CAPTION_MAX_IMAGE_BYTES") else None
+caption_generator = ImageCaptionGenerator(
+    OPENAI_API_KEY,
+    caption_cache=caption_cache,
+    clients=openai_clients,
+    batch_size=CAPTION_BATCH_SIZE,
+    batch_wait_seconds=CAPTION_BATCH_WAIT_SECONDS,
+    adaptive_encoding=CAPTION_ADAPTIVE_ENCODING,
+    token_budget=CAPTION_TOKEN_BUDGET,
+    max_image_bytes=CAPTION_MAX_IMAGE_BYTES
+)
+image_processor = ImageProcessor(
+    OPENAI_API_KEY,
+    metadata_processor=metadata_processor,
+    caption_generator=caption_generator,
+    pipelined=CAPTION_PIPELINE,
+    stage_workers=IMAGE_WORKERS
+)
+
+# 업로드 크기 제한 (바이트 단위)
+MAX_UPLOAD_FILE_BYTES = int(os.getenv("MAX_UPLOAD_FILE_BYTES", 25 * 1024 * 1024))
+MAX_UPLOAD_REQUEST_BYTES = int(os.getenv("MAX_UPLOAD_REQUEST_BYTES", 200 * 1024 * 1024))
+# multipart 경계와 헤더에 필요한 여유분
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+# 업로드 원본을 디스크에 보관할지 여부 (false이면 해시만 계산하고 메모리 버퍼에서 처리)
+PERSIST_UPLOADS = os.getenv("PERSIST_UPLOADS", "true").lower() == "true"
+# 메모리에 둘 이미지 처리 결과의 최대 수 (넘치면 디스크의 결과 파일에서 다시 읽음)
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", 1000))
+
+# 업로드 파일을 'image_upload' 폴더에 청크 단위로 저장하는 저장소
+upload_store = UploadStore(
+    "image_upload",
+    max_file_bytes=MAX_UPLOAD_FILE_BYTES,
+    max_request_bytes=MAX_UPLOAD_REQUEST_BYTES,
+    persist=PERSIST_UPLOADS,
+    max_cached_results=RESULT_CACHE_SIZE
+)
+
+# 업로드마다 한 번만 만드는 파생 이미지 설정 (캡션용 JPEG, 미리보기 WebP, 선택적인 해상도 상한 JPEG)
+# 파생 이미지는 PERSIST_UPLOADS 설정과 관계없이 원본 옆에 저장되며 GET /images/{image_id}/{variant}로 제공됩니다.
+# IMAGE_DISPLAY_MAX_SIDE를 비우면 표시용(display) 이미지는 만들지 않습니다.
+IMAGE_PREVIEW_SIZE = int(os.getenv("IMAGE_PREVIEW_SIZE", 320))
+IMAGE_DISPLAY_MAX_SIDE = int(os.getenv("IMAGE_DISPLAY_MAX_SIDE")) if os.getenv("IMAGE_DISPLAY_MAX_SIDE") else None
+# 근접 중복 이미지(연속 촬영 등) 감지 설정
+# NEAR_DUPLICATE_DETECTION이 true이면 한 요청으로 업로드한 이미지들의 지각 해시(dHash)를 비교해 비슷한 이미지를 묶고,
+# 묶음마다 대표 이미지 하나만 캡션을 생성합니다. 나머지는 대표 이미지의 캡션을 쓰고 duplicate_of로 표시됩니다.
+# NEAR_DUPLICATE_THRESHOLD는 같은 장면으로 볼 최대 해밍 거리(64비트 중)로, 클수록 더 많은 이미지를 묶습니다.
+NEAR_DUPLICATE_DETECTION = os.getenv("NEAR_DUPLICATE_DETECTION", "true").lower() == "true"
+NEAR_DUPLICATE_THRESHOLD = int(os.getenv("NEAR_DUPLICATE_THRESHOLD", 5))
+
+# 파생 이미지는 원본 해시로 주소가 정해지므로 내용이 바뀌지 않습니다.
+IMAGE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+derivative_store = DerivativeStore(
+    "image_upload",
+    caption_size=max(ImageCaptionGenerator.MAX_IMAGE_SIZE),
+    preview_size=IMAGE_PREVIEW_SIZE,
+    display_max_side=IMAGE_DISPLAY_MAX_SIDE
+)
+
+# 요청 본문 크기 제한: Content-Length가 제한을 넘으면 본문을 읽기 전에, Content-Length가 없는 chunked 요청은
+# 받은 바이트 수가 제한을 넘는 순간 읽기를 중단하고 413을 반환합니다.
+app.add_middleware(
+    RequestSizeLimitMiddleware,
+    max_body_bytes=MAX_UPLOAD_REQUEST_BYTES + MULTIPART_OVERHEAD_BYTES,
+    message=f"요청 크기가 제한({MAX_UPLOAD_REQUEST_BYTES} bytes)을 초과했습니다."
+)
+
+@app.on_event("shutdown")
+def shutdown_image_executor():
+    """
+    서버 종료 시 이미지 처리 스레드 풀, 작업 워커 풀, 지오코딩 스케줄러, 캡션 묶음 처리기를 정리합니다.
+    """
+    image_executor.shutdown(wait=False)
+    if image_processor.stage_executor:
+        image_processor.stage_executor.shutdown(wait=False)
+    job_manager.shutdown()
+    if metadata_processor.geocode_scheduler:
+        metadata_processor.geocode_scheduler.shutdown()
+    if location_enricher:
+        location_enricher.shutdown()
+    caption_generator.shutdown()
+
+@app.on_event("shutdown")
+async def close_openai_clients():
+    """
+    서버 종료 시 공유 OpenAI 클라이언트의 연결 풀을 닫습니다.
+    """
+    await openai_clients.aclose()
 
 @app.get("/", response_class=HTMLResponse)
 async def read_root(request: Request):
@@ -55,6 +273,24 @@ async def read_root(request: Request):
     """
     return templates.TemplateResponse("index.html", {"request": request})
 
+@app.get("/stats/")
+async def get_stats():
+    """
+    캐시 적중률과 절약한 시간 등 처리 통계를 반환합니다.
+    """
+    stats = {
+        "geocode_cache": geocode_cache.stats(),
+        "caption_cache": caption_cache.stats(),
+        "caption_encoding": caption_generator.encoding_stats(),
+        "content_prompt_cache": content_generator.prompt_cache_stats(),
+        "content_cache": content_cache.stats()
+    }
+    if metadata_processor.geocode_scheduler:
+        stats["geocode_scheduler"] = metadata_processor.geocode_scheduler.stats()
+    if caption_generator.batcher:
+        stats["caption_batcher"] = caption_generator.batcher.stats()
+    return stats
+
 @app.get("/writing-styles/")
 async def get_writing_styles():
     """
@@ -71,35 +307,523 @@ async def get_writing_tones():
     """
     return {"tones": WRITING_TONES}
 
+async def ingest_uploads(files: List[UploadFile], persist: Optional[bool] = None,
+                         exif_profile: Optional[str] = None) -> List[dict]:
+    """
+    업로드 파일들을 워커 스레드에서 청크 단위로 저장하면서 해시를 계산합니다.
+    파일 전체를 메모리에 올리지 않으며, 파일당/요청당 크기 제한을 넘으면 UploadTooLargeError가 발생합니다.
+    반환된 각 항목의 'file'에는 이후 처리에 사용할 업로드 버퍼가 담겨 있으므로 처리가 끝난 뒤 파일을 닫아야 합니다.
+    """
+    stored_uploads = []
+    remaining_bytes = MAX_UPLOAD_REQUEST_BYTES
+    for file in files:
+        stored = await run_in_threadpool(upload_store.ingest, file.file, file.filename, remaining_bytes, persist)
+        remaining_bytes -= stored['size']
+        stored['file'] = file.file
+        stored['exif_profile'] = exif_profile or EXIF_PROFILE
+        stored_uploads.append(stored)
+    return stored_uploads
+
+def invalid_exif_profile(exif_profile: Optional[str]) -> Optional[JSONResponse]:
+    """
+    exif_profile 쿼리 파라미터를 확인하고, 지원하지 않는 값이면 400 응답을 반환합니다.
+    """
+    if exif_profile is None or exif_profile in EXIF_PROFILES:
+        return None
+    return JSONResponse(
+        status_code=400,
+        content={"error": f"지원하지 않는 EXIF 프로필입니다: {exif_profile} (사용 가능: {', '.join(EXIF_PROFILES)})"}
+    )
+
+async def close_uploads(files: List[UploadFile]) -> None:
+    """
+    업로드 파일들을 닫습니다.
+    """
+    for file in files:
+        await file.close()
+
+def open_stored_upload(stored: dict) -> ImageHandle:
+    """
+    저장된 업로드의 이미지 핸들을 엽니다. 캡션용 파생 이미지가 있으면 축소 디코딩에 원본 대신 사용합니다.
+    파생 이미지에서 다시 인코딩한 바이트는 원본에서 인코딩한 것과 다르므로, 캡션 캐시는 원본 해시로 찾도록 해시를 넘깁니다.
+    """
+    return ImageHandle(stored['file'], name=stored['filename'], path=stored['path'],
+                       reduced_source=derivative_store.path_for(stored['sha256'], 'caption'), digest=stored['sha256'])
+
+def with_image_urls(result: dict, digest: str) -> dict:
+    """
+    처리 결과에 이미지 ID와 파생 이미지 주소를 붙인 사본을 반환합니다.
+    """
+    return {
+        **result,
+        'image_id': digest,
+        'derivatives': {variant: f"/images/{digest}/{variant}" for variant in derivative_store.variants}
+    }
+
+def process_stored_upload(stored: dict, on_stage: Optional[Callable[..., None]] = None,
+                          representative: Optional[dict] = None) -> dict:
+    """
+    저장된 업로드 하나를 처리합니다.
+    먼저 파생 이미지(캡션용, 미리보기 등)가 없으면 한 번만 만들고, 캡션 생성은 같은 축소 디코딩 결과를 사용합니다.
+    같은 내용(SHA-256)의 이미지를 이미 처리했다면 EXIF 추출, 지오코딩, 캡션 생성 없이 이전 결과를 반환합니다.
+    이미지는 디스크에 저장된 파일을 다시 읽지 않고 업로드 버퍼(stored['file'])에서 한 번만 엽니다.
+    처리 결과는 EXIF 프로필별로 따로 저장합니다.
+    representative(근접 중복 묶음의 대표 이미지 처리 결과)가 주어지면 캡션을 생성하지 않고 대표 이미지의 캡션을 사용합니다.
+    이때만 결과에 duplicate_of를 붙이고 on_stage를 (단계, 값, 대표 이미지 ID)로 호출합니다.
+    저장된 결과를 사용한 경우에는 어차피 캡션을 생성하지 않으므로 대표 이미지의 캡션을 쓰지 않으며 duplicate_of도 붙이지 않습니다.
+    """
+    digest = stored['sha256']
+    exif_profile = stored.get('exif_profile') or EXIF_PROFILE
+    result_key = f"{digest}.{exif_profile}"
+    cached = upload_store.load_result(result_key)
+    if cached is not None:
+        logging.info(f"이미 처리된 이미지입니다. 저장된 결과를 사용합니다: {stored['filename']} ({digest})")
+        if derivative_store.missing(digest):
+            with open_stored_upload(stored) as handle:
+                derivative_store.ensure(digest, handle)
+        if on_stage:
+            on_stage('metadata', cached['metadata'])
+            on_stage('caption', cached['caption'])
+        result = with_image_urls(cached, digest)
+    else:
+        caption = representative['caption'] if representative else None
+        stage_callback = on_stage
+        if representative and on_stage:
+            stage_callback = lambda stage, value: on_stage(stage, value, representative['image_id'])
+        location_state = {}
+        with open_stored_upload(stored) as handle:
+            derivative_store.ensure(digest, handle)
+            result = image_processor.process_image(handle, stage_callback, exif_profile, caption, location_state)
+        # 대표 이미지의 캡션을 빌려 쓴 결과는 함께 업로드한 이미지에 따라 달라지므로 저장하지 않습니다.
+        if representative is None and ImageProcessor.is_complete(result, location_state.get('refined', True)):
+            upload_store.save_result(result_key, result)
+        result = with_image_urls(result, digest)
+        if representative:
+            result['duplicate_of'] = representative['image_id']
+    return result
+
+def hash_stored_upload(stored: dict) -> int:
+    """
+    저장된 업로드의 파생 이미지를 만들고, 캡션 크기로 축소한 이미지의 지각 해시(dHash)를 계산합니다.
+    이어지는 처리 단계는 여기서 만든 캡션용 파생 이미지를 읽으므로 원본을 다시 디코딩하지 않습니다.
+    """
+    with open_stored_upload(stored) as handle:
+        derivative_store.ensure(stored['sha256'], handle)
+        size = (derivative_store.caption_size, derivative_store.caption_size)
+        return PerceptualHash.dhash(handle.get_reduced_image(size))
+
+async def find_near_duplicates(stored_uploads: List[dict]) -> Dict[str, str]:
+    """
+    한 요청으로 업로드한 이미지들 중 서로 비슷한 이미지를 찾습니다.
+    각 묶음에서 먼저 업로드한 이미지가 대표가 되며, 해시를 계산하지 못한 이미지는 묶지 않습니다.
+
+    :return: {중복 이미지의 SHA-256: 대표 이미지의 SHA-256}
+    """
+    first_by_digest = {}
+    for stored in stored_uploads:
+        first_by_digest.setdefault(stored['sha256'], stored)
+    if not NEAR_DUPLICATE_DETECTION or len(first_by_digest) < 2:
+        return {}
+
+    loop = asyncio.get_running_loop()
+    hashes = await asyncio.gather(
+        *(loop.run_in_executor(image_executor, hash_stored_upload, stored) for stored in first_by_digest.values()),
+        return_exceptions=True
+    )
+    hashed = [(digest, value) for digest, value in zip(first_by_digest, hashes) if not isinstance(value, Exception)]
+    groups = PerceptualHash.group_near_duplicates([value for _, value in hashed], NEAR_DUPLICATE_THRESHOLD)
+    duplicates = {hashed[position][0]: hashed[representative][0] for position, representative in groups.items()}
+    if duplicates:
+        logging.info(f"근접 중복 이미지 {len(duplicates)}장은 대표 이미지의 캡션을 사용합니다.")
+    return duplicates
+
+async def wait_for_representative(representative_task: "asyncio.Future[dict]") -> Optional[dict]:
+    """
+    대표 이미지의 처리가 끝나기를 기다립니다.
+    대표 이미지 처리나 캡션 생성에 실패했으면 None을 반환하여 중복 이미지가 직접 캡션을 생성하도록 합니다.
+    """
+    try:
+        representative = await representative_task
+    except Exception:
+        return None
+    if representative is None or representative['caption'] == ImageCaptionGenerator.CAPTION_ERROR_MESSAGE:
+        return None
+    return representative
+
+async def process_stored_uploads(stored_uploads: List[dict]) -> list:
+    """
+    저장된 업로드들을 스레드 풀에서 동시에 처리하고 입력 순서대로 결과(또는 예외)를 반환합니다.
+    한 요청 안에 같은 이미지가 여러 번 포함되면 한 번만 처리하고,
+    근접 중복 이미지는 대표 이미지의 처리가 끝난 뒤 그 캡션으로 처리합니다.
+    """
+    loop = asyncio.get_running_loop()
+    duplicates = await find_near_duplicates(stored_uploads)
+
+    async def process_duplicate(stored, representative_task):
+        representative = await wait_for_representative(representative_task)
+        return await loop.run_in_executor(image_executor, process_stored_upload, stored, None, representative)
+
+    tasks = {}
+    for stored in stored_uploads:
+        digest = stored['sha256']
+        if digest in tasks:
+            continue
+        if digest in duplicates:
+            # 대표 이미지는 업로드 순서상 항상 먼저 등록됩니다.
+            tasks[digest] = asyncio.ensure_future(process_duplicate(stored, tasks[duplicates[digest]]))
+        else:
+            tasks[digest] = loop.run_in_executor(image_executor, process_stored_upload, stored)
+
+    results_by_digest = dict(zip(tasks, await asyncio.gather(*tasks.values(), return_exceptions=True)))
+    return [results_by_digest[stored['sha256']] for stored in stored_uploads]
+
 @app.post("/upload-images/")
-async def upload_images(files: List[UploadFile] = File(...)):
+async def upload_images(files: List[UploadFile] = File(...), exif_profile: Optional[str] = None):
     """
     이미지를 업로드하고 'image_upload' 폴더에 저장한 후 각 이미지에 대한 메타데이터와 캡션을 생성합니다.
+    업로드 파일은 워커 스레드에서 청크 단위로 저장되며, 파일당/요청당 크기 제한을 넘으면 413을 반환합니다.
+    exif_profile(minimal, standard, full)로 응답에 포함할 EXIF 필드를 고를 수 있습니다.
+    서로 비슷한 이미지는 대표 이미지 하나만 캡션을 생성하며, 생략한 캡션 생성 수를 api_calls_saved로 반환합니다.
     """
     image_data_list = []
 
-    # 이미지 업로드 폴더 경로 설정
-    upload_folder = "image_upload"
-    os.makedirs(upload_folder, exist_ok=True)  # 폴더가 없으면 생성
+    error_response = invalid_exif_profile(exif_profile)
+    if error_response:
+        await close_uploads(files)
+        return error_response
 
-    for file in files:
-        contents = await file.read()  # 이미지 파일 내용 읽기
-        file_path = os.path.join(upload_folder, file.filename)  # 저장할 파일 경로 설정
+    try:
+        stored_uploads = await ingest_uploads(files, exif_profile=exif_profile)
+        results = await process_stored_uploads(stored_uploads)
+    except UploadTooLargeError as e:
+        logging.warning(str(e))
+        return JSONResponse(status_code=413, content={"error": str(e)})
+    finally:
+        await close_uploads(files)
+
+    for stored, result in zip(stored_uploads, results):
+        if isinstance(result, Exception):
+            logging.error(f"이미지 {stored['filename']} 처리 중 오류 발생: {str(result)}", exc_info=result)
+            return {"error": f"이미지 {stored['filename']} 처리 중 오류 발생: {str(result)}"}
+        image_data_list.append(result)
+        logging.info(f"Processed image data: {result}")
+
+    # 대표 이미지의 캡션을 재사용하여 생략한 캡션 생성 수
+    api_calls_saved = len({result['image_id'] for result in image_data_list if result.get('duplicate_of')})
+    return {"image_data": image_data_list, "api_calls_saved": api_calls_saved}
+
+# 비동기 작업(job) API 설정
+# JOB_STORE=sqlite이면 작업 상태를 JOB_DB_PATH에 저장하여 서버를 재시작해도 이어서 처리합니다.
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+JOB_STORE = os.getenv("JOB_STORE", "memory")
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", "jobs.sqlite3")
+# 롱 폴링 요청이 대기할 수 있는 최대 시간(초)과 상태 확인 간격(초)
+JOB_LONG_POLL_MAX_SECONDS = 30
+JOB_POLL_INTERVAL_SECONDS = 0.5
+
+job_store = create_job_store(JOB_STORE, JOB_DB_PATH)
+job_manager = JobManager(job_store, process_stored_upload, max_workers=JOB_WORKERS)
+
+@app.on_event("startup")
+def resume_jobs():
+    """
+    서버 시작 시 끝나지 않은 작업을 이어서 처리합니다.
+    """
+    job_manager.resume()
+
+@app.post("/jobs", status_code=202)
+async def create_job(files: List[UploadFile] = File(...), exif_profile: Optional[str] = None):
+    """
+    이미지를 업로드하고 처리 작업을 등록한 뒤 작업 ID를 즉시 반환합니다.
+    처리는 워커 풀에서 진행되며 GET /jobs/{job_id} 또는 GET /jobs/{job_id}/events로 진행 상황을 확인합니다.
+    작업은 서버 재시작 후에도 이어서 처리할 수 있도록 PERSIST_UPLOADS 설정과 관계없이 원본을 디스크에 저장합니다.
+    """
+    error_response = invalid_exif_profile(exif_profile)
+    if error_response:
+        await close_uploads(files)
+        return error_response
+
+    try:
+        stored_uploads = await ingest_uploads(files, persist=True, exif_profile=exif_profile)
+    except UploadTooLargeError as e:
+        logging.warning(str(e))
+        return JSONResponse(status_code=413, content={"error": str(e)})
+    finally:
+        await close_uploads(files)
 
-        with open(file_path, "wb") as f:
-            f.write(contents)  # 이미지 파일을 'image_upload' 폴더에 저장
+    job_id = await run_in_threadpool(job_manager.submit, stored_uploads)
+    return {"job_id": job_id, "status": "queued", "total": len(stored_uploads)}
 
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, wait: float = 0, since: int = -1):
+    """
+    작업 상태와 이미지별 진행 상황/결과를 반환합니다.
+    wait(초)를 지정하면 작업 버전이 since보다 커지거나 작업이 끝날 때까지 응답을 보류합니다(롱 폴링).
+    """
+    job = await run_in_threadpool(job_store.get_job, job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"error": f"작업 {job_id}을(를) 찾을 수 없습니다."})
+
+    deadline = time.monotonic() + min(max(wait, 0), JOB_LONG_POLL_MAX_SECONDS)
+    while job['version'] <= since and job['status'] not in TERMINAL_JOB_STATUSES and time.monotonic() < deadline:
+        await asyncio.sleep(JOB_POLL_INTERVAL_SECONDS)
+        job = await run_in_threadpool(job_store.get_job, job_id)
+    return job
+
+@app.get("/jobs/{job_id}/events")
+async def get_job_events(job_id: str):
+    """
+    작업 진행 상황을 서버 전송 이벤트(SSE)로 스트리밍합니다.
+    상태가 바뀔 때마다 'progress' 이벤트로 작업 전체를 보내고, 작업이 끝나면 'done' 이벤트를 보낸 뒤 연결을 닫습니다.
+    """
+    job = await run_in_threadpool(job_store.get_job, job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"error": f"작업 {job_id}을(를) 찾을 수 없습니다."})
+
+    async def event_stream():
+        version = -1
+        while True:
+            job = await run_in_threadpool(job_store.get_job, job_id)
+            if job['version'] != version:
+                version = job['version']
+                yield f"event: progress\ndata: {json.dumps(job, ensure_ascii=False)}\n\n"
+            if job['status'] in TERMINAL_JOB_STATUSES:
+                yield f"event: done\ndata: {json.dumps({'job_id': job_id, 'status': job['status']})}\n\n"
+                break
+            await asyncio.sleep(JOB_POLL_INTERVAL_SECONDS)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.get("/images/{image_id}/{variant}")
+async def get_image_derivative(image_id: str, variant: str):
+    """
+    업로드 시 만든 파생 이미지를 반환합니다.
+    image_id는 원본의 SHA-256 해시이고 variant는 caption, preview, (설정한 경우) display 중 하나입니다.
+    내용이 바뀌지 않는 주소이므로 브라우저가 오래 캐시하도록 immutable 캐시 헤더를 붙입니다.
+    """
+    found = derivative_store.get(image_id, variant)
+    if found is None:
+        return JSONResponse(status_code=404, content={"error": f"이미지 {image_id}의 {variant} 파생 이미지를 찾을 수 없습니다."})
+    path, media_type = found
+    return FileResponse(path, media_type=media_type, headers={"Cache-Control": IMAGE_CACHE_CONTROL})
+
+@app.get("/locations/{location_id}")
+async def get_location(location_id: str, wait: float = 0):
+    """
+    지연 보강 모드에서 이미지 메타데이터의 location_id로 주소 보강 상태를 조회합니다.
+    wait(초)를 지정하면 주소 조회가 끝날 때까지 응답을 보류합니다(롱 폴링).
+    """
+    entry = location_enricher.get(location_id) if location_enricher else None
+    if entry is None:
+        return JSONResponse(status_code=404, content={"error": f"위치 {location_id}을(를) 찾을 수 없습니다."})
+
+    deadline = time.monotonic() + min(max(wait, 0), JOB_LONG_POLL_MAX_SECONDS)
+    while entry['status'] == 'pending' and time.monotonic() < deadline:
+        await asyncio.sleep(JOB_POLL_INTERVAL_SECONDS)
+        entry = location_enricher.get(location_id) or entry
+    return entry
+
+@app.post("/upload-images/stream")
+async def upload_images_stream(files: List[UploadFile] = File(...), exif_profile: Optional[str] = None):
+    """
+    /upload-images/와 같은 처리를 하되, 결과를 NDJSON(한 줄에 JSON 하나)으로 스트리밍합니다.
+    각 이미지의 단계가 끝나는 즉시 레코드를 보내므로 첫 번째 이미지가 끝나는 시점부터 결과를 표시할 수 있습니다.
+
+    레코드 종류:
+    - {"type": "metadata", "index", "file_name", "metadata"}: 메타데이터 추출 완료
+    - {"type": "caption", "index", "file_name", "image_path", "caption"}: 캡션 생성 완료
+      (근접 중복 이미지는 대표 이미지의 image_id를 담은 "duplicate_of"가 추가됩니다)
+    - {"type": "error", "index", "file_name", "error"}: 이미지 처리 실패
+    - {"type": "summary", "total", "succeeded", "failed", "api_calls_saved", "elapsed"}: 모든 이미지 처리 완료
+    """
+    error_response = invalid_exif_profile(exif_profile)
+    if error_response:
+        await close_uploads(files)
+        return error_response
+
+    try:
+        stored_uploads = await ingest_uploads(files, exif_profile=exif_profile)
+    except UploadTooLargeError as e:
+        logging.warning(str(e))
+        await close_uploads(files)
+        return JSONResponse(status_code=413, content={"error": str(e)})
+
+    async def event_stream():
+        started_at = time.monotonic()
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+
+        # 같은 이미지가 여러 번 포함되면 한 번만 처리하고 해당하는 모든 인덱스로 레코드를 보냅니다.
+        indexes_by_digest = {}
+        for index, stored in enumerate(stored_uploads):
+            indexes_by_digest.setdefault(stored['sha256'], []).append(index)
+        # 근접 중복 이미지는 대표 이미지의 처리가 끝난 뒤 그 캡션으로 처리합니다.
+        duplicates = await find_near_duplicates(stored_uploads)
+        reused_captions = []
+
+        def make_stage_callback(digest):
+            def on_stage(stage, value, duplicate_of=None):
+                for index in indexes_by_digest[digest]:
+                    stored = stored_uploads[index]
+                    record = {"type": stage, "index": index, "file_name": stored['filename'], "image_id": digest}
+                    if stage == 'metadata':
+                        record['metadata'] = value
+                    else:
+                        record['image_path'] = stored['path']
+                        record['caption'] = value
+                        if duplicate_of:
+                            record['duplicate_of'] = duplicate_of
+                    loop.call_soon_threadsafe(queue.put_nowait, record)
+            return on_stage
+
+        async def run(digest):
+            stored = stored_uploads[indexes_by_digest[digest][0]]
+            representative = None
+            if digest in duplicates:
+                representative = await wait_for_representative(tasks[duplicates[digest]])
+            try:
+                result = await loop.run_in_executor(
+                    image_executor, process_stored_upload, stored, make_stage_callback(digest), representative
+                )
+                # 저장된 결과를 사용한 이미지는 대표 이미지가 있어도 캡션 생성을 줄인 것이 아니므로 세지 않습니다.
+                if result.get('duplicate_of'):
+                    reused_captions.append(digest)
+                return result
+            except Exception as e:
+                logging.error(f"이미지 {stored['filename']} 처리 중 오류 발생: {str(e)}", exc_info=e)
+                for index in indexes_by_digest[digest]:
+                    queue.put_nowait({
+                        "type": "error",
+                        "index": index,
+                        "file_name": stored_uploads[index]['filename'],
+                        "error": f"이미지 {stored_uploads[index]['filename']} 처리 중 오류 발생: {str(e)}"
+                    })
+
+        tasks = {digest: asyncio.ensure_future(run(digest)) for digest in indexes_by_digest}
+        done = asyncio.ensure_future(asyncio.gather(*tasks.values()))
+        failed = 0
         try:
-            # 이미지 처리
-            result = image_processor.process_image(file_path)
-            image_data_list.append(result)
-            logging.info(f"Processed image data: {result}")
-        except Exception as e:
-            logging.error(f"이미지 {file.filename} 처리 중 오류 발생: {str(e)}")
-            logging.exception(e)
-            return {"error": f"이미지 {file.filename} 처리 중 오류 발생: {str(e)}"}
+            while not (done.done() and queue.empty()):
+                getter = asyncio.ensure_future(queue.get())
+                await asyncio.wait({getter, done}, return_when=asyncio.FIRST_COMPLETED)
+                if not getter.done():
+                    getter.cancel()
+                    continue
+                record = getter.result()
+                failed += record['type'] == 'error'
+                yield json.dumps(record, ensure_ascii=False) + "\n"
+
+            yield json.dumps({
+                "type": "summary",
+                "total": len(stored_uploads),
+                "succeeded": len(stored_uploads) - failed,
+                "failed": failed,
+                "api_calls_saved": len(reused_captions),
+                "elapsed": round(time.monotonic() - started_at, 3)
+            }, ensure_ascii=False) + "\n"
+        finally:
+            for task in tasks.values():
+                task.cancel()
+            await close_uploads(files)
+
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
+
+def parse_content_request(image_data_list: str, user_info: str, writing_tone: str):
+    """
+    글 생성 요청의 이미지 데이터와 사용자 정보를 파싱하고, 사용자 정보에 글쓰기 톤 정보를 추가합니다.
+    """
+    image_data_list = json.loads(image_data_list)
+    user_info = json.loads(user_info)
+
+    logging.info(f"Parsed image_data_list: {json.dumps(image_data_list, indent=2)}")
+    logging.info(f"Parsed user_info: {json.dumps(user_info, indent=2)}")
+
+    user_info['writing_tone'] = writing_tone
+    user_info['writing_tone_description'] = WRITING_TONES.get(writing_tone, ['', '', ''])[2]
+    return image_data_list, user_info
 
-    return {"image_data": image_data_list}
+def invalid_content_options(strategy: str, hashtag_backend: str) -> Optional[JSONResponse]:
+    """
+    글 생성 방식과 해시태그 생성기를 확인하고, 지원하지 않는 값이면 400 응답을 반환합니다.
+    """
+    strategies = content_generator.available_strategies()
+    if strategy not in strategies:
+        return JSONResponse(
+            status_code=400,
+            content={"error": f"지원하지 않는 생성 방식입니다: {strategy} (사용 가능: {', '.join(strategies)})"}
+        )
+    if hashtag_backend not in ContentGenerator.HASHTAG_BACKENDS:
+        return JSONResponse(
+            status_code=400,
+            content={"error": f"지원하지 않는 해시태그 생성기입니다: {hashtag_backend} (사용 가능: {', '.join(ContentGenerator.HASHTAG_BACKENDS)})"}
+        )
+    return None
+
+def content_cache_key(endpoint: str, image_data_list: list, user_context: str, writing_style: str, writing_tone: str,
+                      writing_length: int, temperature: float, user_info: dict, strategy: str, hashtag_backend: str,
+                      idempotency_key: Optional[str]) -> str:
+    """
+    글 생성 결과에 영향을 주는 모든 요청 값으로 캐시 키(요청 지문)를 계산합니다.
+    엔드포인트마다 결과 형식이 다르므로 엔드포인트도 키에 넣습니다.
+    """
+    return ContentCache.make_key({
+        "endpoint": endpoint,
+        "image_data_list": image_data_list,
+        "user_context": user_context,
+        "writing_style": writing_style,
+        "writing_tone": writing_tone,
+        "writing_length": writing_length,
+        "temperature": temperature,
+        "user_info": user_info,
+        "strategy": strategy,
+        "hashtag_backend": hashtag_backend
+    }, idempotency_key)
+
+def use_cached_content(temperature: float, allow_cached: bool, idempotency_key: Optional[str]) -> bool:
+    """
+    완성된 글 생성 결과를 재사용할지 정합니다.
+    temperature 0은 같은 결과가 나와야 하므로 항상 재사용하고, 그 외에는 클라이언트가 허용했거나
+    같은 멱등성 키로 다시 보낸 요청(재시도)일 때만 재사용합니다.
+    """
+    return temperature == 0 or allow_cached or bool(idempotency_key)
+
+def cacheable_content(result: dict) -> bool:
+    """
+    해시태그 생성에 실패해 오류 문구로 대신한 결과는 다음 요청이 다시 생성하도록 저장하지 않습니다.
+    """
+    return result.get('hashtags') != ContentGenerator.HASHTAG_ERROR_MESSAGE
+
+async def generate_streamed_content(broadcast: StreamBroadcast, image_data_list: list, user_context: str,
+                                   writing_style: str, writing_length: int, temperature: float, user_info: dict,
+                                   hashtag_backend: str) -> dict:
+    """
+    글을 스트리밍으로 생성하며 조각을 broadcast로 보내고, 완성된 글로 해시태그를 만들어 결과를 반환합니다.
+    요청 처리와 별도의 작업으로 실행하므로 스트림을 받던 클라이언트가 모두 연결을 끊어도 끝까지 생성하여 결과를 저장합니다.
+    """
+    try:
+        async for text in content_generator.astream_story(
+            image_data_list, user_context, writing_style, writing_length, temperature, user_info
+        ):
+            broadcast.publish(text)
+        story = "".join(broadcast.parts)
+        if hashtag_backend == 'local':
+            hashtags = content_generator.create_local_hashtags(image_data_list, story, writing_style)
+        else:
+            hashtags = await content_generator.acreate_hashtags(story)
+        logging.info("Streaming content generation completed successfully")
+        return {
+            "story": story,
+            "writing_tone": user_info.get('writing_tone', 'default'),
+            "hashtags": hashtags
+        }
+    finally:
+        broadcast.close()
+
+def sse_event(event: str, data: dict) -> str:
+    """
+    서버 전송 이벤트(SSE) 형식의 메시지 하나를 만듭니다.
+    """
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
 
 @app.post("/generate-content/")
 async def generate_content(
@@ -109,38 +833,55 @@ async def generate_content(
     writing_tone: str = Form(...),
     writing_length: int = Form(...),
     temperature: float = Form(...),
-    user_info: str = Form(...)
+    user_info: str = Form(...),
+    strategy: str = Form(default=""),
+    hashtag_backend: str = Form(default=""),
+    allow_cached: bool = Form(default=False),
+    idempotency_key: Optional[str] = Header(default=None)
 ):
     """
     이미지 데이터, 사용자 컨텍스트, 글쓰기 스타일, 글쓰기 톤, 글 길이, 생성 온도, 사용자 정보를 바탕으로 콘텐츠를 생성합니다.
+    strategy(sequential, combined, parallel)로 글과 해시태그 생성 방식을,
+    hashtag_backend(llm, local)로 sequential 방식의 해시태그 생성기를 고를 수 있습니다.
+    parallel은 로컬 해시태그가 명사만 뽑을 수 있을 때(kiwipiepy 설치)만 사용할 수 있습니다.
+    응답의 strategy, hashtag_backend, timings(단계별 소요 시간, 초)로 실제로 사용한 방식과 소요 시간을 확인할 수 있습니다.
+    combined 응답에서 해시태그를 읽지 못하면 strategy가 combined+local(해시태그만 로컬 생성, 명사만 뽑을 수 없으면
+    combined+llm으로 해시태그 API를 한 번 더 호출), 글을 읽지 못하면 combined+sequential(글은 일반 요청으로 다시 생성)이 됩니다.
+
+    같은 요청이 동시에 들어오면 한 번만 생성하며, 완성된 결과는 temperature 0이거나 allow_cached=true 또는
+    Idempotency-Key 헤더를 보낸 요청에 재사용합니다. 응답의 cache_status(hit, coalesced, miss)로 확인할 수 있습니다.
     """
+    strategy = strategy or CONTENT_STRATEGY
+    hashtag_backend = hashtag_backend or HASHTAG_BACKEND
+    error_response = invalid_content_options(strategy, hashtag_backend)
+    if error_response:
+        return error_response
+
     try:
         logging.info(f"Content generation started with parameters: style={writing_style}, tone={writing_tone}, length={writing_length}, temperature={temperature}")
         
         # 이미지 데이터와 사용자 정보 파싱
-        image_data_list = json.loads(image_data_list)
-        user_info = json.loads(user_info)
-
-        logging.info(f"Parsed image_data_list: {json.dumps(image_data_list, indent=2)}")
-        logging.info(f"Parsed user_info: {json.dumps(user_info, indent=2)}")
+        image_data_list, user_info = parse_content_request(image_data_list, user_info, writing_tone)
         logging.info(f"User context: {user_context}")
 
-        # 사용자 정보에 글쓰기 톤 정보 추가
-        user_info['writing_tone'] = writing_tone
-        user_info['writing_tone_description'] = WRITING_TONES.get(writing_tone, ['', '', ''])[2]
-
         # 스토리 및 해시태그 생성
-        story, generated_tone = content_generator.create_story(
-            image_data_list, user_context, writing_style, writing_length, temperature, user_info
+        # 비동기 클라이언트를 사용하므로 응답을 기다리는 동안 이벤트 루프가 다른 요청을 처리합니다.
+        cache_key = content_cache_key(
+            "generate-content", image_data_list, user_context, writing_style, writing_tone, writing_length,
+            temperature, user_info, strategy, hashtag_backend, idempotency_key
+        )
+        result, cache_status = await content_cache.get_or_generate(
+            cache_key,
+            lambda: content_generator.agenerate_content(
+                image_data_list, user_context, writing_style, writing_length, temperature, user_info, strategy, hashtag_backend
+            ),
+            use_cached=use_cached_content(temperature, allow_cached, idempotency_key),
+            expires=temperature != 0,
+            cacheable=cacheable_content
         )
-        hashtags = content_generator.create_hashtags(story)
 
-        logging.info("Content generation completed successfully")
-        return {
-            "story": story,
-            "writing_tone": generated_tone,
-            "hashtags": hashtags
-        }
+        logging.info(f"Content generation completed successfully (cache: {cache_status})")
+        return {**result, "cache_status": cache_status}
     except Exception as e:
         logging.error(f"콘텐츠 생성 중 오류 발생: {str(e)}")
         logging.exception(e)
@@ -150,6 +891,90 @@ async def generate_content(
         logging.info(f"Writing tone description: {WRITING_TONES.get(writing_tone, ['', '', ''])[2]}")
         return {"error": str(e)}
 
+@app.post("/generate-content/stream")
+async def generate_content_stream(
+    image_data_list: str = Form(...),
+    user_context: str = Form(default=""),
+    writing_style: str = Form(...),
+    writing_tone: str = Form(...),
+    writing_length: int = Form(...),
+    temperature: float = Form(...),
+    user_info: str = Form(...),
+    hashtag_backend: str = Form(default=""),
+    allow_cached: bool = Form(default=False),
+    idempotency_key: Optional[str] = Header(default=None)
+):
+    """
+    /generate-content/와 같은 처리를 하되, 생성되는 글을 서버 전송 이벤트(SSE)로 스트리밍합니다.
+    전체 글이 완성될 때까지 기다리지 않고 토큰이 도착하는 대로 보내므로 첫 글자가 표시되기까지의 시간이 크게 줄어듭니다.
+    해시태그는 글이 완성된 뒤 hashtag_backend(llm, local)로 생성합니다.
+    결과 재사용 규칙은 /generate-content/와 같으며, 재사용한 경우에는 전체 글을 token 이벤트 하나로 보낸 뒤 done 이벤트를 보냅니다.
+    같은 생성이 진행 중이면 지금까지 생성된 글 조각부터 함께 받습니다.
+    생성은 별도의 작업으로 실행하므로 먼저 요청한 클라이언트가 연결을 끊어도 함께 기다리는 요청은 결과를 받습니다.
+
+    이벤트 종류:
+    - token: {"text"} 새로 생성된 글 조각
+    - done: {"story", "writing_tone", "hashtags"} 완성된 글, 글쓰기 톤, 해시태그
+    - error: {"error"} 생성 실패
+    """
+    hashtag_backend = hashtag_backend or HASHTAG_BACKEND
+    error_response = invalid_content_options('sequential', hashtag_backend)
+    if error_response:
+        return error_response
+
+    try:
+        logging.info(f"Streaming content generation started with parameters: style={writing_style}, tone={writing_tone}, length={writing_length}, temperature={temperature}")
+        image_data_list, user_info = parse_content_request(image_data_list, user_info, writing_tone)
+    except Exception as e:
+        logging.error(f"콘텐츠 생성 요청을 읽을 수 없습니다: {str(e)}")
+        return JSONResponse(status_code=400, content={"error": str(e)})
+
+    cache_key = content_cache_key(
+        "generate-content/stream", image_data_list, user_context, writing_style, writing_tone, writing_length,
+        temperature, user_info, 'sequential', hashtag_backend, idempotency_key
+    )
+    cached = content_cache.get(cache_key) if use_cached_content(temperature, allow_cached, idempotency_key) else None
+    generation = content_cache.inflight(cache_key) if cached is None else None
+    broadcast = story_broadcasts.get(cache_key) if generation is not None else None
+    if cached is None and generation is None:
+        # 생성을 별도의 작업으로 시작하고 응답 본문을 보내기 전에 등록하므로, 바로 뒤에 들어온 같은 요청도
+        # 같은 스트림을 받고, 이 클라이언트가 연결을 끊어도 생성은 끝까지 진행됩니다.
+        broadcast = StreamBroadcast()
+        generation = asyncio.ensure_future(generate_streamed_content(
+            broadcast, image_data_list, user_context, writing_style, writing_length, temperature, user_info, hashtag_backend
+        ))
+        content_cache.register(cache_key, generation, expires=temperature != 0, cacheable=cacheable_content)
+        story_broadcasts[cache_key] = broadcast
+        generation.add_done_callback(
+            lambda _: story_broadcasts.pop(cache_key) if story_broadcasts.get(cache_key) is broadcast else None
+        )
+
+    async def event_stream():
+        if cached is not None:
+            logging.info("Streaming content served from cache (hit)")
+            yield sse_event("token", {"text": cached['story']})
+            yield sse_event("done", cached)
+            return
+        if broadcast is not None:
+            async for text in broadcast.subscribe():
+                yield sse_event("token", {"text": text})
+        try:
+            result = await asyncio.shield(generation)
+        except Exception as e:
+            logging.error(f"콘텐츠 생성 중 오류 발생: {str(e)}")
+            yield sse_event("error", {"error": str(e)})
+            return
+        if broadcast is None:
+            yield sse_event("token", {"text": result['story']})
+        yield sse_event("done", result)
+
+    # 프록시가 응답을 모아서 보내지 않도록 버퍼링을 끕니다.
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 if __name__ == "__main__":
     # 환경 변수에서 호스트와 포트 정보를 가져와 uvicorn 서버 실행
     host = os.getenv("HOST", "0.0.0.0")
@@ -57,13 +57,10 @@ document.addEventListener('DOMContentLoaded', function() {
     fileInput.addEventListener('change', (e) => handleFiles(e.target.files));
 
     // 파일 처리 함수
+    // 업로드 전에는 파일을 base64로 읽지 않고 객체 URL로 미리보기를 표시
     function handleFiles(files) {
         Array.from(files).forEach(file => {
-            const reader = new FileReader();
-            reader.onload = (e) => {
-                addImagePreview(file, e.target.result);
-            };
-            reader.readAsDataURL(file);
+            addImagePreview(file, URL.createObjectURL(file));
         });
         generateCaptionsButton.style.display = 'block';
     }
@@ -97,6 +94,10 @@ document.addEventListener('DOMContentLoaded', function() {
 
     // 이미지 제거 함수
     function removeImage(container, file) {
+        const image = uploadedImages.find(img => img.file === file);
+        if (image && image.preview.startsWith('blob:')) {
+            URL.revokeObjectURL(image.preview);
+        }
         container.remove();
         uploadedImages = uploadedImages.filter(img => img.file !== file);
         if (uploadedImages.length === 0) {
@@ -173,8 +174,40 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
 
-    // 컨텐츠 생성 함수
-    async function generateContent(imageDataList, userContext, writingStyle, writingTone, writingLength, temperature, userInfo) {
+    // 이미지 업로드 스트리밍 함수 (이미지별 처리 결과를 NDJSON으로 받아 도착하는 대로 onRecord에 전달)
+    async function uploadImagesStream(files, onRecord) {
+        const formData = new FormData();
+        for (let file of files) {
+            formData.append('files', file);
+        }
+
+        const response = await fetch(`${API_BASE_URL}/upload-images/stream`, {
+            method: 'POST',
+            body: formData
+        });
+        if (!response.ok) {
+            const data = await response.json();
+            throw new Error(data.error || response.statusText);
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            const lines = buffer.split('\n');
+            buffer = lines.pop();
+            lines.filter(line => line.trim()).forEach(line => onRecord(JSON.parse(line)));
+        }
+        if (buffer.trim()) {
+            onRecord(JSON.parse(buffer));
+        }
+    }
+
+    // 컨텐츠 생성 요청 폼 데이터 구성
+    function createContentFormData(imageDataList, userContext, writingStyle, writingTone, writingLength, temperature, userInfo) {
         const formData = new FormData();
         formData.append('image_data_list', JSON.stringify(imageDataList));
         formData.append('user_context', userContext);
@@ -183,25 +216,62 @@ document.addEventListener('DOMContentLoaded', function() {
         formData.append('writing_length', writingLength);
         formData.append('temperature', temperature);
         formData.append('user_info', JSON.stringify(userInfo));
+        return formData;
+    }
 
-        try {
-            const response = await fetch(`${API_BASE_URL}/generate-content/`, {
-                method: 'POST',
-                body: formData
+    // 컨텐츠 생성 스트리밍 함수 (서버 전송 이벤트로 도착하는 글 조각을 onToken에 전달하고 최종 결과를 반환)
+    async function generateContentStream(imageDataList, userContext, writingStyle, writingTone, writingLength, temperature, userInfo, onToken) {
+        const formData = createContentFormData(imageDataList, userContext, writingStyle, writingTone, writingLength, temperature, userInfo);
+
+        const response = await fetch(`${API_BASE_URL}/generate-content/stream`, {
+            method: 'POST',
+            body: formData
+        });
+        if (!response.ok) {
+            const data = await response.json();
+            throw new Error(data.error || response.statusText);
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let result = null;
+        const handleEvent = (message) => {
+            let event = 'message';
+            let data = '';
+            message.split('\n').forEach(line => {
+                if (line.startsWith('event:')) event = line.slice(6).trim();
+                else if (line.startsWith('data:')) data += line.slice(5).trim();
             });
-            return await response.json();
-        } catch (error) {
-            console.error('컨텐츠 생성 중 오류 발생:', error);
-            throw error;
+            if (!data) return;
+            const payload = JSON.parse(data);
+            if (event === 'token') onToken(payload.text);
+            else if (event === 'done') result = payload;
+            else if (event === 'error') throw new Error(payload.error);
+        };
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            const messages = buffer.split('\n\n');
+            buffer = messages.pop();
+            messages.forEach(handleEvent);
+        }
+        if (buffer.trim()) {
+            handleEvent(buffer);
+        }
+        if (!result) {
+            throw new Error('글 생성 스트림이 완료되지 않았습니다.');
         }
+        return result;
     }
 
     // 캡션 생성 버튼 이벤트 리스너
     generateCaptionsButton.addEventListener('click', async () => {
         generateCaptionsButton.disabled = true;
         try {
-            const imageData = await uploadImages(uploadedImages.map(img => img.file));
-            displayCaptions(imageData);
+            prepareCaptionCards();
+            await uploadImagesStream(uploadedImages.map(img => img.file), handleUploadRecord);
         } catch (error) {
             alert('이미지 캡션 생성 중 오류가 발생했습니다.');
         } finally {
@@ -209,41 +279,109 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     });
 
-    // 캡션 표시 함수
-    function displayCaptions(captions) {
+    // 업로드한 이미지 수만큼 빈 캡션 카드를 만들고 결과 영역을 표시하는 함수
+    function prepareCaptionCards() {
         captionCarousel.innerHTML = '';
-        captions.forEach((caption, index) => {
+        uploadedImages.forEach((image, index) => {
+            delete image.metadata;
+            delete image.caption;
+            delete image.error;
+            delete image.duplicateOf;
             const card = document.createElement('div');
             card.className = 'carousel-item';
-            const dateStr = caption.metadata.labeled_exif['Date/Time'];
-            let formattedDate = '날짜 정보 없음';
-            if (dateStr) {
-                const date = new Date(dateStr.replace(/(\d{4}):(\d{2}):(\d{2}) (\d{2}):(\d{2}):(\d{2})/, '$1-$2-$3T$4:$5:$6'));
-                if (!isNaN(date.getTime())) {
-                    formattedDate = `${date.getFullYear()}년 ${String(date.getMonth() + 1).padStart(2, '0')}월 ${String(date.getDate()).padStart(2, '0')}일 ${String(date.getHours()).padStart(2, '0')}시 ${String(date.getMinutes()).padStart(2, '0')}분`;
-                }
-            }
-            card.innerHTML = `
-                <img src="${uploadedImages[index].preview}" alt="${caption.caption}">
-                <div class="metadata">
-                    <p>날짜: ${formattedDate}</p>
-                    <p>주소: ${caption.metadata.location_info.full_address || 'N/A'}</p>
-                    <p>이미지 캡션: ${caption.caption}</p>
-                </div>
-            `;
             captionCarousel.appendChild(card);
-
-            uploadedImages[index] = {
-                ...uploadedImages[index],
-                metadata: caption.metadata,
-                caption: caption.caption
-            };
+            renderCaptionCard(index);
         });
         document.getElementById('captionResults').style.display = 'block';
         writeOptions.style.display = 'block';
         updateCarouselButtons();
     }
 
+    // 스트리밍 레코드를 받아 해당 이미지의 데이터와 카드를 갱신하는 함수
+    function handleUploadRecord(record) {
+        const image = uploadedImages[record.index];
+        if (record.image_id) {
+            useServerPreview(image, record.image_id);
+        }
+        if (record.type === 'metadata') {
+            image.metadata = record.metadata;
+            // 위치 ID가 없는 대기 상태는 같은 업로드 스트림에서 주소가 붙은 메타데이터가 다시 옴
+            if (record.metadata.location_status === 'pending' && record.metadata.location_id) {
+                pollLocation(record.index, record.metadata.location_id);
+            }
+        } else if (record.type === 'caption') {
+            image.caption = record.caption;
+            image.duplicateOf = record.duplicate_of || null;
+        } else if (record.type === 'error') {
+            image.error = record.error;
+        } else if (record.type === 'summary') {
+            console.log(`이미지 ${record.total}개 처리 완료 (실패 ${record.failed}개, 중복으로 생략한 캡션 ${record.api_calls_saved}개, ${record.elapsed}초)`);
+            return;
+        }
+        renderCaptionCard(record.index);
+    }
+
+    // 업로드 시 서버가 만든 작은 미리보기로 교체하는 함수 (원본 파일을 다시 디코딩하지 않고 브라우저 캐시를 사용)
+    function useServerPreview(image, imageId) {
+        const preview = `${API_BASE_URL}/images/${imageId}/preview`;
+        if (image.preview === preview) return;
+        if (image.preview.startsWith('blob:')) {
+            URL.revokeObjectURL(image.preview);
+        }
+        image.preview = preview;
+        image.container.querySelector('img').src = preview;
+    }
+
+    // 백그라운드에서 보강 중인 주소를 롱 폴링으로 받아 카드에 반영하는 함수
+    async function pollLocation(index, locationId) {
+        const image = uploadedImages[index];
+        for (let attempt = 0; attempt < 10; attempt++) {
+            try {
+                const response = await fetch(`${API_BASE_URL}/locations/${locationId}?wait=25`);
+                if (!response.ok) return;
+                const location = await response.json();
+                // 그 사이 캡션을 다시 생성했다면 이전 결과는 무시
+                if (!image.metadata || image.metadata.location_id !== locationId) return;
+                if (location.status === 'pending') continue;
+                image.metadata.location_info = location.location_info;
+                image.metadata.location_status = location.status;
+                renderCaptionCard(index);
+                return;
+            } catch (error) {
+                console.error('주소 보강 상태 확인 중 오류:', error);
+                return;
+            }
+        }
+    }
+
+    // 이미지 하나의 캡션 카드를 현재까지 받은 데이터로 그리는 함수
+    function renderCaptionCard(index) {
+        const image = uploadedImages[index];
+        const card = captionCarousel.children[index];
+        const metadata = image.metadata;
+        let formattedDate = metadata ? '날짜 정보 없음' : '처리 중...';
+        const dateStr = metadata && metadata.labeled_exif['Date/Time'];
+        if (dateStr) {
+            const date = new Date(dateStr.replace(/(\d{4}):(\d{2}):(\d{2}) (\d{2}):(\d{2}):(\d{2})/, '$1-$2-$3T$4:$5:$6'));
+            if (!isNaN(date.getTime())) {
+                formattedDate = `${date.getFullYear()}년 ${String(date.getMonth() + 1).padStart(2, '0')}월 ${String(date.getDate()).padStart(2, '0')}일 ${String(date.getHours()).padStart(2, '0')}시 ${String(date.getMinutes()).padStart(2, '0')}분`;
+            }
+        }
+        let address = metadata ? (metadata.location_info.full_address || 'N/A') : '처리 중...';
+        if (metadata && metadata.location_status === 'pending') {
+            address = '주소 확인 중...';
+        }
+        const caption = image.error || image.caption || '캡션 생성 중...';
+        card.innerHTML = `
+            <img src="${image.preview}" alt="${image.caption || ''}">
+            <div class="metadata">
+                <p>날짜: ${formattedDate}</p>
+                <p>주소: ${address}</p>
+                <p>이미지 캡션: ${caption}</p>
+            </div>
+        `;
+    }
+
     // 캐러셀 위치 업데이트 함수
     function updateCarouselPosition() {
         captionCarousel.style.transform = `translateX(-${currentCarouselPosition}px)`;
@@ -289,11 +427,15 @@ document.addEventListener('DOMContentLoaded', function() {
             const userAge = document.getElementById('age').value;
             const userGender = document.getElementById('gender').value;
 
-            const result = await generateContent(
+            // 첫 글자가 도착하면 스켈레톤 대신 생성 중인 글을 바로 표시합니다.
+            content.textContent = '';
+            hashtags.textContent = '';
+            const result = await generateContentStream(
                 uploadedImages.map(img => ({
                     file_name: img.file.name,
                     metadata: img.metadata || {},
-                    caption: img.caption || ''
+                    caption: img.caption || '',
+                    duplicate_of: img.duplicateOf || null
                 })),
                 document.getElementById('context').value,
                 writingStyle,
@@ -304,6 +446,11 @@ document.addEventListener('DOMContentLoaded', function() {
                     age: userAge,
                     gender: userGender,
                     writing_tone: writingTone
+                },
+                (text) => {
+                    contentSkeleton.style.display = 'none';
+                    generatedContent.style.display = 'block';
+                    content.textContent += text;
                 }
             );
 
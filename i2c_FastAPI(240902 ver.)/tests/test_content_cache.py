@@ -0,0 +1,201 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ContentCache as content_cache_module  # noqa: E402
+from ContentCache import ContentCache, StreamBroadcast  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(content_cache_module.time, 'time', fake.time)
+    return fake
+
+
+class CountingGenerator:
+    # 호출 수를 세고, release가 설정될 때까지 기다린 뒤 결과를 반환하는 생성 함수
+    def __init__(self, result=None, error=None):
+        self.calls = 0
+        self.result = result or {'story': '바다', 'hashtags': '#바다'}
+        self.error = error
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return dict(self.result, call=self.calls)
+
+
+def test_make_key_ignores_field_order_and_separates_idempotency_keys():
+    fields = {'writing_style': '일기', 'temperature': 0.7, 'image_data_list': [{'caption': '바다'}]}
+    reordered = dict(reversed(list(fields.items())))
+    assert ContentCache.make_key(fields) == ContentCache.make_key(reordered)
+    assert ContentCache.make_key(fields) != ContentCache.make_key({**fields, 'temperature': 0.8})
+
+    first, second = ContentCache.make_key(fields, 'key-1'), ContentCache.make_key(fields, 'key-2')
+    assert first.startswith('idempotency:') and second.startswith('idempotency:')
+    assert len({ContentCache.make_key(fields), first, second}) == 3
+    # 같은 멱등성 키라도 요청 내용이 다르면 다른 항목입니다.
+    assert ContentCache.make_key({**fields, 'temperature': 0.8}, 'key-1') != first
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = ContentCache(ttl_seconds=60)
+    cache.set('key', {'story': '바다'})
+    clock.now += 59
+    assert cache.get('key') == {'story': '바다'}
+    clock.now += 2
+    assert cache.get('key') is None
+    assert cache.stats()['expired'] == 1
+    assert cache.stats()['entries'] == 0
+
+
+def test_entries_stored_without_expiry_never_expire(clock):
+    cache = ContentCache(ttl_seconds=60)
+    cache.set('key', {'story': '바다'}, expires=False)
+    clock.now += 10 ** 6
+    assert cache.get('key') == {'story': '바다'}
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ContentCache(max_entries=2)
+    cache.set('a', {'story': 'a'})
+    cache.set('b', {'story': 'b'})
+    cache.get('a')
+    cache.set('c', {'story': 'c'})
+    assert cache.get('b') is None
+    assert cache.get('a') == {'story': 'a'} and cache.get('c') == {'story': 'c'}
+
+
+def test_concurrent_requests_share_one_generation():
+    async def run():
+        cache = ContentCache()
+        generate = CountingGenerator()
+        first = asyncio.ensure_future(cache.get_or_generate('key', generate))
+        second = asyncio.ensure_future(cache.get_or_generate('key', generate))
+        await asyncio.sleep(0)
+        generate.release.set()
+        results = await asyncio.gather(first, second)
+        third = await cache.get_or_generate('key', generate)
+        return generate.calls, results, third, cache.stats()
+
+    calls, results, third, stats = asyncio.run(run())
+    assert calls == 1
+    assert [status for _, status in results] == ['miss', 'coalesced']
+    assert results[0][0] is results[1][0]
+    assert third == (results[0][0], 'hit')
+    assert (stats['misses'], stats['coalesced'], stats['hits'], stats['inflight']) == (1, 1, 1, 0)
+
+
+def test_generation_survives_cancellation_of_the_first_caller():
+    async def run():
+        cache = ContentCache()
+        generate = CountingGenerator()
+        first = asyncio.ensure_future(cache.get_or_generate('key', generate))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(cache.get_or_generate('key', generate))
+        await asyncio.sleep(0)
+        first.cancel()
+        generate.release.set()
+        return await second, first.cancelled(), cache.get('key')
+
+    (result, status), first_cancelled, cached = asyncio.run(run())
+    assert first_cancelled
+    assert status == 'coalesced' and result['call'] == 1
+    assert cached == result
+
+
+def test_failed_generation_reaches_every_waiter_and_is_not_cached():
+    async def run():
+        cache = ContentCache()
+        generate = CountingGenerator(error=RuntimeError('upstream failed'))
+        waiters = [asyncio.ensure_future(cache.get_or_generate('key', generate)) for _ in range(2)]
+        await asyncio.sleep(0)
+        generate.release.set()
+        outcomes = await asyncio.gather(*waiters, return_exceptions=True)
+        generate.error = None
+        retried = await cache.get_or_generate('key', generate)
+        return outcomes, retried, generate.calls, cache.stats()
+
+    outcomes, retried, calls, stats = asyncio.run(run())
+    assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+    assert retried[1] == 'miss' and retried[0]['call'] == 2
+    assert calls == 2
+    assert stats['inflight'] == 0
+
+
+def test_cacheable_filter_skips_storing_rejected_results():
+    async def run():
+        cache = ContentCache()
+        generate = CountingGenerator(result={'story': '바다', 'hashtags': 'error'})
+        generate.release.set()
+        cacheable = lambda result: result['hashtags'] != 'error'  # noqa: E731
+        first = await cache.get_or_generate('key', generate, cacheable=cacheable)
+        second = await cache.get_or_generate('key', generate, cacheable=cacheable)
+        return first, second, generate.calls
+
+    first, second, calls = asyncio.run(run())
+    assert (first[1], second[1], calls) == ('miss', 'miss', 2)
+
+
+def test_use_cached_false_regenerates_but_stores_the_new_result():
+    async def run():
+        cache = ContentCache()
+        generate = CountingGenerator()
+        generate.release.set()
+        first = await cache.get_or_generate('key', generate)
+        second = await cache.get_or_generate('key', generate, use_cached=False)
+        return first, second, cache.get('key')
+
+    first, second, cached = asyncio.run(run())
+    assert (first[0]['call'], second[0]['call']) == (1, 2)
+    assert second[1] == 'miss' and cached == second[0]
+
+
+def test_results_generated_with_expires_false_outlive_the_ttl(clock):
+    async def run():
+        cache = ContentCache(ttl_seconds=60)
+        generate = CountingGenerator()
+        generate.release.set()
+        await cache.get_or_generate('fixed', generate, expires=False)
+        await cache.get_or_generate('sampled', generate)
+        clock.now += 120
+        return cache.get('fixed'), cache.get('sampled')
+
+    fixed, sampled = asyncio.run(run())
+    assert fixed is not None and sampled is None
+
+
+def test_stream_broadcast_replays_earlier_parts_to_late_subscribers():
+    async def collect(broadcast):
+        return [part async for part in broadcast.subscribe()]
+
+    async def run():
+        broadcast = StreamBroadcast()
+        early = asyncio.ensure_future(collect(broadcast))
+        broadcast.publish('바다')
+        await asyncio.sleep(0)
+        broadcast.publish('에 ')
+        late = asyncio.ensure_future(collect(broadcast))
+        await asyncio.sleep(0)
+        broadcast.publish('갔다.')
+        broadcast.close()
+        return await early, await late, await collect(broadcast)
+
+    early, late, after_close = asyncio.run(run())
+    assert early == late == after_close == ['바다', '에 ', '갔다.']
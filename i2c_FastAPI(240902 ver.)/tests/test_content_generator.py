@@ -0,0 +1,126 @@
+import asyncio
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ContentGenerator import ContentGenerator  # noqa: E402
+
+IMAGE_DATA = [{'caption': '해변에서 서핑 보드를 든 사람', 'metadata': {}}]
+USER_INFO = {'writing_tone': '1', 'age': '30', 'gender': '여성'}
+
+
+class StubCompletions:
+    # 미리 정해 둔 응답 내용을 차례로 돌려주고 받은 요청을 기록하는 비동기 chat.completions
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.requests = []
+
+    async def create(self, **request):
+        self.requests.append(request)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=self.replies.pop(0)))], usage=None)
+
+
+class StubHashtagGenerator:
+    def __init__(self, nouns_only):
+        self.nouns_only = nouns_only
+
+    def generate(self, story, captions, locations, writing_style):
+        return ['#서핑', '#해변']
+
+
+def make_generator(replies, nouns_only=True):
+    completions = StubCompletions(replies)
+    clients = SimpleNamespace(client=None, async_client=SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+    generator = ContentGenerator('test-key', clients=clients, hashtag_generator=StubHashtagGenerator(nouns_only))
+    return generator, completions
+
+
+def generate(generator, strategy, hashtag_backend='llm'):
+    return asyncio.run(generator.agenerate_content(
+        IMAGE_DATA, '', '일기', 300, 0.7, USER_INFO, strategy=strategy, hashtag_backend=hashtag_backend
+    ))
+
+
+@pytest.mark.parametrize('content, expected', [
+    (json.dumps({'story': '바다에 갔다.', 'hashtags': ['#바다', '여행', '']}), ('바다에 갔다.', '#바다, #여행')),
+    (json.dumps({'story': '바다에 갔다.', 'hashtags': '#바다, #여행'}), ('바다에 갔다.', '#바다, #여행')),
+    (json.dumps({'story': '바다에 갔다.', 'hashtags': 5}), ('바다에 갔다.', None)),
+    (json.dumps({'story': '바다에 갔다.', 'hashtags': []}), ('바다에 갔다.', None)),
+    (json.dumps({'story': '바다에 갔다.'}), ('바다에 갔다.', None)),
+    ('{"story": "바다에 갔다. 파도가', (None, None)),
+    (json.dumps({'story': '  ', 'hashtags': ['#바다']}), (None, None)),
+    (json.dumps({'story': ['바다'], 'hashtags': ['#바다']}), (None, None)),
+    (json.dumps(['바다']), (None, None)),
+])
+def test_parse_combined_response(content, expected):
+    generator, _ = make_generator([])
+    assert generator._parse_combined_response(content) == expected
+
+
+def test_combined_uses_one_call():
+    generator, completions = make_generator([json.dumps({'story': '바다에 갔다.', 'hashtags': ['#바다']})])
+    result = generate(generator, 'combined')
+    assert (result['story'], result['hashtags'], result['strategy'], result['hashtag_backend']) == \
+        ('바다에 갔다.', '#바다', 'combined', 'llm')
+    assert len(completions.requests) == 1
+    assert completions.requests[0]['response_format'] == {'type': 'json_object'}
+
+
+def test_combined_truncated_json_falls_back_to_plain_story_call():
+    generator, completions = make_generator(['{"story": "바다에 갔', '바다에 갔다.'])
+    result = generate(generator, 'combined')
+    assert (result['story'], result['hashtags'], result['strategy'], result['hashtag_backend']) == \
+        ('바다에 갔다.', '#서핑, #해변', 'combined+sequential', 'local')
+    assert len(completions.requests) == 2
+    assert 'response_format' not in completions.requests[1]
+
+
+def test_combined_truncated_json_without_noun_tagger_asks_for_hashtags():
+    generator, completions = make_generator(['{"story": "바다에 갔', '바다에 갔다.', '#바다, #여행'], nouns_only=False)
+    result = generate(generator, 'combined')
+    assert (result['story'], result['hashtags'], result['strategy'], result['hashtag_backend']) == \
+        ('바다에 갔다.', '#바다, #여행', 'combined+sequential', 'llm')
+    assert len(completions.requests) == 3
+
+
+@pytest.mark.parametrize('nouns_only, strategy, hashtag_backend, hashtags, calls', [
+    (True, 'combined+local', 'local', '#서핑, #해변', 1),
+    (False, 'combined+llm', 'llm', '#바다, #여행', 2),
+])
+def test_combined_missing_hashtags(nouns_only, strategy, hashtag_backend, hashtags, calls):
+    generator, completions = make_generator([json.dumps({'story': '바다에 갔다.', 'hashtags': 5}), '#바다, #여행'],
+                                            nouns_only=nouns_only)
+    result = generate(generator, 'combined')
+    assert (result['strategy'], result['hashtag_backend'], result['hashtags']) == (strategy, hashtag_backend, hashtags)
+    assert len(completions.requests) == calls
+
+
+def test_parallel_uses_local_hashtags_with_one_call():
+    generator, completions = make_generator(['바다에 갔다.'])
+    result = generate(generator, 'parallel')
+    assert (result['story'], result['hashtags'], result['strategy'], result['hashtag_backend']) == \
+        ('바다에 갔다.', '#서핑, #해변', 'parallel', 'local')
+    assert len(completions.requests) == 1
+    assert set(result['timings']) == {'story', 'hashtags', 'total'}
+
+
+def test_parallel_is_unavailable_without_noun_tagger():
+    generator, completions = make_generator(['바다에 갔다.'], nouns_only=False)
+    assert 'parallel' not in generator.available_strategies()
+    with pytest.raises(ValueError):
+        generate(generator, 'parallel')
+    assert completions.requests == []
+
+
+@pytest.mark.parametrize('hashtag_backend, hashtags, calls', [('llm', '#바다, #여행', 2), ('local', '#서핑, #해변', 1)])
+def test_sequential(hashtag_backend, hashtags, calls):
+    generator, completions = make_generator(['바다에 갔다.', '#바다, #여행'])
+    result = generate(generator, 'sequential', hashtag_backend)
+    assert (result['story'], result['hashtags'], result['strategy'], result['hashtag_backend']) == \
+        ('바다에 갔다.', hashtags, 'sequential', hashtag_backend)
+    assert len(completions.requests) == calls
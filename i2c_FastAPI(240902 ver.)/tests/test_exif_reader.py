@@ -0,0 +1,135 @@
+import io
+import os
+import sys
+
+import pytest
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ExifReader  # noqa: E402
+from ImageHandle import ImageHandle  # noqa: E402
+
+MAKE, MODEL, ORIENTATION, DATETIME = 0x010F, 0x0110, 0x0112, 0x0132
+DATETIME_ORIGINAL, EXPOSURE_TIME, MAKER_NOTE = 0x9003, 0x829A, 0x927C
+
+
+def jpeg_with_exif(endian):
+    exif = Image.Exif()
+    exif.endian = endian
+    exif[MAKE] = 'Canon'
+    exif[MODEL] = 'EOS R6'
+    exif[ORIENTATION] = 6
+    exif[DATETIME] = '2024:01:02 03:04:05'
+    exif_ifd = exif.get_ifd(ExifReader.EXIF_IFD_TAG)
+    exif_ifd[DATETIME_ORIGINAL] = '2024:01:02 03:04:05'
+    exif_ifd[EXPOSURE_TIME] = 1 / 250
+    exif_ifd[MAKER_NOTE] = b'x' * 300
+    gps_ifd = exif.get_ifd(ExifReader.GPS_IFD_TAG)
+    gps_ifd[1] = 'N'
+    gps_ifd[2] = (37.0, 33.0, 12.5)
+    gps_ifd[3] = 'E'
+    gps_ifd[4] = (126.0, 58.0, 40.0)
+    return encode_jpeg(exif=exif.tobytes())
+
+
+def encode_jpeg(**save_options):
+    buffer = io.BytesIO()
+    Image.new('RGB', (32, 24), 'red').save(buffer, 'JPEG', **save_options)
+    return buffer.getvalue()
+
+
+def tiff_start(data):
+    return data.index(b'Exif\x00\x00') + 6
+
+
+def pillow_exif(data):
+    return Image.open(io.BytesIO(data))._getexif()
+
+
+@pytest.mark.parametrize('endian, byte_order', [('<', b'II'), ('>', b'MM')])
+def test_fast_path_matches_pillow(endian, byte_order):
+    data = jpeg_with_exif(endian)
+    assert data[tiff_start(data):tiff_start(data) + 2] == byte_order
+    exif = ExifReader.read_exif(io.BytesIO(data))
+    assert exif == pillow_exif(data)
+    assert exif[ExifReader.GPS_IFD_TAG][2] == (37.0, 33.0, 12.5)
+    # IFD0 항목은 Pillow의 getexif()와도 같습니다.
+    ifd0 = Image.open(io.BytesIO(data)).getexif()
+    assert {tag: exif[tag] for tag in (MAKE, MODEL, ORIENTATION, DATETIME)} == \
+        {tag: ifd0[tag] for tag in (MAKE, MODEL, ORIENTATION, DATETIME)}
+
+
+@pytest.mark.parametrize('endian', ['<', '>'])
+def test_selected_tags_match_projected_pillow_exif(endian):
+    data = jpeg_with_exif(endian)
+    tags, gps_tags = {MAKE, DATETIME_ORIGINAL, ExifReader.GPS_IFD_TAG}, {2, 4}
+    exif = ExifReader.read_exif(io.BytesIO(data), tags, gps_tags, max_binary_bytes=64)
+    assert exif == ExifReader.project_exif(pillow_exif(data), tags, gps_tags, max_binary_bytes=64)
+    assert set(exif) == tags
+    assert set(exif[ExifReader.GPS_IFD_TAG]) == gps_tags
+
+    exif = ExifReader.read_exif(io.BytesIO(data), max_binary_bytes=64)
+    assert MAKER_NOTE not in exif and MAKE in exif
+
+
+def test_jpeg_without_exif_is_empty():
+    data = encode_jpeg()
+    assert ExifReader.read_exif(io.BytesIO(data)) == {}
+    assert pillow_exif(data) is None
+    assert ImageHandle(data).get_exif() == {}
+
+
+def test_non_jpeg_is_left_to_pillow():
+    buffer = io.BytesIO()
+    Image.new('RGB', (8, 8)).save(buffer, 'PNG')
+    assert ExifReader.read_exif(io.BytesIO(buffer.getvalue())) is None
+
+
+def corrupt(data, name):
+    start = tiff_start(data)
+    if name == 'byte order':
+        return data[:start] + b'XX' + data[start + 2:]
+    if name == 'ifd0 offset':
+        return data[:start + 4] + b'\xff\xff\x00\x00' + data[start + 8:]
+    if name == 'tiff magic':
+        return data[:start + 2] + b'\x00\x00' + data[start + 4:]
+    # 파일이 APP1 세그먼트 중간에서 끝납니다.
+    return data[:start + 20]
+
+
+@pytest.mark.parametrize('name', ['byte order', 'ifd0 offset', 'tiff magic', 'truncated file'])
+def test_corrupt_app1_returns_none_and_handle_falls_back(name):
+    data = corrupt(jpeg_with_exif('<'), name)
+    assert ExifReader.read_exif(io.BytesIO(data)) is None
+    # ImageHandle은 Pillow로 다시 읽고, Pillow도 읽지 못하면 EXIF가 없는 것으로 봅니다.
+    assert ImageHandle(data).get_exif() == ExifReader.project_exif(pillow_exif_or_empty(data))
+
+
+def pillow_exif_or_empty(data):
+    try:
+        return pillow_exif(data) or {}
+    except OSError:
+        return {}
+
+
+def test_out_of_range_value_offset_skips_only_that_tag():
+    data = bytearray(jpeg_with_exif('<'))
+    start = tiff_start(data)
+    # IFD0의 첫 항목(Make, ASCII 6바이트)은 값이 TIFF 데이터 안의 오프셋에 있습니다. 오프셋을 범위 밖으로 바꿉니다.
+    ifd0 = start + int.from_bytes(data[start + 4:start + 8], 'little')
+    entry = ifd0 + 2
+    assert int.from_bytes(data[entry:entry + 2], 'little') == MAKE
+    data[entry + 8:entry + 12] = (0xFFFF00).to_bytes(4, 'little')
+    exif = ExifReader.read_exif(io.BytesIO(bytes(data)))
+    assert MAKE not in exif
+    assert exif[MODEL] == 'EOS R6'
+    assert exif[ExifReader.GPS_IFD_TAG][1] == 'N'
+
+
+def test_fill_bytes_and_other_app_segments_are_skipped():
+    data = jpeg_with_exif('>')
+    # SOI 뒤에 채움 바이트와 APP2 세그먼트를 넣습니다.
+    app2 = b'\xff\xe2' + (2 + 4).to_bytes(2, 'big') + b'ICC_'
+    patched = data[:2] + b'\xff' + app2 + data[2:]
+    assert ExifReader.read_exif(io.BytesIO(patched)) == pillow_exif(data)
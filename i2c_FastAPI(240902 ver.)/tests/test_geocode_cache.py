@@ -0,0 +1,134 @@
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from GeocodeCache import GeocodeCache  # noqa: E402
+
+SEOUL = {'city': 'Seoul', 'country': 'South Korea'}
+
+
+class FakeGeocoder:
+    # 호출한 좌표를 기록하고 정해 둔 결과를 반환하는 조회 함수 (gate가 있으면 열릴 때까지 기다림)
+    def __init__(self, result=None, gate=None):
+        self.result = SEOUL if result is None else result
+        self.gate = gate
+        self.calls = []
+        self.started = threading.Event()
+
+    def __call__(self, lat, lon):
+        self.calls.append((lat, lon))
+        self.started.set()
+        if self.gate is not None:
+            self.gate.wait(5)
+        if isinstance(self.result, BaseException):
+            raise self.result
+        return dict(self.result)
+
+
+def test_nearby_coordinates_share_a_quantized_key():
+    cache = GeocodeCache(precision=3)
+    geocoder = FakeGeocoder()
+    # 약 40m 떨어진 두 좌표는 소수점 3자리에서 같은 키(37.566,126.978), 세 번째 좌표는 다른 키입니다.
+    assert cache.get_or_resolve(37.5662, 126.9781, geocoder) == SEOUL
+    assert cache.get_or_resolve(37.5658, 126.9779, geocoder) == SEOUL
+    assert cache.get_or_resolve(37.5671, 126.9781, geocoder) == SEOUL
+    assert len(geocoder.calls) == 2
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses']) == (1, 2)
+
+
+def test_namespace_prefixes_the_key():
+    assert GeocodeCache(precision=2).quantize(37.5665, 126.978) == '37.57,126.98'
+    assert GeocodeCache(precision=2, namespace='offline').quantize(37.5665, 126.978) == 'offline:37.57,126.98'
+
+
+def test_returned_results_are_copies():
+    cache = GeocodeCache()
+    cache.get_or_resolve(37.5, 127.0, FakeGeocoder())['city'] = 'changed'
+    assert cache.get_or_resolve(37.5, 127.0, FakeGeocoder())['city'] == 'Seoul'
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = GeocodeCache(precision=0, max_entries=2)
+    geocoder = FakeGeocoder()
+    for lat in (1, 2):
+        cache.get_or_resolve(lat, 0, geocoder)
+    cache.get_or_resolve(1, 0, geocoder)
+    cache.get_or_resolve(3, 0, geocoder)
+    assert cache.stats()['entries'] == 2
+    cache.get_or_resolve(1, 0, geocoder)
+    cache.get_or_resolve(2, 0, geocoder)
+    assert geocoder.calls == [(1, 0), (2, 0), (3, 0), (2, 0)]
+
+
+def test_sqlite_tier_is_shared_between_instances(tmp_path):
+    db_path = str(tmp_path / 'geocode.sqlite3')
+    first = GeocodeCache(db_path=db_path)
+    first.get_or_resolve(37.5665, 126.978, FakeGeocoder())
+
+    second = GeocodeCache(db_path=db_path)
+    geocoder = FakeGeocoder(result={'city': 'unused'})
+    assert second.get_or_resolve(37.5665, 126.978, geocoder) == SEOUL
+    assert second.get_or_resolve(37.5665, 126.978, geocoder) == SEOUL
+    assert geocoder.calls == []
+    stats = second.stats()
+    assert (stats['persistent_hits'], stats['hits'], stats['misses']) == (1, 1, 0)
+
+
+@pytest.mark.parametrize('result, cacheable', [({}, None), ({'city': 'Seoul', 'refined': False}, lambda r: False)])
+def test_empty_or_rejected_results_are_not_cached(tmp_path, result, cacheable):
+    db_path = str(tmp_path / 'geocode.sqlite3')
+    cache = GeocodeCache(db_path=db_path)
+    geocoder = FakeGeocoder(result=result)
+    assert cache.get_or_resolve(37.5, 127.0, geocoder, cacheable) == result
+    assert cache.get_or_resolve(37.5, 127.0, geocoder, cacheable) == result
+    assert len(geocoder.calls) == 2
+    assert GeocodeCache(db_path=db_path).get_or_resolve(37.5, 127.0, FakeGeocoder()) == SEOUL
+
+
+def test_concurrent_lookups_of_one_key_are_coalesced():
+    cache = GeocodeCache()
+    geocoder = FakeGeocoder(gate=threading.Event())
+    results = []
+    owner = threading.Thread(target=lambda: results.append(cache.get_or_resolve(37.5, 127.0, geocoder)))
+    owner.start()
+    assert geocoder.started.wait(5)
+    waiter = threading.Thread(target=lambda: results.append(cache.get_or_resolve(37.5, 127.0, geocoder)))
+    waiter.start()
+    while cache.stats()['coalesced'] == 0:
+        threading.Event().wait(0.001)
+    geocoder.gate.set()
+    owner.join(5)
+    waiter.join(5)
+    assert results == [SEOUL, SEOUL]
+    assert len(geocoder.calls) == 1
+    assert cache.stats()['coalesced'] == 1
+
+
+def test_lookup_errors_reach_coalesced_waiters_and_are_not_cached():
+    cache = GeocodeCache()
+    geocoder = FakeGeocoder(result=RuntimeError('geocoder down'), gate=threading.Event())
+    errors = []
+
+    def lookup():
+        try:
+            cache.get_or_resolve(37.5, 127.0, geocoder)
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=lookup)]
+    threads[0].start()
+    assert geocoder.started.wait(5)
+    threads.append(threading.Thread(target=lookup))
+    threads[1].start()
+    while cache.stats()['coalesced'] == 0:
+        threading.Event().wait(0.001)
+    geocoder.gate.set()
+    for thread in threads:
+        thread.join(5)
+    assert len(errors) == 2
+    assert cache.get_or_resolve(37.5, 127.0, FakeGeocoder()) == SEOUL
@@ -0,0 +1,167 @@
+import os
+import sys
+import threading
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+
+import pytest
+from geopy.exc import GeocoderTimedOut
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import GeocodeScheduler as scheduler_module  # noqa: E402
+from GeocodeScheduler import GeocodeScheduler  # noqa: E402
+
+
+class FakeClock:
+    # 스케줄러 스레드의 time.monotonic/time.sleep을 대신하는 시계 (sleep은 기다리지 않고 시간만 앞당김)
+    def __init__(self):
+        self.now = 100.0
+        self._lock = threading.Lock()
+
+    def monotonic(self):
+        with self._lock:
+            return self.now
+
+    def sleep(self, seconds):
+        with self._lock:
+            self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(scheduler_module, 'time', fake)
+    return fake
+
+
+class FakeGeocoder:
+    # 호출 시각(가짜 시계)을 기록하고, 앞의 errors를 차례로 던진 뒤 좌표 문자열을 반환하는 조회 함수
+    def __init__(self, clock, errors=(), gate=None):
+        self.clock = clock
+        self.errors = list(errors)
+        self.gate = gate
+        self.calls = []
+
+    def __call__(self, lat, lon):
+        self.calls.append(((lat, lon), self.clock.monotonic()))
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.errors:
+            raise self.errors.pop(0)
+        return f"{lat},{lon}"
+
+
+@pytest.fixture
+def make_scheduler():
+    schedulers = []
+
+    def make(*args, **kwargs):
+        scheduler = GeocodeScheduler(*args, **kwargs)
+        schedulers.append(scheduler)
+        return scheduler
+
+    yield make
+    for scheduler in schedulers:
+        scheduler.shutdown()
+
+
+def test_requests_respect_the_global_rate_limit(clock, make_scheduler):
+    geocoder = FakeGeocoder(clock)
+    scheduler = make_scheduler(geocoder, requests_per_second=2)
+    futures = [scheduler.submit(lat, 127.0) for lat in range(5)]
+    assert [future.result(5) for future in futures] == [f"{lat},127.0" for lat in range(5)]
+    times = [called_at for _, called_at in geocoder.calls]
+    assert all(later - earlier >= 0.5 - 1e-9 for earlier, later in zip(times, times[1:]))
+    assert scheduler.stats()['requests'] == 5
+
+
+def test_pending_lookups_of_one_coordinate_are_deduplicated(clock, make_scheduler):
+    gate = threading.Event()
+    geocoder = FakeGeocoder(clock, gate=gate)
+    scheduler = make_scheduler(geocoder, requests_per_second=10)
+    first = scheduler.submit(37.5, 127.0)
+    second = scheduler.submit(37.5, 127.0)
+    assert first is second
+    gate.set()
+    assert first.result(5) == "37.5,127.0"
+    assert len(geocoder.calls) == 1
+    assert scheduler.stats()['deduplicated'] == 1
+
+
+def test_retryable_errors_are_requeued_behind_the_rate_limit(clock, make_scheduler):
+    geocoder = FakeGeocoder(clock, errors=[GeocoderTimedOut('slow'), GeocoderTimedOut('slow')])
+    scheduler = make_scheduler(geocoder, requests_per_second=1, max_retries=2)
+    assert scheduler.submit(37.5, 127.0).result(5) == "37.5,127.0"
+    times = [called_at for _, called_at in geocoder.calls]
+    assert len(times) == 3
+    assert all(later - earlier >= 1.0 - 1e-9 for earlier, later in zip(times, times[1:]))
+    stats = scheduler.stats()
+    assert (stats['retries'], stats['failed']) == (2, 0)
+
+
+def test_lookup_fails_after_max_retries(clock, make_scheduler):
+    geocoder = FakeGeocoder(clock, errors=[GeocoderTimedOut('slow')] * 3)
+    scheduler = make_scheduler(geocoder, requests_per_second=10, max_retries=2)
+    with pytest.raises(GeocoderTimedOut):
+        scheduler.submit(37.5, 127.0).result(5)
+    assert len(geocoder.calls) == 3
+    assert scheduler.stats()['failed'] == 1
+
+
+def test_other_errors_are_not_retried(clock, make_scheduler):
+    geocoder = FakeGeocoder(clock, errors=[ValueError('bad response')])
+    scheduler = make_scheduler(geocoder, requests_per_second=10)
+    with pytest.raises(ValueError):
+        scheduler.submit(37.5, 127.0).result(5)
+    assert len(geocoder.calls) == 1
+    assert scheduler.stats()['retries'] == 0
+
+
+def test_estimated_wait_counts_queue_and_retries(clock, make_scheduler):
+    gate = threading.Event()
+    geocoder = FakeGeocoder(clock, gate=gate)
+    scheduler = make_scheduler(geocoder, requests_per_second=2, max_retries=1)
+    assert scheduler.estimated_wait() == pytest.approx((0 + 1 + 1) * 0.5)
+    for lat in range(3):
+        scheduler.submit(lat, 127.0)
+    while not geocoder.calls:
+        threading.Event().wait(0.001)
+    # 첫 요청이 방금 시작되어 다음 요청까지 0.5초가 남고, 대기 중인 조회 3개 + 새 조회 1개 + 재시도 1회
+    assert scheduler.estimated_wait() == pytest.approx(0.5 + (3 + 1 + 1) * 0.5)
+    # 요청 시간 제한이 요청 간격보다 길면 시간 제한으로 계산합니다.
+    assert scheduler.estimated_wait(request_timeout=2.0) == pytest.approx(0.5 + (3 + 1 + 1) * 2.0)
+    gate.set()
+
+
+def test_resolve_sheds_lookups_when_the_queue_is_too_long(clock, make_scheduler):
+    gate = threading.Event()
+    geocoder = FakeGeocoder(clock, gate=gate)
+    scheduler = make_scheduler(geocoder, requests_per_second=1, max_retries=0)
+    for lat in range(3):
+        scheduler.submit(lat, 127.0)
+    with pytest.raises(FuturesTimeoutError):
+        scheduler.resolve(37.5, 127.0, max_wait=2.0)
+    stats = scheduler.stats()
+    assert (stats['shed'], stats['submitted'], stats['pending']) == (1, 3, 3)
+    gate.set()
+
+
+def test_resolve_gives_up_after_the_estimated_wait(clock, make_scheduler):
+    gate = threading.Event()
+    geocoder = FakeGeocoder(clock, gate=gate)
+    scheduler = make_scheduler(geocoder, requests_per_second=100, max_retries=0)
+    with pytest.raises(FuturesTimeoutError):
+        scheduler.resolve(37.5, 127.0, max_wait=1.0)
+    assert scheduler.stats()['timed_out'] == 1
+    # 포기한 조회도 끝까지 실행되어 같은 좌표를 다시 조회하면 결과를 받습니다.
+    gate.set()
+    assert scheduler.submit(37.5, 127.0).result(5) == "37.5,127.0"
+
+
+def test_shutdown_drains_queued_lookups_and_rejects_new_ones(clock):
+    scheduler = GeocodeScheduler(FakeGeocoder(clock), requests_per_second=10)
+    futures = [scheduler.submit(lat, 127.0) for lat in range(3)]
+    scheduler.shutdown()
+    assert [future.result(0) for future in futures] == [f"{lat},127.0" for lat in range(3)]
+    with pytest.raises(RuntimeError):
+        scheduler.submit(3, 127.0)
@@ -0,0 +1,99 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import HashtagGenerator as hashtag_module  # noqa: E402
+from HashtagGenerator import HashtagGenerator  # noqa: E402
+
+# 규칙 기반 토크나이저는 항상, 형태소 분석기는 kiwipiepy가 설치되어 있을 때만 확인합니다.
+BACKENDS = [
+    pytest.param(False, id='rules'),
+    pytest.param(True, id='analyzer', marks=pytest.mark.skipif(hashtag_module.Kiwi is None,
+                                                              reason='kiwipiepy is not installed')),
+]
+
+# 규칙을 만들 때 사용한 문장 (연결형, 과거형 서술어가 섞여 있습니다)
+TUNING_CAPTIONS = [
+    "맑은 하늘 아래 해변에서 서핑 보드를 든 남자가 바다로 걸어가고 있습니다.",
+    "서핑 보드를 들고 파도를 향해 걸어가는 사람의 뒷모습이 보입니다.",
+    "하늘이 맑고 파도가 잔잔한 해변 풍경입니다.",
+]
+TUNING_STORY = (
+    "오늘은 친구와 바닷가에 갔다. 하늘은 맑고 바다는 아름다웠다. 서핑 보드를 빌려 파도를 탔고, "
+    "점심에는 해산물을 먹었다. 먹었다는 말로는 부족할 만큼 맛있었다. 노을이 질 때까지 해변을 걸으며 "
+    "이야기를 나눴다. 정말 즐겁게 하루를 보냈다. 산책했다. 걸어서 돌아왔다."
+)
+TUNING_VERB_FORMS = {
+    '걸어가고', '걸어가', '걸어가는', '맑고', '맑은', '했다', '갔다', '아름다웠다', '먹었다', '탔고', '맛있었다',
+    '걸으며', '나눴다', '즐겁게', '보냈다', '산책했다', '걸어서', '돌아왔다', '빌려', '부족할', '향해',
+}
+
+# 규칙을 만들 때 보지 않은 캡션/글: (캡션 목록, 글, 해시태그가 되면 안 되는 서술어, 뽑혀야 하는 명사)
+HELD_OUT = [
+    (
+        ["빨간 자동차가 예쁜 도로 위를 달리고 있다.", "귀여운 강아지가 카페 테라스에 앉아 있다."],
+        "제주도 카페에서 커피를 마시는 중이다. 오랜만에 친구를 만났죠. 다음에 또 오고 싶다.",
+        {'빨간', '예쁜', '귀여운', '달리', '달리고', '위를', '앉아', '마시', '마시는', '중이다', '만났죠', '오고', '싶다'},
+        {'강아지', '카페', '제주도', '자동차', '커피'},
+    ),
+    (
+        ["하얀 접시 위에 노릇하게 구운 빵과 달콤한 케이크가 놓여 있습니다.",
+         "따뜻한 커피 한 잔이 나무 테이블 위에 있습니다."],
+        "주말 아침 동네 빵집에 들렀다. 갓 구운 빵 냄새가 정말 좋았고 케이크도 부드러웠다. 다음 주에도 다시 오려고 한다.",
+        {'하얀', '노릇', '노릇하게', '구운', '달콤', '달콤한', '놓여', '따뜻', '따뜻한', '들렀다', '좋았고',
+         '부드러웠다', '오려고', '한다'},
+        {'케이크', '커피', '테이블', '빵집'},
+    ),
+    (
+        ["높은 건물 사이로 밝게 빛나는 도시의 야경이 펼쳐져 있다.", "파란 조명이 켜진 다리 위로 사람들이 걷고 있다."],
+        "퇴근길에 친구와 전망대에 올라갔어요. 반짝이는 야경을 보니 하루의 피로가 풀리는 것 같았어요.",
+        {'높은', '밝게', '빛나', '빛나는', '펼쳐져', '파란', '켜진', '걷고', '올라갔어요', '반짝이', '반짝이는',
+         '풀리', '풀리는', '같았어요'},
+        {'야경', '건물', '전망대'},
+    ),
+]
+
+
+@pytest.mark.parametrize('use_analyzer', BACKENDS)
+@pytest.mark.parametrize('captions, story, verb_forms, nouns', HELD_OUT)
+def test_held_out_sentences_yield_nouns_only(use_analyzer, captions, story, verb_forms, nouns):
+    generator = HashtagGenerator(use_analyzer=use_analyzer)
+    keywords = generator.rank_keywords(story, captions)
+    assert not verb_forms & set(keywords)
+    assert nouns <= set(keywords)
+    hashtags = generator.generate(story, captions, [{'city': 'JejuCity', 'country': 'SouthKorea'}], '일기')
+    assert not {tag.lstrip('#') for tag in hashtags} & verb_forms
+
+
+@pytest.mark.parametrize('use_analyzer', BACKENDS)
+def test_tuning_sentences_drop_verb_forms(use_analyzer):
+    generator = HashtagGenerator(use_analyzer=use_analyzer)
+    keywords = generator.rank_keywords(TUNING_STORY, TUNING_CAPTIONS)
+    assert not TUNING_VERB_FORMS & set(keywords)
+    assert {'서핑', '파도', '해변', '바닷가', '해산물'} <= set(keywords)
+    for story in (TUNING_STORY, ""):
+        hashtags = generator.generate(story, TUNING_CAPTIONS, [], '일기')
+        assert not {tag.lstrip('#') for tag in hashtags} & TUNING_VERB_FORMS
+        assert '#파도' in hashtags
+
+
+def test_rule_tokenizer_keeps_dictionary_nouns_with_predicate_like_endings():
+    generator = HashtagGenerator(use_analyzer=False)
+    assert generator._strip_korean_suffix('가게') == '가게'
+    assert generator._strip_korean_suffix('창고를') == '창고'
+    assert generator._strip_korean_suffix('시간은') == '시간'
+    assert generator._strip_korean_suffix('공간에서') == '공간'
+    assert generator._strip_korean_suffix('친구에게') == '친구'
+    assert generator._strip_korean_suffix('포도') == '포도'
+    assert generator._strip_korean_suffix('산책한') == '산책'
+    assert generator._strip_korean_suffix('먹었다는') is None
+    assert generator._strip_korean_suffix('걸어가고') is None
+    assert generator._strip_korean_suffix('마시는') is None
+
+
+def test_nouns_only_reflects_backend():
+    assert not HashtagGenerator(use_analyzer=False).nouns_only
+    assert HashtagGenerator().nouns_only == (hashtag_module.Kiwi is not None)
@@ -0,0 +1,92 @@
+import os
+import random
+import sys
+
+import pytest
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ImageEncoder import ImageEncoder  # noqa: E402
+
+ORIGINAL_SIZES = [(4000, 3000), (3000, 4000), (4000, 4000), (1600, 900)]
+
+
+def sharp_image(size=(512, 384)):
+    # 밝기가 무작위인 8px 격자 (에지 밀도가 매우 높음)
+    rng = random.Random(0)
+    img = Image.new('RGB', size)
+    draw = ImageDraw.Draw(img)
+    for x in range(0, size[0], 8):
+        for y in range(0, size[1], 8):
+            value = rng.randrange(256)
+            draw.rectangle((x, y, x + 7, y + 7), fill=(value, value, value))
+    return img
+
+
+def flat_image(size=(512, 384)):
+    return Image.new('RGB', size, (120, 160, 200))
+
+
+def striped_image(size=(512, 384), period=16):
+    # 세로 줄무늬 (에지 밀도가 low 기준과 high 기준 사이)
+    img = Image.new('RGB', size, (255, 255, 255))
+    draw = ImageDraw.Draw(img)
+    for x in range(0, size[0], period):
+        draw.rectangle((x, 0, x + period // 2 - 1, size[1]), fill=(0, 0, 0))
+    return img
+
+
+@pytest.mark.parametrize('original_size', ORIGINAL_SIZES)
+def test_sharp_image_uses_one_high_detail_tile(original_size):
+    encoder = ImageEncoder('gpt-4o-mini')
+    plan = encoder.plan(sharp_image(), original_size)
+    assert (plan['detail'], plan['max_side'], plan['quality']) == ('high', 512, 85)
+    encoded = encoder.encode(sharp_image(ImageEncoder._fit(original_size, plan['max_side'])), plan)
+    assert encoded['estimated_tokens'] == encoder.base_tokens + encoder.tile_tokens <= encoder.token_budget
+
+
+@pytest.mark.parametrize('original_size', ORIGINAL_SIZES)
+def test_flat_image_uses_small_low_detail(original_size):
+    plan = ImageEncoder('gpt-4o-mini').plan(flat_image(), original_size)
+    assert (plan['detail'], plan['max_side'], plan['quality']) == ('low', ImageEncoder.SIMPLE_SCENE_SIDE, 70)
+    assert plan['edge_density'] < ImageEncoder.SIMPLE_SCENE_EDGE_DENSITY
+
+
+def test_moderate_image_uses_low_detail():
+    encoder = ImageEncoder('gpt-4o-mini')
+    density = encoder.edge_density(striped_image(period=128))
+    assert ImageEncoder.SIMPLE_SCENE_EDGE_DENSITY <= density < ImageEncoder.HIGH_DETAIL_EDGE_DENSITY
+    plan = encoder.plan(striped_image(period=128), (4000, 3000))
+    assert (plan['detail'], plan['max_side']) == ('low', ImageEncoder.LOW_DETAIL_SIDE)
+
+
+def test_budget_below_one_tile_disables_high_detail():
+    encoder = ImageEncoder('gpt-4o-mini', token_budget=2833)
+    plan = encoder.plan(sharp_image(), (4000, 3000))
+    assert (plan['detail'], plan['max_side']) == ('low', ImageEncoder.LOW_DETAIL_SIDE)
+
+
+def test_non_adaptive_plan_uses_default_size():
+    plan = ImageEncoder('gpt-4o-mini', adaptive=False).plan(sharp_image(), (4000, 3000))
+    assert plan == {'detail': 'auto', 'max_side': 512, 'quality': 85, 'edge_density': None}
+
+
+@pytest.mark.parametrize('size, detail, tokens', [
+    ((512, 384), 'high', 2833 + 5667),
+    ((512, 512), 'high', 2833 + 5667),
+    ((1024, 768), 'high', 2833 + 4 * 5667),
+    ((768, 432), 'high', 2833 + 2 * 5667),
+    ((4000, 3000), 'low', 2833),
+])
+def test_estimate_tokens(size, detail, tokens):
+    assert ImageEncoder('gpt-4o-mini').estimate_tokens(*size, detail) == tokens
+
+
+def test_encode_lowers_quality_then_size_to_fit_byte_budget():
+    encoder = ImageEncoder('gpt-4o-mini', max_bytes=7000)
+    plan = encoder.plan(sharp_image(), (4000, 3000))
+    encoded = encoder.encode(sharp_image(), plan)
+    assert encoded['bytes'] <= 7000
+    assert encoded['quality'] < plan['quality'] or encoded['width'] < 512
+
@@ -0,0 +1,129 @@
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from JobManager import JobManager  # noqa: E402
+from JobStore import InMemoryJobStore, SQLiteJobStore  # noqa: E402
+
+
+class RecordingProcessor:
+    # 처리한 이미지의 해시를 기록하는 process_func (gate가 있으면 열릴 때까지 기다림)
+    def __init__(self, gate=None):
+        self.gate = gate
+        self.processed = []
+        self._lock = threading.Lock()
+
+    def __call__(self, stored, on_stage=None):
+        with self._lock:
+            self.processed.append(stored['sha256'])
+        if self.gate is not None:
+            self.gate.wait(5)
+        return {'metadata': {}, 'caption': stored['sha256'], 'image_path': stored['path']}
+
+
+def images(tmp_path, *names):
+    result = []
+    for index, name in enumerate(names):
+        path = tmp_path / f"{name}.jpg"
+        path.write_bytes(b'jpeg')
+        result.append({'index': index, 'file_name': f"{name}.jpg", 'sha256': name, 'path': str(path), 'status': 'queued'})
+    return result
+
+
+def finished_process_id():
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+@pytest.fixture
+def live_owners():
+    # 살아 있는 다른 워커 프로세스를 흉내 내는 프로세스들의 소유자 ID
+    processes = [subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)']) for _ in range(3)]
+    yield [f"{socket.gethostname()}:{process.pid}" for process in processes]
+    for process in processes:
+        process.kill()
+        process.wait()
+
+
+def resume_and_wait(manager):
+    manager.resume()
+    manager.executor.shutdown(wait=True)
+
+
+@pytest.fixture
+def store_factory(tmp_path):
+    db_path = str(tmp_path / 'jobs.sqlite3')
+    return lambda: SQLiteJobStore(db_path)
+
+
+def test_workers_sharing_a_database_resume_each_job_once(tmp_path, store_factory, live_owners):
+    store_factory().create_job('unowned', images(tmp_path, 'a', 'b'))
+    store_factory().create_job('crashed', images(tmp_path, 'c'), owner=f"{socket.gethostname()}:{finished_process_id()}")
+    store_factory().create_job('old-host', images(tmp_path, 'd'), owner="previous-container:8")
+
+    # 모든 워커가 resume을 마칠 때까지 처리를 붙잡아 두어, 다른 워커가 처리 중인 작업을 가져가면 중복으로 드러나게 합니다.
+    gate = threading.Event()
+    processors = [RecordingProcessor(gate) for _ in range(3)]
+    managers = [JobManager(store_factory(), processor, owner=owner) for processor, owner in zip(processors, live_owners)]
+    threads = [threading.Thread(target=manager.resume) for manager in managers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    gate.set()
+    for manager in managers:
+        manager.executor.shutdown(wait=True)
+
+    processed = [digest for processor in processors for digest in processor.processed]
+    assert sorted(processed) == ['a', 'b', 'c', 'd']
+    store = store_factory()
+    assert all(store.get_job(job_id)['status'] == 'completed' for job_id in ('unowned', 'crashed', 'old-host'))
+
+
+def test_jobs_of_a_live_worker_are_not_claimed(tmp_path, store_factory, live_owners):
+    store_factory().create_job('live', images(tmp_path, 'a'), owner=live_owners[0])
+    processor = RecordingProcessor()
+    resume_and_wait(JobManager(store_factory(), processor))
+    assert processor.processed == []
+    assert store_factory().get_job('live')['status'] == 'queued'
+
+
+def test_released_jobs_are_resumed_and_owner_is_not_exposed(tmp_path, store_factory, live_owners):
+    first = JobManager(store_factory(), RecordingProcessor(), owner=live_owners[0])
+    first.executor.shutdown(wait=True)
+    first.store.create_job('job', images(tmp_path, 'a'), owner=first.owner)
+    first.shutdown()
+
+    processor = RecordingProcessor()
+    resume_and_wait(JobManager(store_factory(), processor))
+    assert processor.processed == ['a']
+    assert 'owner' not in store_factory().get_job('job')
+
+
+def test_database_without_owner_column_is_migrated(tmp_path):
+    db_path = str(tmp_path / 'jobs.sqlite3')
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE jobs (job_id TEXT PRIMARY KEY, status TEXT NOT NULL, version INTEGER NOT NULL, "
+                 "created_at REAL NOT NULL, updated_at REAL NOT NULL, images TEXT NOT NULL)")
+    conn.execute("INSERT INTO jobs VALUES ('job', 'queued', 0, 0, 0, '[]')")
+    conn.commit()
+    conn.close()
+    assert [job['job_id'] for job in SQLiteJobStore(db_path).claim_unfinished('me', lambda owner: False)] == ['job']
+    assert SQLiteJobStore(db_path).claim_unfinished('other', lambda owner: False) == []
+
+
+def test_in_memory_store_claims_like_the_sqlite_store(tmp_path):
+    store = InMemoryJobStore()
+    store.create_job('mine', images(tmp_path, 'a'), owner='live')
+    store.create_job('free', images(tmp_path, 'b'))
+    assert [job['job_id'] for job in store.claim_unfinished('me', lambda owner: False)] == ['free']
+    store.release('live')
+    assert [job['job_id'] for job in store.claim_unfinished('me', lambda owner: False)] == ['mine']
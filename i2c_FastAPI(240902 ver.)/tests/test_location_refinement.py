@@ -0,0 +1,82 @@
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from GeocodeCache import GeocodeCache  # noqa: E402
+from ImageMetadataProcessor import ImageMetadataProcessor, REFINED_FLAG  # noqa: E402
+from ImageProcessor import ImageProcessor  # noqa: E402
+from LocationEnricher import LocationEnricher, LOCATION_PENDING, LOCATION_RESOLVED  # noqa: E402
+
+LABELED_EXIF = {'Date/Time': '2024:01:02 03:04:05', 'Latitude': 37.5665, 'Longitude': 126.978}
+OFFLINE = {'city': 'Seoul', 'country': 'South Korea'}
+NOMINATIM = {'city': 'Seoul', 'country': 'South Korea', 'road': 'Sejong-daero', 'postcode': '04524'}
+
+
+class FakeOfflineGeocoder:
+    def reverse(self, lat, lon):
+        return dict(OFFLINE)
+
+
+@pytest.fixture
+def make_processor(monkeypatch):
+    processors = []
+
+    def make(nominatim_results, **kwargs):
+        processor = ImageMetadataProcessor(GeocodeCache(), 'offline+nominatim', FakeOfflineGeocoder(), **kwargs)
+        results = list(nominatim_results)
+        monkeypatch.setattr(processor, '_lookup_nominatim', lambda lat, lon: dict(results.pop(0)))
+        processors.append(processor)
+        return processor
+
+    yield make
+    for processor in processors:
+        processor.geocode_scheduler.shutdown()
+        if processor.location_enricher:
+            processor.location_enricher.shutdown()
+
+
+def result_with(location):
+    return {'caption': '바다', 'metadata': {'labeled_exif': LABELED_EXIF, **location}}
+
+
+def test_offline_fallback_is_returned_without_the_internal_flag(make_processor):
+    processor = make_processor([{}, NOMINATIM])
+    state = {}
+    location = processor.locate(LABELED_EXIF, state)
+    assert location == {'location_info': OFFLINE} and REFINED_FLAG not in location['location_info']
+    assert state == {'refined': False}
+    assert not ImageProcessor.is_complete(result_with(location), state['refined'])
+
+    # 대신한 결과는 캐시에 저장하지 않으므로 다음 요청에서 Nominatim을 다시 조회합니다.
+    state = {}
+    location = processor.locate(LABELED_EXIF, state)
+    assert location == {'location_info': NOMINATIM} and state == {'refined': True}
+    assert ImageProcessor.is_complete(result_with(location), state['refined'])
+    assert processor.resolve_location(37.5665, 126.978) == (NOMINATIM, True)
+
+
+def wait_for_status(enricher, location_id, status):
+    while enricher.get(location_id)['status'] != status:
+        threading.Event().wait(0.001)
+    return enricher.get(location_id)
+
+
+def test_deferred_fallback_is_stored_without_the_flag_and_looked_up_again(make_processor):
+    enricher = LocationEnricher(max_workers=1)
+    processor = make_processor([{}, NOMINATIM], location_enricher=enricher)
+    first = processor.locate(LABELED_EXIF)
+    assert (first['location_status'], first['location_info']) == (LOCATION_PENDING, {})
+    entry = wait_for_status(enricher, first['location_id'], LOCATION_RESOLVED)
+    assert entry['location_info'] == OFFLINE
+    assert enricher.get_location_info(first['location_id']) == OFFLINE
+
+    # 같은 좌표가 다시 들어오면 임시 결과를 보여 주면서 다시 조회하므로, 이 결과도 저장하지 않습니다.
+    second = processor.locate(LABELED_EXIF)
+    assert second['location_info'] == OFFLINE
+    assert not ImageProcessor.is_complete(result_with(second))
+    assert wait_for_status(enricher, first['location_id'], LOCATION_RESOLVED)['location_info'] == NOMINATIM
+    assert ImageProcessor.is_complete(result_with(processor.locate(LABELED_EXIF)))
@@ -0,0 +1,116 @@
+import asyncio
+import importlib
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ImageCaptionGenerator import ImageCaptionGenerator  # noqa: E402
+
+# 대표 이미지(a)와 가까운 해시(b), 멀리 떨어진 해시(c)
+HASHES = {'a': 0, 'b': 0b111, 'c': (1 << 64) - 1}
+
+
+@pytest.fixture
+def main(monkeypatch):
+    # main은 가져올 때 static 폴더와 OpenAI 클라이언트를 준비하므로 프로젝트 폴더에서 테스트용 키로 가져옵니다.
+    monkeypatch.chdir(ROOT)
+    monkeypatch.setenv('OPENAI_API_KEY', 'test')
+    monkeypatch.setenv('GEOCODE_CACHE_DB', '')
+    monkeypatch.setenv('CAPTION_CACHE_DB', '')
+    module = importlib.import_module('main')
+    monkeypatch.setattr(module, 'NEAR_DUPLICATE_DETECTION', True)
+    monkeypatch.setattr(module, 'NEAR_DUPLICATE_THRESHOLD', 5)
+    monkeypatch.setattr(module, 'hash_stored_upload', lambda stored: HASHES[stored['sha256']])
+    return module
+
+
+class FakeProcessor:
+    # process_stored_upload 대신 호출을 기록하고, 대표 이미지가 있으면 그 캡션을 쓰는 결과를 반환합니다.
+    def __init__(self, captions=None, errors=()):
+        self.captions = captions or {}
+        self.errors = set(errors)
+        self.calls = []
+
+    def __call__(self, stored, on_stage=None, representative=None):
+        digest = stored['sha256']
+        self.calls.append((digest, representative and representative['image_id']))
+        if digest in self.errors:
+            raise RuntimeError(f"{digest} 처리 실패")
+        result = {'image_id': digest, 'caption': self.captions.get(digest, f"{digest} 캡션")}
+        if representative:
+            result['caption'] = representative['caption']
+            result['duplicate_of'] = representative['image_id']
+        return result
+
+
+def uploads(*digests):
+    return [{'sha256': digest, 'filename': f"{digest}.jpg"} for digest in digests]
+
+
+def test_near_duplicates_map_to_the_first_uploaded_image(main):
+    assert asyncio.run(main.find_near_duplicates(uploads('a', 'c', 'b', 'a'))) == {'b': 'a'}
+    assert asyncio.run(main.find_near_duplicates(uploads('b', 'a'))) == {'a': 'b'}
+
+
+def test_images_that_fail_to_hash_are_not_grouped(main, monkeypatch):
+    def hash_or_fail(stored):
+        if stored['sha256'] == 'a':
+            raise OSError('decode failed')
+        return HASHES[stored['sha256']]
+
+    monkeypatch.setattr(main, 'hash_stored_upload', hash_or_fail)
+    assert asyncio.run(main.find_near_duplicates(uploads('a', 'b', 'c'))) == {}
+
+
+def test_detection_can_be_disabled(main, monkeypatch):
+    monkeypatch.setattr(main, 'NEAR_DUPLICATE_DETECTION', False)
+    assert asyncio.run(main.find_near_duplicates(uploads('a', 'b'))) == {}
+
+
+def test_duplicates_reuse_the_representative_caption(main, monkeypatch):
+    processor = FakeProcessor()
+    monkeypatch.setattr(main, 'process_stored_upload', processor)
+    results = asyncio.run(main.process_stored_uploads(uploads('a', 'b', 'c', 'b')))
+    assert sorted(processor.calls) == [('a', None), ('b', 'a'), ('c', None)]
+    assert [result['caption'] for result in results] == ['a 캡션', 'a 캡션', 'c 캡션', 'a 캡션']
+    assert results[1]['duplicate_of'] == 'a' and 'duplicate_of' not in results[2]
+
+
+@pytest.mark.parametrize('processor', [
+    FakeProcessor(errors={'a'}),
+    FakeProcessor(captions={'a': ImageCaptionGenerator.CAPTION_ERROR_MESSAGE}),
+], ids=['representative raised', 'representative caption failed'])
+def test_duplicate_captions_itself_when_the_representative_fails(main, monkeypatch, processor):
+    monkeypatch.setattr(main, 'process_stored_upload', processor)
+    results = asyncio.run(main.process_stored_uploads(uploads('a', 'b')))
+    assert ('b', None) in processor.calls
+    assert results[1] == {'image_id': 'b', 'caption': 'b 캡션'}
+
+
+@pytest.mark.parametrize('representative', [None, {'image_id': 'a', 'caption': ImageCaptionGenerator.CAPTION_ERROR_MESSAGE}])
+def test_wait_for_representative_returns_none_without_a_usable_caption(main, representative):
+    async def run():
+        task = asyncio.get_running_loop().create_future()
+        task.set_result(representative)
+        return await main.wait_for_representative(task)
+
+    assert asyncio.run(run()) is None
+
+
+def test_api_calls_saved_counts_each_skipped_caption_once(main, monkeypatch):
+    async def ingest_uploads(files, persist=None, exif_profile=None):
+        return uploads('a', 'b', 'c', 'b')
+
+    monkeypatch.setattr(main, 'ingest_uploads', ingest_uploads)
+    monkeypatch.setattr(main, 'process_stored_upload', FakeProcessor())
+    response = asyncio.run(main.upload_images([]))
+    assert [result['image_id'] for result in response['image_data']] == ['a', 'b', 'c', 'b']
+    # 같은 이미지를 두 번 올린 b는 한 번만 처리하므로 캡션 생성을 한 번 아낀 것으로 셉니다.
+    assert response['api_calls_saved'] == 1
+
+    monkeypatch.setattr(main, 'process_stored_upload', FakeProcessor(errors={'a'}))
+    assert asyncio.run(main.upload_images([]))['error'].startswith('이미지 a.jpg')
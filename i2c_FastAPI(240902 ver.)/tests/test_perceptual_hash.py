@@ -0,0 +1,66 @@
+import io
+import os
+import sys
+
+import pytest
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import PerceptualHash  # noqa: E402
+
+
+def scene(size=(640, 480)):
+    img = Image.new('RGB', size, (40, 90, 160))
+    draw = ImageDraw.Draw(img)
+    w, h = size
+    draw.rectangle((0, h * 2 // 3, w, h), fill=(60, 140, 60))
+    draw.ellipse((w // 5, h // 6, w // 5 + w // 6, h // 6 + w // 6), fill=(250, 220, 90))
+    draw.rectangle((w * 3 // 5, h // 3, w * 4 // 5, h * 2 // 3), fill=(120, 60, 40))
+    return img
+
+
+def recompressed(img, quality):
+    buffer = io.BytesIO()
+    img.save(buffer, 'JPEG', quality=quality)
+    return Image.open(io.BytesIO(buffer.getvalue()))
+
+
+@pytest.mark.parametrize('threshold, grouped', [(4, False), (5, True), (6, True)])
+def test_threshold_is_inclusive(threshold, grouped):
+    # 두 해시의 해밍 거리는 5입니다.
+    hashes = [0, 0b11111]
+    assert PerceptualHash.hamming_distance(*hashes) == 5
+    assert PerceptualHash.group_near_duplicates(hashes, threshold) == ({1: 0} if grouped else {})
+
+
+def test_first_seen_image_is_the_representative():
+    a, b, c = 0, 0b11, 0b1111
+    # b는 a와 c 모두에 가깝지만 먼저 나온 a의 묶음에 들어갑니다.
+    assert PerceptualHash.group_near_duplicates([a, c, b], 2) == {2: 0}
+    assert PerceptualHash.group_near_duplicates([c, a, b], 2) == {2: 0}
+
+
+def test_images_are_compared_only_with_representatives():
+    # c는 a의 중복인 b와는 가깝지만 대표인 a와는 멀어서 새 묶음의 대표가 됩니다.
+    a, b, c, d = 0, 0b11, 0b1111, 0b11111
+    assert PerceptualHash.group_near_duplicates([a, b, c, d], 2) == {1: 0, 3: 2}
+
+
+def test_empty_and_single_inputs_have_no_duplicates():
+    assert PerceptualHash.group_near_duplicates([], 5) == {}
+    assert PerceptualHash.group_near_duplicates([123], 5) == {}
+
+
+def test_dhash_tolerates_resizing_and_recompression():
+    original = PerceptualHash.dhash(scene())
+    assert PerceptualHash.dhash(scene()) == original
+    assert PerceptualHash.hamming_distance(original, PerceptualHash.dhash(scene((320, 240)))) <= 5
+    assert PerceptualHash.hamming_distance(original, PerceptualHash.dhash(recompressed(scene(), 40))) <= 5
+
+
+def test_dhash_separates_different_scenes():
+    other = Image.new('RGB', (640, 480), (200, 200, 200))
+    ImageDraw.Draw(other).rectangle((0, 0, 320, 480), fill=(20, 20, 20))
+    assert PerceptualHash.hamming_distance(PerceptualHash.dhash(scene()), PerceptualHash.dhash(other)) > 5
+    assert PerceptualHash.dhash(scene()).bit_length() <= PerceptualHash.HASH_SIZE ** 2
@@ -0,0 +1,85 @@
+import asyncio
+import os
+import sys
+
+import httpx
+import pytest
+from fastapi import FastAPI, File, Request, UploadFile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from RequestSizeLimiter import RequestSizeLimitMiddleware  # noqa: E402
+
+LIMIT = 1024
+
+
+def make_app():
+    app = FastAPI()
+    app.add_middleware(RequestSizeLimitMiddleware, max_body_bytes=LIMIT, message="too large")
+    app.state.chunks_read = 0
+
+    @app.post("/echo")
+    async def echo(request: Request):
+        size = 0
+        async for chunk in request.stream():
+            app.state.chunks_read += 1
+            size += len(chunk)
+        return {"size": size}
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    return app
+
+
+def post(app, path, **kwargs):
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(path, **kwargs)
+
+    return asyncio.run(run())
+
+
+def chunked(total, chunk_size=256):
+    async def body():
+        for start in range(0, total, chunk_size):
+            yield b"x" * min(chunk_size, total - start)
+    return body()
+
+
+def test_declared_content_length_over_the_limit_is_rejected_before_reading():
+    app = make_app()
+    response = post(app, "/echo", content=b"x" * (LIMIT + 1))
+    assert (response.status_code, response.json()) == (413, {"error": "too large"})
+    assert app.state.chunks_read == 0
+
+
+@pytest.mark.parametrize("total, status", [(LIMIT, 200), (LIMIT + 1, 413), (LIMIT * 8, 413)])
+def test_chunked_body_is_counted_while_it_is_read(total, status):
+    app = make_app()
+    response = post(app, "/echo", content=chunked(total))
+    assert response.status_code == status
+    if status == 413:
+        assert response.json() == {"error": "too large"}
+        # 제한을 넘은 청크까지만 읽고 중단합니다.
+        assert app.state.chunks_read <= LIMIT // 256
+    else:
+        assert response.json() == {"size": total}
+
+
+def test_chunked_multipart_upload_over_the_limit_returns_413():
+    boundary = "boundary"
+    head = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"a.jpg\"\r\n"
+            "Content-Type: image/jpeg\r\n\r\n").encode()
+
+    async def body():
+        yield head
+        for _ in range(16):
+            yield b"x" * 256
+        yield f"\r\n--{boundary}--\r\n".encode()
+
+    response = post(make_app(), "/upload", content=body(),
+                    headers={"content-type": f"multipart/form-data; boundary={boundary}"})
+    assert (response.status_code, response.json()) == (413, {"error": "too large"})
@@ -0,0 +1,30 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from UploadStore import UploadStore  # noqa: E402
+
+
+def result_for(name):
+    return {'caption': name, 'metadata': {}}
+
+
+def test_cached_results_are_bounded_and_reloaded_from_disk(tmp_path):
+    store = UploadStore(str(tmp_path), max_cached_results=2)
+    for name in ('a', 'b'):
+        store.save_result(f"{name}.standard", result_for(name))
+    store.load_result('a.standard')
+    store.save_result('c.standard', result_for('c'))
+    # 가장 오래 사용하지 않은 b가 메모리에서 빠집니다.
+    assert list(store._results) == ['a.standard', 'c.standard']
+
+    assert store.load_result('b.standard') == result_for('b')
+    assert list(store._results) == ['c.standard', 'b.standard']
+    assert store.load_result('missing.standard') is None
+
+
+def test_results_survive_a_new_store_instance(tmp_path):
+    UploadStore(str(tmp_path)).save_result('a.full', result_for('a'))
+    assert UploadStore(str(tmp_path)).load_result('a.full') == result_for('a')
+